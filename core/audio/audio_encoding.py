@@ -0,0 +1,115 @@
+"""
+上传前的音频压缩编码
+
+录音数据一直保存在内存中，上传识别前用 PyAV 在内存里编码为 FLAC（无损）或 OGG_OPUS，
+编码在后台线程中进行，录音一结束就开始，不写临时文件。
+25秒16kHz单声道的原始PCM约800KB：Opus（24kbps）约为其1/10，FLAC视底噪约为1/1.5~1/3。
+没有安装 PyAV 时退回到未压缩的 LINEAR16。调试时可把录音另存为WAV（只在调试模式下写盘）。
+"""
+
+import io
+import os
+import time
+import wave
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+try:
+    import av
+except ImportError:
+    av = None
+
+# 上传编码，可用环境变量 STT_UPLOAD_CODEC 指定：opus / flac / linear16
+UPLOAD_CODEC = os.environ.get("STT_UPLOAD_CODEC", "opus")
+
+# 调试模式下把每段录音另存为WAV的目录（未设置时不写盘）
+DEBUG_WAV_DIR = os.environ.get("STT_DEBUG_WAV_DIR")
+
+OPUS_BITRATE = 24000
+OPUS_SAMPLERATES = (8000, 12000, 16000, 24000, 48000)
+
+# 编码格式 -> (容器格式, 编码器, Google RecognitionConfig 的编码名)
+CODECS = {
+    "flac": ("flac", "flac", "FLAC"),
+    "opus": ("ogg", "libopus", "OGG_OPUS"),
+}
+
+_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="audio-encode")
+
+
+def _pcm_bytes(samples):
+    if isinstance(samples, np.ndarray):
+        return np.ascontiguousarray(samples, dtype=np.int16).tobytes()
+    return bytes(samples)
+
+
+def _encode_with_av(pcm, samplerate, channels, codec):
+    container_format, codec_name, _ = CODECS[codec]
+    layout = "mono" if channels == 1 else "stereo"
+    samples = np.frombuffer(pcm, dtype=np.int16).reshape(1, -1)
+
+    buffer = io.BytesIO()
+    with av.open(buffer, mode="w", format=container_format) as container:
+        stream = container.add_stream(codec_name, rate=samplerate, layout=layout)
+        if codec == "opus":
+            stream.bit_rate = OPUS_BITRATE
+        frame = av.AudioFrame.from_ndarray(samples, format="s16", layout=layout)
+        frame.sample_rate = samplerate
+        for packet in stream.encode(frame):
+            container.mux(packet)
+        for packet in stream.encode(None):
+            container.mux(packet)
+    return buffer.getvalue()
+
+
+def encode_audio(samples, samplerate, channels=1, codec=UPLOAD_CODEC):
+    """把int16录音编码为上传格式
+
+    Args:
+        samples: int16数组或原始PCM字节
+        samplerate: 采样率
+        channels: 声道数
+        codec: opus / flac / linear16
+
+    Returns:
+        (编码后的数据, Google编码名)
+    """
+    pcm = _pcm_bytes(samples)
+    if codec == "opus" and samplerate not in OPUS_SAMPLERATES:
+        codec = "flac"
+    if av is None or codec not in CODECS or channels > 2:
+        return pcm, "LINEAR16"
+
+    try:
+        data = _encode_with_av(pcm, samplerate, channels, codec)
+    except Exception as e:
+        print(f"⚠️ 音频{codec}编码失败，改用未压缩上传: {e}")
+        return pcm, "LINEAR16"
+    print(f"🗜️ 音频已编码为{codec}: {len(pcm)} → {len(data)} bytes")
+    return data, CODECS[codec][2]
+
+
+def submit(fn, *args):
+    """在编码线程中执行音频处理（例如录音结束后的预处理+编码），返回 Future"""
+    return _executor.submit(fn, *args)
+
+
+def write_wav(path, samples, samplerate, channels=1):
+    """把int16录音写成WAV文件"""
+    with wave.open(path, mode='wb') as wf:
+        wf.setnchannels(channels)
+        wf.setsampwidth(2)  # 16bit = 2 bytes
+        wf.setframerate(samplerate)
+        wf.writeframes(_pcm_bytes(samples))
+
+
+def dump_debug_wav(samples, samplerate, channels=1, name=None):
+    """调试模式下在后台把录音另存为WAV，返回路径（未开启调试时返回None）"""
+    if not DEBUG_WAV_DIR:
+        return None
+    os.makedirs(DEBUG_WAV_DIR, exist_ok=True)
+    name = name or time.strftime("recording_%Y%m%d_%H%M%S")
+    path = os.path.join(DEBUG_WAV_DIR, f"{name}.wav")
+    _executor.submit(write_wav, path, _pcm_bytes(samples), samplerate, channels)
+    return path
@@ -0,0 +1,219 @@
+"""
+识别前的音频预处理
+
+I2S MEMS麦克风录到的音频电平很低，开头结尾常有长段静音，直接上传既浪费流量也影响识别。
+在采集和识别之间做一次向量化的预处理：
+- 去直流：减去直流偏置
+- 下混/重采样：多声道取平均为单声道，转换到识别引擎的采样率
+- 自动增益：按语音峰值把电平拉到目标值（限制最大增益，不放大到削波）
+- 裁剪静音：去掉开头和结尾的静音，两端各保留一小段
+整段录音用 preprocess()；流式识别用 StreamPreprocessor 逐块处理，
+语音活动检测也在处理后的音频上进行（低电平的说话经过增益后更容易检出），
+说话开始前的静音块只暂存最近一小段，检测到说话后才计入保留的录音
+（流式识别会话仍实时收到全部音频）。
+"""
+
+from collections import deque
+from typing import NamedTuple
+
+import numpy as np
+
+from core.audio.vad import FRAME_SECONDS, ENERGY_RATIO
+
+RECOGNIZER_SAMPLERATE = 16000  # 识别引擎偏好的采样率
+
+TARGET_PEAK = 16000.0    # 自动增益的目标峰值（int16，约-6dBFS）
+MAX_GAIN = 8.0           # 最大增益，避免把底噪放得太大
+MIN_LEVEL = TARGET_PEAK / MAX_GAIN
+LEVEL_DECAY = 0.98       # 流式增益的峰值包络每块衰减系数（慢释放）
+DC_ADAPT_RATE = 0.05     # 流式去直流的跟踪速度
+
+TRIM_PAD_SECONDS = 0.3   # 裁剪静音时两端保留的时长
+MIN_TRIM_RMS = 30.0      # 静音判定的最低RMS阈值
+NOISE_PERCENTILE = 10    # 用帧能量的该分位数估计噪声
+
+
+class PreprocessResult(NamedTuple):
+    """一段录音的预处理结果"""
+    samples: np.ndarray      # 处理后的单声道int16音频
+    samplerate: int
+    original_seconds: float  # 原始时长
+    trimmed_seconds: float   # 裁掉的静音时长
+    gain: float              # 施加的增益
+
+    @property
+    def seconds(self):
+        return self.samples.size / self.samplerate
+
+    def describe(self):
+        """用于日志的简短描述"""
+        return (f"原始 {self.original_seconds:.1f}秒，裁掉静音 {self.trimmed_seconds:.1f}秒，"
+                f"增益 {self.gain:.1f}倍")
+
+
+def to_mono(samples, channels=1):
+    """int16字节或数组下混为单声道float32"""
+    if isinstance(samples, (bytes, bytearray, memoryview)):
+        samples = np.frombuffer(samples, dtype=np.int16)
+    samples = np.asarray(samples)
+    if channels > 1 or samples.ndim > 1:
+        samples = samples.reshape(-1, channels).mean(axis=1)
+    return samples.astype(np.float32)
+
+
+def resample(samples, samplerate, target_rate=RECOGNIZER_SAMPLERATE):
+    """重采样float32单声道音频（整数倍降采样时先做块平均抗混叠）"""
+    if samplerate == target_rate or samples.size == 0:
+        return samples
+    if samplerate > target_rate and samplerate % target_rate == 0:
+        factor = samplerate // target_rate
+        usable = samples.size // factor * factor
+        return samples[:usable].reshape(-1, factor).mean(axis=1)
+    count = int(round(samples.size * target_rate / samplerate))
+    positions = np.arange(count) * (samplerate / target_rate)
+    return np.interp(positions, np.arange(samples.size), samples).astype(np.float32)
+
+
+def frame_rms(samples, samplerate):
+    """按分析帧计算RMS"""
+    length = int(samplerate * FRAME_SECONDS)
+    count = samples.size // length
+    frames = samples[:count * length].reshape(count, length)
+    return np.sqrt(np.mean(frames * frames, axis=1))
+
+
+def speech_bounds(samples, samplerate, pad=TRIM_PAD_SECONDS):
+    """语音所在的采样区间 (开始, 结束)，没有明显高于噪声的帧时返回整段"""
+    rms = frame_rms(samples, samplerate)
+    if rms.size == 0:
+        return 0, samples.size
+    threshold = max(MIN_TRIM_RMS, float(np.percentile(rms, NOISE_PERCENTILE)) * ENERGY_RATIO)
+    active = np.flatnonzero(rms >= threshold)
+    if active.size == 0:
+        return 0, samples.size
+    length = int(samplerate * FRAME_SECONDS)
+    pad_samples = int(samplerate * pad)
+    start = max(0, active[0] * length - pad_samples)
+    end = min(samples.size, (active[-1] + 1) * length + pad_samples)
+    return start, end
+
+
+def gain_for(peak):
+    """把峰值拉到目标值所需的增益（不衰减，不超过最大增益）"""
+    return float(np.clip(TARGET_PEAK / max(peak, 1.0), 1.0, MAX_GAIN))
+
+
+def to_int16(samples):
+    return np.clip(np.rint(samples), -32768, 32767).astype(np.int16)
+
+
+def preprocess(samples, samplerate, channels=1, target_rate=RECOGNIZER_SAMPLERATE, trim=True):
+    """预处理一整段录音
+
+    Args:
+        samples: int16数组或原始字节（多声道时为交错排列）
+        samplerate: 原始采样率
+        channels: 声道数
+        target_rate: 输出采样率
+        trim: 是否裁剪开头结尾的静音
+
+    Returns:
+        PreprocessResult
+    """
+    audio = to_mono(samples, channels)
+    original_seconds = audio.size / samplerate
+    audio = resample(audio - audio.mean() if audio.size else audio, samplerate, target_rate)
+
+    if trim:
+        start, end = speech_bounds(audio, target_rate)
+        audio = audio[start:end]
+
+    peak = float(np.percentile(np.abs(audio), 99.9)) if audio.size else 0.0
+    gain = gain_for(peak)
+    audio = to_int16(audio * gain)
+    return PreprocessResult(audio, target_rate, original_seconds,
+                            original_seconds - audio.size / target_rate, gain)
+
+
+class StreamPreprocessor:
+    """逐块预处理流式识别的音频
+
+    process() 返回处理后的单声道音频；gate() 决定哪些音频保留下来（重识别和统计用）：
+    说话开始前只暂存最近 pad 秒，确认开始说话后连同暂存的一起放行。
+    """
+
+    def __init__(self, samplerate, channels=1, target_rate=RECOGNIZER_SAMPLERATE,
+                 pad=TRIM_PAD_SECONDS):
+        self.samplerate = samplerate
+        self.channels = channels
+        self.target_rate = target_rate
+        self.pad = pad
+        self._dc = None
+        self._level = None
+        self.gain = 1.0
+        self._held = deque()
+        self._held_seconds = 0.0
+        self.received_seconds = 0.0
+        self.sent_seconds = 0.0
+        self.released = False
+
+    def process(self, chunk):
+        """处理一块int16原始音频，返回目标采样率的单声道int16数组"""
+        audio = to_mono(chunk, self.channels)
+        self.received_seconds += audio.size / self.samplerate
+        if audio.size == 0:
+            return audio.astype(np.int16)
+
+        mean = float(audio.mean())
+        self._dc = mean if self._dc is None else self._dc + DC_ADAPT_RATE * (mean - self._dc)
+        audio = resample(audio - self._dc, self.samplerate, self.target_rate)
+
+        # 峰值包络快攻慢放，块内线性过渡到新增益，避免块边界的跳变
+        peak = float(np.abs(audio).max()) if audio.size else 0.0
+        self._level = peak if self._level is None else max(peak, self._level * LEVEL_DECAY)
+        gain = gain_for(max(self._level, MIN_LEVEL))
+        ramp = np.linspace(self.gain, gain, audio.size, dtype=np.float32)
+        self.gain = gain
+        return to_int16(audio * ramp)
+
+    def gate(self, audio, speech_started=True):
+        """决定处理后的音频块是否保留
+
+        Args:
+            audio: process() 的结果
+            speech_started: 是否已检测到开始说话
+
+        Returns:
+            list[bytes]: 放行的音频块
+        """
+        if self.released:
+            return [self._send(audio)]
+
+        self._held.append(audio)
+        self._held_seconds += audio.size / self.target_rate
+        while len(self._held) > 1 and self._held_seconds - self._held[0].size / self.target_rate >= self.pad:
+            self._held_seconds -= self._held.popleft().size / self.target_rate
+        if not speech_started:
+            return []
+        return self.flush()
+
+    def flush(self):
+        """放行暂存的音频（开始说话或录音结束时调用）"""
+        self.released = True
+        chunks = [self._send(audio) for audio in self._held]
+        self._held.clear()
+        self._held_seconds = 0.0
+        return chunks
+
+    def _send(self, audio):
+        self.sent_seconds += audio.size / self.target_rate
+        return audio.tobytes()
+
+    @property
+    def trimmed_seconds(self):
+        return max(0.0, self.received_seconds - self.sent_seconds)
+
+    def describe(self):
+        """用于日志的简短描述"""
+        return (f"原始 {self.received_seconds:.1f}秒，裁掉静音 {self.trimmed_seconds:.1f}秒，"
+                f"增益 {self.gain:.1f}倍")
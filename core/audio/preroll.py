@@ -0,0 +1,143 @@
+"""
+录音预滚动（pre-roll）
+
+语音状态进行期间，麦克风一直在后台采集，音频写入预先分配的NumPy环形缓冲区，
+保留最近几秒的声音。开始识别时从“过去”的位置读起，用户在录音提示出现前
+就开口说的话也不会被截掉，录音前也不再需要固定的等待。
+- 采集在PortAudio回调中直接拷贝进环形缓冲区，没有额外的队列和对象分配
+- 读取返回缓冲区的切片视图（零拷贝），视图在缓冲区绕回一圈之前有效
+"""
+
+import threading
+
+import numpy as np
+
+try:
+    import sounddevice as sd
+except ImportError:
+    sd = None
+
+PREROLL_SECONDS = 1.5   # 开始识别时包含的过去音频时长
+RING_SECONDS = 10.0     # 环形缓冲区容量（秒）
+BLOCK_SECONDS = 0.05    # 采集回调的块长
+
+
+class AudioRing:
+    """int16多声道环形缓冲区，按帧（每声道一个采样）计数"""
+
+    def __init__(self, samplerate, channels=1, seconds=RING_SECONDS):
+        self.samplerate = samplerate
+        self.channels = channels
+        self.capacity = int(samplerate * seconds)
+        self.buffer = np.zeros((self.capacity, channels), dtype=np.int16)
+        self.written = 0  # 累计写入的帧数
+        self._cond = threading.Condition()
+
+    def write(self, frames):
+        """写入 (帧数, 声道数) 的int16数组"""
+        count = len(frames)
+        if count > self.capacity:
+            frames = frames[-self.capacity:]
+        start = (self.written + count - len(frames)) % self.capacity
+        first = min(len(frames), self.capacity - start)
+        self.buffer[start:start + first] = frames[:first]
+        self.buffer[:len(frames) - first] = frames[first:]
+        with self._cond:
+            self.written += count
+            self._cond.notify_all()
+
+    def position(self, seconds_ago=0.0):
+        """当前时刻往前 seconds_ago 秒的位置（不超过缓冲区保留的范围）"""
+        back = min(int(seconds_ago * self.samplerate), self.capacity, self.written)
+        return self.written - back
+
+    def read(self, position, timeout=None):
+        """读取从 position 起的新音频
+
+        Args:
+            position: 起始位置（帧）
+            timeout: 没有新音频时最多等待的时间（秒）
+
+        Returns:
+            (切片视图列表, 新的位置)：绕回时返回两段，没有新音频时为空列表
+        """
+        with self._cond:
+            if self.written <= position and timeout != 0:
+                self._cond.wait(timeout)
+            written = self.written
+
+        # 读得太慢、数据已被覆盖时从最早保留的位置继续
+        position = max(position, written - self.capacity)
+        count = written - position
+        if count <= 0:
+            return [], position
+
+        start = position % self.capacity
+        if start + count <= self.capacity:
+            segments = [self.buffer[start:start + count]]
+        else:
+            segments = [self.buffer[start:], self.buffer[:start + count - self.capacity]]
+        return segments, written
+
+
+class RingReader:
+    """从环形缓冲区的某个位置开始顺序读取"""
+
+    def __init__(self, ring, position):
+        self.ring = ring
+        self.position = position
+
+    def read(self, timeout=None):
+        """返回新音频的切片视图列表（每段为 (帧数, 声道数) 的int16数组）"""
+        segments, self.position = self.ring.read(self.position, timeout)
+        return segments
+
+
+class PreRollRecorder:
+    """后台持续采集麦克风音频到环形缓冲区"""
+
+    def __init__(self, samplerate=16000, channels=1, device_index=None, seconds=RING_SECONDS):
+        self.ring = AudioRing(samplerate, channels, seconds)
+        self.samplerate = samplerate
+        self.channels = channels
+        self.device_index = device_index
+        self._stream = None
+
+    @property
+    def running(self):
+        return self._stream is not None
+
+    def _callback(self, indata, frames, time_info, status):
+        if status:
+            print(f"⚠️ 录音状态: {status}")
+        self.ring.write(indata)
+
+    def start(self):
+        """开始后台采集（已在采集时直接返回）"""
+        if self._stream is not None:
+            return
+        stream = sd.InputStream(samplerate=self.samplerate,
+                                blocksize=int(self.samplerate * BLOCK_SECONDS),
+                                device=self.device_index,
+                                channels=self.channels,
+                                dtype='int16',
+                                callback=self._callback)
+        stream.start()
+        self._stream = stream
+        print("🎙️ 麦克风预采集已开始")
+
+    def stop(self):
+        """停止后台采集并释放麦克风"""
+        stream, self._stream = self._stream, None
+        if stream is None:
+            return
+        try:
+            stream.stop()
+            stream.close()
+        except Exception as e:
+            print(f"关闭麦克风预采集时出错: {e}")
+        print("🎙️ 麦克风预采集已停止")
+
+    def reader(self, preroll=PREROLL_SECONDS):
+        """从 preroll 秒之前开始读取的读取器"""
+        return RingReader(self.ring, self.ring.position(preroll))
@@ -0,0 +1,438 @@
+"""
+可插拔的语音识别引擎
+
+录音循环只和统一的识别会话打交道：feed() 逐块送入音频，finish() 取得最终文本，
+识别中间结果通过 on_interim 回调返回。目前有两个引擎：
+- google：Google Cloud Speech 流式识别，准确率高，需要网络和凭证
+- vosk：本地离线识别，模型每个进程只加载一次并常驻内存，音频逐块增量送入
+Google客户端（gRPC通道）和Vosk模型都在进程内共享并提前预热。
+引擎选择由 EngineSelector 负责：网络可达且实测延迟正常时优先使用Google，
+离线、没有凭证或Google延迟过高时使用Vosk；主引擎识别失败时用录好的音频交给备用引擎重识别。
+"""
+
+import json
+import os
+import queue
+import socket
+import threading
+import time
+
+import numpy as np
+
+try:
+    import grpc
+    from google.cloud import speech
+    from google.cloud.speech_v1.services.speech.transports import SpeechGrpcTransport
+except ImportError:
+    speech = None
+
+try:
+    import vosk
+except ImportError:
+    vosk = None
+
+project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# 默认Google Cloud凭证路径
+DEFAULT_CREDENTIALS_PATH = "/home/roosterwho/keys/nth-passage-458018-v2-d7658cf7d449.json"
+
+# Vosk模型目录，可用环境变量 VOSK_MODEL_PATH 覆盖
+VOSK_MODEL_PATH = os.environ.get(
+    "VOSK_MODEL_PATH",
+    os.path.join(project_root, "assets", "models", "vosk-model-small-cn-0.22"))
+
+# 引擎偏好，可用环境变量 STT_ENGINE 指定：auto / google / vosk
+STT_ENGINE = os.environ.get("STT_ENGINE", "auto")
+
+GOOGLE_HOST = ("speech.googleapis.com", 443)
+CONNECTIVITY_TIMEOUT_SECONDS = 1.0
+CONNECTIVITY_TTL_SECONDS = 30.0     # 网络检测结果的缓存时间
+GOOGLE_MAX_LATENCY_SECONDS = 2.5    # Google最终结果延迟超过该值时改用本地识别
+FAILURE_BACKOFF_SECONDS = 120.0     # Google失败后多长时间内优先使用本地识别
+LATENCY_SMOOTHING = 0.3             # 延迟指数平滑系数
+FINISH_TIMEOUT_SECONDS = 15.0       # 等待Google最终结果的最长时间
+CHANNEL_READY_TIMEOUT_SECONDS = 2.0  # 健康检查时等待gRPC通道就绪的最长时间
+
+# gRPC keepalive：空闲时定期ping，让通道在两次录音之间保持连接
+GRPC_CHANNEL_OPTIONS = [
+    ("grpc.keepalive_time_ms", 30000),
+    ("grpc.keepalive_timeout_ms", 10000),
+    ("grpc.keepalive_permit_without_calls", 1),
+    ("grpc.http2.max_pings_without_data", 0),
+]
+
+
+def use_credentials(credentials_path=DEFAULT_CREDENTIALS_PATH):
+    """凭证文件存在时设置为Google Cloud凭证
+
+    Returns:
+        bool: 是否已配置凭证
+    """
+    if os.environ.get("GOOGLE_APPLICATION_CREDENTIALS") == credentials_path:
+        return True
+    if not os.path.exists(credentials_path):
+        return False
+    os.environ["GOOGLE_APPLICATION_CREDENTIALS"] = credentials_path
+    print(f"✅ 使用凭证路径: {credentials_path}")
+    return True
+
+
+class RecognitionSession:
+    """一次识别会话：逐块送入int16音频，结束时返回最终文本"""
+
+    def __init__(self, on_interim=None):
+        self.on_interim = on_interim
+        self.finals = []
+
+    def _notify(self, interim=""):
+        if self.on_interim is not None:
+            self.on_interim("".join(self.finals) + interim)
+
+    def feed(self, chunk):
+        raise NotImplementedError
+
+    def finish(self):
+        raise NotImplementedError
+
+    def cancel(self):
+        """放弃本次识别（不需要结果时调用）"""
+
+
+class GoogleSession(RecognitionSession):
+    """Google流式识别会话，请求流在后台线程中发送和接收"""
+
+    def __init__(self, client, samplerate, channels, language_code, on_interim=None):
+        super().__init__(on_interim)
+        self._queue = queue.Queue()
+        self._error = None
+
+        config = speech.RecognitionConfig(
+            encoding=speech.RecognitionConfig.AudioEncoding.LINEAR16,
+            sample_rate_hertz=samplerate,
+            language_code=language_code,
+            audio_channel_count=channels,
+        )
+        self._streaming_config = speech.StreamingRecognitionConfig(
+            config=config,
+            interim_results=True,
+        )
+        self._thread = threading.Thread(target=self._run, args=(client,),
+                                        name="google-stt", daemon=True)
+        self._thread.start()
+
+    def _requests(self):
+        while True:
+            chunk = self._queue.get()
+            if chunk is None:
+                return
+            yield speech.StreamingRecognizeRequest(audio_content=chunk)
+
+    def _run(self, client):
+        try:
+            responses = client.streaming_recognize(
+                config=self._streaming_config, requests=self._requests())
+            for response in responses:
+                interim = ""
+                for result in response.results:
+                    if not result.alternatives:
+                        continue
+                    if result.is_final:
+                        self.finals.append(result.alternatives[0].transcript)
+                    else:
+                        interim += result.alternatives[0].transcript
+                self._notify(interim)
+        except Exception as e:
+            self._error = e
+
+    def feed(self, chunk):
+        if self._error is None:
+            self._queue.put(chunk)
+
+    def finish(self):
+        self._queue.put(None)
+        self._thread.join(FINISH_TIMEOUT_SECONDS)
+        if self._thread.is_alive():
+            raise TimeoutError("等待Google识别结果超时")
+        if self._error is not None:
+            raise self._error
+        return "".join(self.finals)
+
+    def cancel(self):
+        """结束请求流，不等待结果（后台线程自行退出，出错也忽略）"""
+        self.on_interim = None
+        self._queue.put(None)
+
+
+class VoskSession(RecognitionSession):
+    """Vosk增量识别会话，音频块直接送入常驻模型的识别器"""
+
+    def __init__(self, model, samplerate, channels, language_code, on_interim=None):
+        super().__init__(on_interim)
+        self.channels = channels
+        # 中文模型的结果按词用空格分隔，拼接时去掉
+        self._separator = "" if language_code.lower().startswith(("zh", "cmn", "ja")) else " "
+        self._recognizer = vosk.KaldiRecognizer(model, samplerate)
+
+    def _text(self, result_json, key="text"):
+        text = json.loads(result_json).get(key, "")
+        return self._separator.join(text.split())
+
+    def feed(self, chunk):
+        if self.channels > 1:
+            samples = np.frombuffer(chunk, dtype=np.int16).reshape(-1, self.channels)
+            chunk = samples.mean(axis=1).astype(np.int16).tobytes()
+        if self._recognizer.AcceptWaveform(chunk):
+            text = self._text(self._recognizer.Result())
+            if text:
+                self.finals.append(text)
+            self._notify()
+        else:
+            self._notify(self._text(self._recognizer.PartialResult(), "partial"))
+
+    def finish(self):
+        text = self._text(self._recognizer.FinalResult())
+        if text:
+            self.finals.append(text)
+        return self._separator.join(self.finals)
+
+
+class GoogleEngine:
+    """Google Cloud Speech 流式识别引擎
+
+    SpeechClient（gRPC通道和认证）每个进程只创建一次并保持连接，
+    会话开始前检查通道是否就绪，识别失败后丢弃通道，下次使用时重新创建。
+    """
+
+    name = "google"
+
+    def __init__(self):
+        self._client = None
+        self._lock = threading.Lock()
+        self._online = None
+        self._checked_at = 0.0
+
+    def available(self):
+        """库已安装且凭证已配置（没有配置时尝试默认凭证路径）"""
+        if speech is None:
+            return False
+        credentials = os.environ.get("GOOGLE_APPLICATION_CREDENTIALS")
+        if credentials:
+            return os.path.exists(credentials)
+        return use_credentials()
+
+    def is_online(self):
+        """能否连上Google语音服务（结果缓存一段时间）"""
+        now = time.time()
+        if self._online is None or now - self._checked_at > CONNECTIVITY_TTL_SECONDS:
+            try:
+                with socket.create_connection(GOOGLE_HOST, timeout=CONNECTIVITY_TIMEOUT_SECONDS):
+                    self._online = True
+            except OSError:
+                self._online = False
+            self._checked_at = now
+        return self._online
+
+    def mark_offline(self):
+        """识别失败后让下一次选择重新检测网络，并丢弃可能已失效的通道"""
+        self._online = None
+        self.reset_client()
+
+    def _create_client(self):
+        try:
+            channel = SpeechGrpcTransport.create_channel(options=GRPC_CHANNEL_OPTIONS)
+            return speech.SpeechClient(transport=SpeechGrpcTransport(channel=channel))
+        except Exception as e:
+            print(f"⚠️ 创建keepalive通道失败，使用默认客户端: {e}")
+            return speech.SpeechClient()
+
+    @property
+    def client(self):
+        with self._lock:
+            if self._client is None:
+                start = time.time()
+                self._client = self._create_client()
+                print(f"✅ Google Speech客户端已创建 ({(time.time() - start) * 1000:.0f}ms)")
+            return self._client
+
+    def reset_client(self):
+        """关闭当前通道，下次使用时重新创建"""
+        with self._lock:
+            client, self._client = self._client, None
+        if client is not None:
+            try:
+                client.transport.close()
+            except Exception:
+                pass
+
+    def check_health(self, timeout=CHANNEL_READY_TIMEOUT_SECONDS):
+        """确认gRPC通道已连接，未就绪时重新创建一次
+
+        Returns:
+            bool: 通道是否就绪
+        """
+        for attempt in range(2):
+            try:
+                grpc.channel_ready_future(self.client.transport.grpc_channel).result(timeout=timeout)
+                return True
+            except Exception as e:
+                print(f"⚠️ Google Speech通道未就绪（第{attempt + 1}次）: {e}")
+                self.reset_client()
+        return False
+
+    def warm_up(self):
+        """提前建立连接，第一次录音时不必等待通道和认证握手"""
+        if self.available() and self.is_online():
+            self.check_health()
+
+    def start(self, samplerate, channels, language_code, on_interim=None):
+        """通道不可用时抛出 ConnectionError，调用者在录音开始前改用其他引擎"""
+        if not self.check_health():
+            raise ConnectionError("Google Speech通道不可用")
+        return GoogleSession(self.client, samplerate, channels, language_code, on_interim)
+
+
+_vosk_model = None
+_vosk_lock = threading.Lock()
+
+
+def get_vosk_model(model_path=VOSK_MODEL_PATH):
+    """加载Vosk模型（每个进程只加载一次，之后常驻内存）"""
+    global _vosk_model
+    with _vosk_lock:
+        if _vosk_model is None:
+            start = time.time()
+            vosk.SetLogLevel(-1)
+            _vosk_model = vosk.Model(model_path)
+            print(f"✅ Vosk模型已加载: {model_path} ({time.time() - start:.1f}秒)")
+        return _vosk_model
+
+
+class VoskEngine:
+    """Vosk本地离线识别引擎"""
+
+    name = "vosk"
+
+    def __init__(self, model_path=VOSK_MODEL_PATH):
+        self.model_path = model_path
+
+    def available(self):
+        return vosk is not None and os.path.isdir(self.model_path)
+
+    def is_online(self):
+        return True
+
+    def mark_offline(self):
+        pass
+
+    def warm_up(self):
+        get_vosk_model(self.model_path)
+
+    def start(self, samplerate, channels, language_code, on_interim=None):
+        return VoskSession(get_vosk_model(self.model_path), samplerate, channels,
+                           language_code, on_interim)
+
+
+class EngineSelector:
+    """根据网络连通性和实测延迟选择识别引擎"""
+
+    def __init__(self, engines, preference=STT_ENGINE):
+        """
+        Args:
+            engines: 引擎列表，按默认优先级排列
+            preference: auto / 引擎名
+        """
+        self.engines = list(engines)
+        self.preference = preference
+        self.latency = {}       # 引擎名 -> 平滑后的最终结果延迟（秒）
+        self.measured_at = {}   # 引擎名 -> 最近一次测得延迟的时间
+        self.failed_at = {}     # 引擎名 -> 最近一次失败的时间
+        self._lock = threading.Lock()
+
+    def record_latency(self, name, seconds):
+        """记录录音结束到拿到最终结果的耗时"""
+        with self._lock:
+            previous = self.latency.get(name)
+            if previous is None:
+                self.latency[name] = seconds
+            else:
+                self.latency[name] = previous + LATENCY_SMOOTHING * (seconds - previous)
+            self.measured_at[name] = time.time()
+            self.failed_at.pop(name, None)
+
+    def record_failure(self, name):
+        with self._lock:
+            self.failed_at[name] = time.time()
+        engine = self.get(name)
+        if engine is not None:
+            engine.mark_offline()
+
+    def _usable(self, engine):
+        with self._lock:
+            failed_at = self.failed_at.get(engine.name)
+            latency = self.latency.get(engine.name)
+            measured_at = self.measured_at.get(engine.name, 0.0)
+        now = time.time()
+        if failed_at is not None and now - failed_at < FAILURE_BACKOFF_SECONDS:
+            return False
+        # 延迟过高时暂时不用，过一段时间后再试一次重新测量
+        if (engine.name == "google" and latency is not None and latency > GOOGLE_MAX_LATENCY_SECONDS
+                and now - measured_at < FAILURE_BACKOFF_SECONDS):
+            return False
+        return engine.is_online()
+
+    def select(self):
+        """返回按优先级排列的可用引擎（第一个为主引擎，其余为备用）"""
+        available = [engine for engine in self.engines if engine.available()]
+        preferred = [engine for engine in available if engine.name == self.preference]
+        if preferred:
+            return preferred + [engine for engine in available if engine not in preferred]
+
+        usable = [engine for engine in available if self._usable(engine)]
+        return usable + [engine for engine in available if engine not in usable]
+
+    def get(self, name):
+        """按名称取得引擎，没有时返回None"""
+        for engine in self.engines:
+            if engine.name == name:
+                return engine
+        return None
+
+    def describe(self):
+        """各引擎状态（用于日志）"""
+        parts = []
+        for engine in self.engines:
+            latency = self.latency.get(engine.name)
+            state = "可用" if engine.available() else "不可用"
+            if latency is not None:
+                state += f", 延迟 {latency:.2f}秒"
+            parts.append(f"{engine.name}({state})")
+        return ", ".join(parts)
+
+
+_selector = None
+_selector_lock = threading.Lock()
+
+
+def get_engine_selector():
+    """进程内共享的引擎选择器（延迟统计在多次录音之间保留）"""
+    global _selector
+    with _selector_lock:
+        if _selector is None:
+            _selector = EngineSelector([GoogleEngine(), VoskEngine()])
+        return _selector
+
+
+def preload_async():
+    """在后台建立Google通道并加载Vosk模型，第一次录音时不必等待"""
+    def worker():
+        selector = get_engine_selector()
+        for engine in selector.engines:
+            try:
+                if engine.available():
+                    engine.warm_up()
+            except Exception as e:
+                print(f"⚠️ 语音识别引擎 {engine.name} 预热失败: {e}")
+
+    thread = threading.Thread(target=worker, name="stt-preload", daemon=True)
+    thread.start()
+    return thread
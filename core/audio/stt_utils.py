@@ -4,14 +4,25 @@ import wave
 import time
 from google.cloud import speech
 import os
-from typing import Optional
+import queue
+from typing import Callable, Optional
 import signal
 import sys
 import threading
 from contextlib import contextmanager
 
-# 默认凭证路径
-DEFAULT_CREDENTIALS_PATH = "/home/roosterwho/keys/nth-passage-458018-v2-d7658cf7d449.json"
+from core.audio.stt_engines import DEFAULT_CREDENTIALS_PATH, get_engine_selector, use_credentials
+from core.audio import audio_encoding
+from core.audio.audio_encoding import encode_audio, dump_debug_wav, write_wav
+from core.audio.preprocess import RECOGNIZER_SAMPLERATE, StreamPreprocessor, preprocess
+from core.audio.preroll import PREROLL_SECONDS, PreRollRecorder
+
+# 流式识别时每个音频块的时长（秒）
+STREAM_CHUNK_SECONDS = 0.1
+
+# 音频设备检查结果：(设备索引, 采样率, 声道数) -> (实际采样率, 实际声道数)，每个进程只查询一次
+_device_cache = {}
+_device_lock = threading.Lock()
 
 class AudioResourceManager:
     def __init__(self):
@@ -46,6 +57,81 @@ class AudioResourceManager:
             finally:
                 self.stream = None
 
+class _StreamSource:
+    """为本次录音单独打开的麦克风流"""
+    
+    def __init__(self, samplerate, channels, device_index, blocksize):
+        self.queue = queue.Queue()
+        self.stream = sd.RawInputStream(samplerate=samplerate,
+                                        blocksize=blocksize,
+                                        device=device_index,
+                                        channels=channels,
+                                        dtype='int16',
+                                        callback=self._callback)
+    
+    def _callback(self, indata, frames, time_info, status):
+        if status:
+            print(f"⚠️ 录音状态: {status}")
+        self.queue.put(bytes(indata))
+    
+    def start(self):
+        self.stream.start()
+    
+    def read(self, timeout):
+        try:
+            return [self.queue.get(timeout=timeout)]
+        except queue.Empty:
+            return []
+    
+    def drain(self):
+        """停止麦克风，返回剩余的音频块"""
+        self.stream.stop()
+        chunks = []
+        while True:
+            try:
+                chunks.append(self.queue.get_nowait())
+            except queue.Empty:
+                return chunks
+    
+    def close(self):
+        self.stream.close()
+
+
+class _PreRollSource:
+    """从后台预采集的环形缓冲区读取，包含开始前的pre-roll音频"""
+    
+    def __init__(self, recorder, blocksize, preroll=PREROLL_SECONDS):
+        self.reader = recorder.reader(preroll)
+        self.blocksize = blocksize
+    
+    def start(self):
+        pass
+    
+    def read(self, timeout):
+        # 缓冲区切片按块长再切分（视图），只在送入识别时拷贝一次
+        return [segment[i:i + self.blocksize].tobytes()
+                for segment in self.reader.read(timeout)
+                for i in range(0, len(segment), self.blocksize)]
+    
+    def drain(self):
+        return self.read(0)
+    
+    def close(self):
+        pass  # 预采集在语音状态结束时才停止
+
+
+def _prepare_upload(samples, samplerate, channels):
+    """预处理并压缩编码一段录音（在编码线程中执行）
+
+    Returns:
+        (编码数据, 编码名, PreprocessResult)
+    """
+    result = preprocess(samples, samplerate, channels)
+    print(f"🎚️ 音频预处理: {result.describe()}")
+    content, encoding = encode_audio(result.samples, result.samplerate)
+    return content, encoding, result
+
+
 class SpeechToText:
     def __init__(self, 
                  device_index: Optional[int] = None,
@@ -69,24 +155,35 @@ class SpeechToText:
         self.language_code = language_code
         self.audio_manager = AudioResourceManager()
         
-        # 设置Google Cloud凭证
-        if os.path.exists(credentials_path):
-            os.environ["GOOGLE_APPLICATION_CREDENTIALS"] = credentials_path
-            print(f"✅ 使用凭证路径: {credentials_path}")
-        else:
+        # 设置Google Cloud凭证；没有凭证时只能使用本地离线识别
+        use_credentials(credentials_path)
+        
+        # 识别引擎（Google / Vosk）由进程内共享的选择器管理
+        self.selector = get_engine_selector()
+        if not any(engine.available() for engine in self.selector.engines):
             raise FileNotFoundError(
-                f"找不到凭证文件: {credentials_path}\n"
-                "请确保凭证文件存在或提供正确的路径"
+                f"找不到凭证文件: {credentials_path}，也没有可用的Vosk模型\n"
+                "请确保凭证文件存在或提供正确的路径，或设置 VOSK_MODEL_PATH"
             )
-        
-        # 初始化Google Speech客户端
-        self.client = speech.SpeechClient()
+        self._upload = None  # (最近一次录音, 后台预处理+编码的Future)
+        self.recognizer_samplerate = RECOGNIZER_SAMPLERATE  # 预处理后送入识别的采样率
+        self.last_preprocess = None  # 最近一次识别的预处理统计（describe()用于日志）
+        self.preroll = None  # 后台预采集（语音状态进行期间运行）
         
         # 检查音频设备
         self._check_audio_device()
         
     def _check_audio_device(self):
-        """检查音频设备配置"""
+        """检查音频设备配置（结果按设备缓存，同一进程内不重复查询）"""
+        key = (self.device_index, self.samplerate, self.channels)
+        with _device_lock:
+            if key not in _device_cache:
+                self._probe_audio_device()
+                _device_cache[key] = (self.samplerate, self.channels)
+            self.samplerate, self.channels = _device_cache[key]
+    
+    def _probe_audio_device(self):
+        """查询设备信息，按设备能力调整采样率和声道数"""
         try:
             # 获取设备信息
             if self.device_index is not None:
@@ -118,13 +215,29 @@ class SpeechToText:
                           f"采样率: {dev['default_samplerate']})")
             raise ValueError(f"音频设备配置错误: {str(e)}\n请从上面的列表中选择一个有效的设备索引")
     
-    def record(self, duration: int = 5, filename: str = "pyaudio.wav") -> np.ndarray:
+    @property
+    def client(self):
+        """Google Speech客户端（与流式识别共用进程内的同一个gRPC通道）"""
+        return self.selector.get("google").client
+    
+    def start_preroll(self):
+        """开始在后台持续采集麦克风音频，之后的流式识别会包含开始前的音频"""
+        if self.preroll is None:
+            self.preroll = PreRollRecorder(self.samplerate, self.channels, self.device_index)
+        self.preroll.start()
+    
+    def stop_preroll(self):
+        """停止后台采集，释放麦克风"""
+        if self.preroll is not None:
+            self.preroll.stop()
+    
+    def record(self, duration: int = 5, filename: Optional[str] = None) -> np.ndarray:
         """
-        录制音频
+        录制音频（数据保存在内存中，录完立即在后台开始压缩编码）
         
         Args:
             duration: 录音时长（秒）
-            filename: 临时保存的文件名
+            filename: 另存为WAV的文件名（可选，默认不写盘；调试模式下自动另存）
             
         Returns:
             录制的音频数据
@@ -143,12 +256,12 @@ class SpeechToText:
                 sd.wait()
                 self.audio_manager.stream = None  # 录音完成
                 
-                # 保存为临时文件
-                with wave.open(filename, mode='wb') as wf:
-                    wf.setnchannels(self.channels)
-                    wf.setsampwidth(2)  # 16bit = 2 bytes
-                    wf.setframerate(self.samplerate)
-                    wf.writeframes(recording.tobytes())
+                # 后台预处理和编码，transcribe时直接取结果
+                self._upload = (recording, audio_encoding.submit(
+                    _prepare_upload, recording, self.samplerate, self.channels))
+                if filename:
+                    write_wav(filename, recording, self.samplerate, self.channels)
+                dump_debug_wav(recording, self.samplerate, self.channels)
                     
                 print("✅ 录音完成")
                 return recording
@@ -162,41 +275,50 @@ class SpeechToText:
                               f"采样率: {dev['default_samplerate']})")
                 raise
     
-    def transcribe(self, audio_data: Optional[np.ndarray] = None, filename: str = "pyaudio.wav") -> str:
+    def _encoded_upload(self, audio_data: Optional[np.ndarray], filename: Optional[str]):
+        """取得上传用的 (编码数据, 编码名, PreprocessResult)，优先使用录音时已在后台开始的处理"""
+        if audio_data is None and filename is None and self._upload is not None:
+            audio_data = self._upload[0]
+        if audio_data is not None:
+            if self._upload is not None and self._upload[0] is audio_data:
+                return self._upload[1].result()
+            return _prepare_upload(audio_data, self.samplerate, self.channels)
+        
+        # 识别已有的WAV文件
+        with wave.open(filename, "rb") as wf:
+            frames = wf.readframes(wf.getnframes())
+            return _prepare_upload(frames, wf.getframerate(), wf.getnchannels())
+    
+    def transcribe(self, audio_data: Optional[np.ndarray] = None, filename: Optional[str] = None) -> str:
         """
         将音频转换为文本
         
         Args:
-            audio_data: 音频数据，如果为None则使用filename指定的文件
-            filename: 音频文件名
+            audio_data: 音频数据，为None时使用最近一次录音或filename指定的WAV文件
+            filename: 音频文件名（可选）
             
         Returns:
             识别出的文本
         """
         print("🔍 正在识别语音...")
         
-        # 如果提供了音频数据，先保存到文件
-        if audio_data is not None:
-            with wave.open(filename, mode='wb') as wf:
-                wf.setnchannels(self.channels)
-                wf.setsampwidth(2)
-                wf.setframerate(self.samplerate)
-                wf.writeframes(audio_data.tobytes())
-        
-        # 读取音频文件
-        with open(filename, "rb") as audio_file:
-            content = audio_file.read()
+        content, encoding, self.last_preprocess = self._encoded_upload(audio_data, filename)
             
-        # 配置识别参数
+        # 配置识别参数（预处理后为单声道）
         audio = speech.RecognitionAudio(content=content)
         config = speech.RecognitionConfig(
-            encoding=speech.RecognitionConfig.AudioEncoding.LINEAR16,
-            sample_rate_hertz=self.samplerate,
+            encoding=getattr(speech.RecognitionConfig.AudioEncoding, encoding),
+            sample_rate_hertz=self.last_preprocess.samplerate,
+            audio_channel_count=1,
             language_code=self.language_code,
         )
         
-        # 发送识别请求
-        response = self.client.recognize(config=config, audio=audio)
+        # 发送识别请求，失败时丢弃通道，下次重新创建
+        try:
+            response = self.client.recognize(config=config, audio=audio)
+        except Exception:
+            self.selector.record_failure("google")
+            raise
         
         # 提取识别结果
         transcript = ""
@@ -217,4 +339,139 @@ class SpeechToText:
             识别出的文本
         """
         audio_data = self.record(duration)
-        return self.transcribe(audio_data) 
\ No newline at end of file
+        return self.transcribe(audio_data) 
+    
+    def _start_session(self, engines, samplerate, on_interim=None):
+        """按优先级依次开启识别会话，开启失败（如Google通道不可用）的引擎记为失败并跳过
+
+        Returns:
+            (引擎, 会话, 从该引擎开始的剩余引擎列表)
+        """
+        for index, engine in enumerate(engines):
+            try:
+                session = engine.start(samplerate, 1, self.language_code, on_interim)
+            except Exception as e:
+                self.selector.record_failure(engine.name)
+                if index == len(engines) - 1:
+                    raise
+                print(f"⚠️ {engine.name} 无法开始识别: {e}，改用 {engines[index + 1].name}")
+                continue
+            return engine, session, engines[index:]
+    
+    def stream_transcribe(self,
+                          duration: float = 25,
+                          on_interim: Optional[Callable[[str], None]] = None,
+                          stop_event: Optional[threading.Event] = None,
+                          vad=None) -> str:
+        """
+        边录音边识别：麦克风音频按块实时送入识别引擎（Google流式识别或本地Vosk），
+        录音结束时识别也基本完成，只需等待最后一段的结果。
+        后台预采集在运行时，从预采集缓冲区读取并包含开始前 PREROLL_SECONDS 秒的音频。
+        音频经过预处理后以 recognizer_samplerate 单声道送入识别，统计见 last_preprocess。
+        主引擎失败时，用录好的音频交给备用引擎重新识别；一直没有说话时直接返回空文本。
+        
+        Args:
+            duration: 最长录音时长（秒）
+            on_interim: 识别中间结果的回调，参数为目前为止的完整文本
+            stop_event: 提前结束录音的事件（可选）
+            vad: VoiceActivityDetector（可选，采样率为 recognizer_samplerate），检测到说完后自动结束录音
+            
+        Returns:
+            识别出的文本
+        """
+        engines = self.selector.select()
+        if not engines:
+            raise RuntimeError("没有可用的语音识别引擎")
+        
+        stop = stop_event or threading.Event()
+        blocksize = int(self.samplerate * STREAM_CHUNK_SECONDS)
+        if self.preroll is not None and self.preroll.running:
+            source = _PreRollSource(self.preroll, blocksize)
+        else:
+            source = _StreamSource(self.samplerate, self.channels, self.device_index, blocksize)
+        
+        # 采集的音频先经过预处理（去直流、下混、重采样、自动增益），VAD在处理后的音频上检测
+        pre = StreamPreprocessor(self.samplerate, self.channels, self.recognizer_samplerate)
+        self.last_preprocess = pre
+        rate = pre.target_rate
+        engine, session, engines = self._start_session(engines, rate, on_interim)
+        print(f"🎤 开始流式录音识别（最长 {duration} 秒，引擎: {engine.name}）...")
+        # 流式识别要求音频实时连续到达，处理后的音频全部送入会话（包括说话前的静音）；
+        # 只保留从开始说话前一小段起的音频，主引擎失败时交给备用引擎，并用于统计
+        chunks = []
+        
+        def feed(chunk):
+            audio = pre.process(chunk)
+            session.feed(audio.tobytes())
+            ended = vad is not None and vad.process(audio) == vad.ENDED
+            chunks.extend(pre.gate(audio, vad is None or vad.speech_started))
+            return ended
+        
+        with self.audio_manager:
+            try:
+                source.start()
+                self.audio_manager.stream = True  # 标记正在录音
+                deadline = time.time() + duration
+                ended = False
+                while not ended and not stop.is_set() and time.time() < deadline:
+                    for chunk in source.read(STREAM_CHUNK_SECONDS):
+                        if feed(chunk):
+                            print(f"🔇 检测到说话结束，提前停止录音（{vad.elapsed:.1f} 秒）")
+                            ended = True
+                            break
+                
+                # 录音结束：停止读取，送入剩余的音频
+                for chunk in source.drain():
+                    feed(chunk)
+                if vad is None or vad.speech_started:
+                    chunks.extend(pre.flush())
+            finally:
+                source.close()
+                self.audio_manager.stream = None
+        
+        if not chunks:
+            # 一直没有说话：不是引擎的问题，取消会话，不记录失败也不交给备用引擎
+            session.cancel()
+            print(f"🔇 没有检测到说话（{pre.describe()}）")
+            return ""
+        
+        print(f"✅ 录音完成（{pre.describe()}），等待最终识别结果...")
+        if audio_encoding.DEBUG_WAV_DIR:
+            dump_debug_wav(b"".join(chunks), rate)
+        ended_at = time.time()
+        try:
+            transcript = session.finish()
+            self.selector.record_latency(engine.name, time.time() - ended_at)
+        except Exception as e:
+            self.selector.record_failure(engine.name)
+            if len(engines) < 2:
+                raise
+            fallback = engines[1]
+            print(f"⚠️ {engine.name} 识别失败: {e}，改用 {fallback.name} 重新识别")
+            session = fallback.start(rate, 1, self.language_code, on_interim)
+            for chunk in chunks:
+                session.feed(chunk)
+            transcript = session.finish()
+        
+        print(f"✅ 识别完成: {transcript}")
+        return transcript
+
+
+_instances = {}
+_instances_lock = threading.Lock()
+
+
+def get_speech_to_text(device_index: Optional[int] = None,
+                       samplerate: int = 16000,
+                       channels: int = 1,
+                       language_code: str = "zh-CN",
+                       credentials_path: str = DEFAULT_CREDENTIALS_PATH) -> SpeechToText:
+    """取得进程内共享的语音识别器（相同参数只创建一次）"""
+    key = (device_index, samplerate, channels, language_code, credentials_path)
+    with _instances_lock:
+        stt = _instances.get(key)
+        if stt is None:
+            stt = SpeechToText(device_index=device_index, samplerate=samplerate, channels=channels,
+                               language_code=language_code, credentials_path=credentials_path)
+            _instances[key] = stt
+        return stt
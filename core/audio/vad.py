@@ -0,0 +1,164 @@
+"""
+语音活动检测（VAD）
+
+在录音的音频流上逐帧（30ms）计算能量和过零率，判断用户是否在说话：
+- 开头的几帧用于估计环境噪声，之后噪声水平在非语音帧上缓慢跟踪
+- 能量明显高于噪声的连续几帧判定为开始说话
+- 开始说话后连续静音超过设定时长判定为说完，录音可以提前结束
+- 一直没有开口超过设定时长也结束录音
+所有特征都按整块音频用NumPy向量化计算，只在帧级别上推进状态。
+"""
+
+import numpy as np
+
+FRAME_SECONDS = 0.03          # 分析帧长
+NOISE_ESTIMATE_SECONDS = 0.3  # 开头用于估计噪声的时长
+SPEECH_START_SECONDS = 0.09   # 连续多长的语音帧算开始说话
+TRAILING_SILENCE_SECONDS = 1.5  # 说话后静音多久算说完
+NO_SPEECH_TIMEOUT_SECONDS = 10.0  # 一直没有说话时多久后结束
+
+ENERGY_RATIO = 3.0     # 语音帧能量至少是噪声的多少倍
+MIN_SPEECH_RMS = 200.0  # 语音帧的最低RMS（int16幅度）
+MAX_SPEECH_ZCR = 0.35   # 过零率高于此值且能量不突出的帧视为噪声（嘶声、风声）
+NOISE_ADAPT_RATE = 0.05
+
+
+class VoiceActivityDetector:
+    """流式语音端点检测"""
+
+    WAITING = "waiting"   # 还没有开始说话
+    SPEECH = "speech"     # 正在说话
+    SILENCE = "silence"   # 说话后的停顿
+    ENDED = "ended"       # 说完（或一直没有说话），可以结束录音
+
+    def __init__(self, samplerate=16000,
+                 trailing_silence=TRAILING_SILENCE_SECONDS,
+                 no_speech_timeout=NO_SPEECH_TIMEOUT_SECONDS):
+        """
+        Args:
+            samplerate: 采样率
+            trailing_silence: 说话后静音多少秒结束
+            no_speech_timeout: 一直没有说话多少秒后结束，None表示不限制
+        """
+        self.samplerate = samplerate
+        self.frame_length = int(samplerate * FRAME_SECONDS)
+        self.trailing_silence = trailing_silence
+        self.no_speech_timeout = no_speech_timeout
+
+        self._start_frames = max(1, round(SPEECH_START_SECONDS / FRAME_SECONDS))
+        self._noise_frames = max(1, round(NOISE_ESTIMATE_SECONDS / FRAME_SECONDS))
+        self._pending = np.zeros(0, dtype=np.int16)
+        self._noise_samples = []
+        self.noise_rms = None
+
+        self.state = self.WAITING
+        self.frames = 0          # 已分析的帧数
+        self.speech_frames = 0   # 判定为语音的帧数
+        self._run = 0            # 当前连续语音帧（等待时）或静音帧（说话后）计数
+
+    @property
+    def elapsed(self):
+        """已分析的音频时长（秒）"""
+        return self.frames * FRAME_SECONDS
+
+    @property
+    def speech_seconds(self):
+        return self.speech_frames * FRAME_SECONDS
+
+    @property
+    def silence_seconds(self):
+        """说话后当前这段静音的时长（秒）"""
+        return self._run * FRAME_SECONDS if self.state == self.SILENCE else 0.0
+
+    @property
+    def speech_started(self):
+        return self.speech_frames > 0
+
+    @property
+    def ended(self):
+        return self.state == self.ENDED
+
+    def describe(self):
+        """当前状态的简短描述（用于OLED进度显示）"""
+        if self.state == self.WAITING:
+            return "等待说话"
+        if self.state == self.SPEECH:
+            return "正在说话"
+        if self.state == self.SILENCE:
+            return f"停顿 {self.silence_seconds:.1f}秒"
+        return "录音结束" if self.speech_started else "没有听到说话"
+
+    def process(self, samples, channels=1):
+        """分析一块int16音频
+
+        Args:
+            samples: int16数组或原始字节（多声道时为交错排列）
+            channels: 声道数
+
+        Returns:
+            str: 处理后的状态
+        """
+        if isinstance(samples, (bytes, bytearray, memoryview)):
+            samples = np.frombuffer(samples, dtype=np.int16)
+        if channels > 1:
+            samples = samples.reshape(-1, channels).mean(axis=1).astype(np.int16)
+        if self._pending.size:
+            samples = np.concatenate((self._pending, samples))
+
+        count = samples.size // self.frame_length
+        self._pending = samples[count * self.frame_length:].copy()
+        if count == 0 or self.ended:
+            return self.state
+
+        frames = samples[:count * self.frame_length].reshape(count, self.frame_length).astype(np.float32)
+        rms = np.sqrt(np.mean(frames * frames, axis=1))
+        signs = np.signbit(frames)
+        zcr = np.count_nonzero(signs[:, 1:] != signs[:, :-1], axis=1) / (self.frame_length - 1)
+
+        for frame_rms, frame_zcr in zip(rms.tolist(), zcr.tolist()):
+            self._advance(frame_rms, frame_zcr)
+            if self.ended:
+                break
+        return self.state
+
+    def _is_speech(self, rms, zcr):
+        threshold = max(MIN_SPEECH_RMS, self.noise_rms * ENERGY_RATIO)
+        if rms < threshold:
+            return False
+        # 高过零率的帧只有能量足够突出时才算语音（清辅音），否则是噪声
+        return zcr < MAX_SPEECH_ZCR or rms > 2 * threshold
+
+    def _advance(self, rms, zcr):
+        self.frames += 1
+
+        if self.noise_rms is None:
+            # 开头几帧估计环境噪声
+            self._noise_samples.append(rms)
+            if len(self._noise_samples) >= self._noise_frames:
+                self.noise_rms = float(np.median(self._noise_samples))
+            return
+
+        speech = self._is_speech(rms, zcr)
+        if not speech:
+            self.noise_rms += NOISE_ADAPT_RATE * (rms - self.noise_rms)
+
+        if self.state == self.WAITING:
+            self._run = self._run + 1 if speech else 0
+            if self._run >= self._start_frames:
+                self.state = self.SPEECH
+                self.speech_frames += self._run
+                self._run = 0
+            elif self.no_speech_timeout is not None and self.elapsed >= self.no_speech_timeout:
+                self.state = self.ENDED
+            return
+
+        if speech:
+            self.speech_frames += 1
+            self.state = self.SPEECH
+            self._run = 0
+            return
+
+        self.state = self.SILENCE
+        self._run += 1
+        if self._run * FRAME_SECONDS >= self.trailing_silence:
+            self.state = self.ENDED
@@ -0,0 +1,345 @@
+"""
+常驻相机服务
+
+相机只初始化一次并保持运行，自动曝光/白平衡持续收敛，拍照时直接取下一帧保存，
+不再为每张照片启动解释器、初始化传感器并等待2秒。
+
+picamera2 只安装在系统 Python（/usr/bin/python3）中：
+- 当前解释器能导入 picamera2 时，直接在进程内使用 CameraService
+- 否则用系统 Python 启动一个常驻守护进程（本文件 --serve），通过 Unix socket 请求拍照
+守护进程空闲一段时间或父进程退出后自动释放相机。
+"""
+
+import io
+import json
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+import numpy as np
+
+try:
+    from picamera2 import Picamera2
+except ImportError:
+    Picamera2 = None
+
+SYSTEM_PYTHON = "/usr/bin/python3"
+SOCKET_PATH = os.path.join(tempfile.gettempdir(), "derive-camera.sock")
+
+WARMUP_TIMEOUT_SECONDS = 2.0   # 等待自动曝光收敛的最长时间
+IDLE_TIMEOUT_SECONDS = 300     # 守护进程空闲多久后释放相机并退出
+START_TIMEOUT_SECONDS = 15.0   # 等待守护进程就绪的最长时间
+CAPTURE_TIMEOUT_SECONDS = 10.0
+LORES_SIZE = (320, 240)        # 取景器用的低分辨率YUV420流，与LCD同尺寸
+
+
+class CameraService:
+    """保持相机运行的进程内拍照服务"""
+
+    def __init__(self):
+        self.picam2 = None
+        self._lock = threading.Lock()
+
+    @property
+    def running(self):
+        return self.picam2 is not None
+
+    def start(self):
+        """配置并启动相机，等待自动曝光收敛（已启动时直接返回）"""
+        with self._lock:
+            if self.picam2 is not None:
+                return
+            if Picamera2 is None:
+                raise RuntimeError("当前Python环境中没有picamera2")
+
+            print("📷 启动常驻相机...")
+            picam2 = Picamera2()
+            # 双流配置：全分辨率main流用于拍照，lores流用于LCD取景
+            picam2.configure(picam2.create_still_configuration(
+                lores={"size": LORES_SIZE, "format": "YUV420"}))
+            picam2.start()
+            self._wait_for_exposure(picam2)
+            self.picam2 = picam2
+            print("📷 相机已就绪")
+
+    def _wait_for_exposure(self, picam2):
+        """等待自动曝光锁定，旧版libcamera没有AeLocked时等到超时"""
+        deadline = time.time() + WARMUP_TIMEOUT_SECONDS
+        while time.time() < deadline:
+            if picam2.capture_metadata().get("AeLocked"):
+                return
+
+    def capture(self, filename):
+        """拍摄一张照片保存到 filename
+
+        Returns:
+            float: 从请求到文件写完的耗时（秒）
+        """
+        self.start()
+        start = time.time()
+        with self._lock:
+            self.picam2.capture_file(filename)
+        elapsed = time.time() - start
+        print(f"照片已保存: {filename} ({elapsed * 1000:.0f}ms)")
+        return elapsed
+
+    def capture_jpeg(self):
+        """拍摄一张照片，直接返回内存中的JPEG数据"""
+        self.start()
+        start = time.time()
+        buffer = io.BytesIO()
+        with self._lock:
+            self.picam2.capture_file(buffer, format="jpeg")
+        print(f"照片已拍摄: {buffer.tell()} bytes ({(time.time() - start) * 1000:.0f}ms)")
+        return buffer.getvalue()
+
+    def capture_lores(self):
+        """取一帧lores流图像，(高*3/2, 宽) 的YUV420数组"""
+        self.start()
+        return self.picam2.capture_array("lores")
+
+    def stop(self):
+        """停止并释放相机"""
+        with self._lock:
+            if self.picam2 is None:
+                return
+            try:
+                self.picam2.stop()
+                self.picam2.close()
+            except Exception as e:
+                print(f"关闭相机时出错: {e}")
+            self.picam2 = None
+
+
+class CameraClient:
+    """通过Unix socket请求常驻相机守护进程拍照"""
+
+    def __init__(self, socket_path=SOCKET_PATH):
+        self.socket_path = socket_path
+        self._process = None
+        self._lock = threading.Lock()
+        self._ready = False  # 最近一次请求成功，守护进程可用
+
+    def _request(self, message, timeout):
+        """发送一条请求，返回 (应答, 应答后附带的数据)"""
+        try:
+            with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+                sock.settimeout(timeout)
+                sock.connect(self.socket_path)
+                sock.sendall(json.dumps(message).encode("utf-8") + b"\n")
+                with sock.makefile("rb") as reader:
+                    line = reader.readline()
+                    if not line:
+                        raise RuntimeError("相机守护进程没有响应")
+                    reply = json.loads(line)
+                    payload = reader.read(reply.get("bytes", 0))
+        except OSError:
+            self._ready = False  # 守护进程已退出（例如空闲超时），下次请求时重新启动
+            raise
+        if not reply.get("ok"):
+            raise RuntimeError(reply.get("error", "相机守护进程出错"))
+        return reply, payload
+
+    def start(self):
+        """确保守护进程已运行且相机已就绪"""
+        if self._ready:
+            return
+        with self._lock:
+            try:
+                self._request({"cmd": "ping"}, timeout=1.0)
+                self._ready = True
+                return
+            except (OSError, RuntimeError, ValueError):
+                pass
+
+            print("📷 启动相机守护进程...")
+            self._process = subprocess.Popen(
+                [SYSTEM_PYTHON, os.path.abspath(__file__), "--serve",
+                 "--socket", self.socket_path, "--parent-pid", str(os.getpid())])
+
+            deadline = time.time() + START_TIMEOUT_SECONDS
+            while time.time() < deadline:
+                if self._process.poll() is not None:
+                    raise RuntimeError(f"相机守护进程启动失败，退出码: {self._process.returncode}")
+                try:
+                    self._request({"cmd": "ping"}, timeout=1.0)
+                    self._ready = True
+                    return
+                except (OSError, RuntimeError, ValueError):
+                    time.sleep(0.1)
+            raise RuntimeError("等待相机守护进程就绪超时")
+
+    def _call(self, message):
+        """确保守护进程可用后发送请求，守护进程刚好退出时重启一次"""
+        self.start()
+        try:
+            reply, payload = self._request(message, timeout=CAPTURE_TIMEOUT_SECONDS)
+        except OSError:
+            self.start()
+            reply, payload = self._request(message, timeout=CAPTURE_TIMEOUT_SECONDS)
+        if len(payload) != reply.get("bytes", 0):
+            raise RuntimeError("相机数据不完整")
+        return reply, payload
+
+    def capture(self, filename):
+        reply, _ = self._call({"cmd": "capture", "path": os.path.abspath(filename)})
+        return reply.get("elapsed", 0.0)
+
+    def capture_jpeg(self):
+        _, payload = self._call({"cmd": "capture_jpeg"})
+        return payload
+
+    def capture_lores(self):
+        reply, payload = self._call({"cmd": "lores"})
+        return np.frombuffer(payload, dtype=np.uint8).reshape(reply["shape"])
+
+    def stop(self):
+        """请求守护进程释放相机并退出"""
+        try:
+            self._request({"cmd": "stop"}, timeout=2.0)
+        except (OSError, RuntimeError, ValueError):
+            pass
+        self._ready = False
+        if self._process is not None:
+            try:
+                self._process.wait(timeout=3.0)
+            except subprocess.TimeoutExpired:
+                self._process.kill()
+            self._process = None
+
+
+def _parent_alive(pid):
+    if pid is None:
+        return True
+    try:
+        os.kill(pid, 0)
+        return True
+    except OSError:
+        return False
+
+
+def serve(socket_path=SOCKET_PATH, parent_pid=None, idle_timeout=IDLE_TIMEOUT_SECONDS):
+    """守护进程主循环：相机常驻，逐个处理拍照请求"""
+    camera = CameraService()
+    camera.start()
+
+    if os.path.exists(socket_path):
+        os.remove(socket_path)
+    server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    server.bind(socket_path)
+    server.listen(4)
+    server.settimeout(1.0)
+    last_used = time.time()
+
+    try:
+        while _parent_alive(parent_pid) and time.time() - last_used < idle_timeout:
+            try:
+                conn, _ = server.accept()
+            except socket.timeout:
+                continue
+
+            with conn:
+                conn.settimeout(CAPTURE_TIMEOUT_SECONDS)
+                with conn.makefile("rb") as reader:
+                    line = reader.readline()
+                payload = b""
+                try:
+                    message = json.loads(line)
+                    cmd = message.get("cmd")
+                    if cmd == "capture_jpeg":
+                        payload = camera.capture_jpeg()
+                        reply = {"ok": True, "bytes": len(payload)}
+                        last_used = time.time()
+                    elif cmd == "lores":
+                        frame = camera.capture_lores()
+                        payload = frame.tobytes()
+                        reply = {"ok": True, "bytes": len(payload), "shape": list(frame.shape)}
+                        last_used = time.time()
+                    elif cmd == "capture":
+                        reply = {"ok": True, "elapsed": camera.capture(message["path"])}
+                        last_used = time.time()
+                    elif cmd == "ping":
+                        reply = {"ok": True}
+                    elif cmd == "stop":
+                        conn.sendall(b'{"ok": true}\n')
+                        break
+                    else:
+                        reply = {"ok": False, "error": f"未知命令: {cmd}"}
+                except Exception as e:
+                    reply = {"ok": False, "error": str(e)}
+                conn.sendall(json.dumps(reply).encode("utf-8") + b"\n" + payload)
+    finally:
+        server.close()
+        if os.path.exists(socket_path):
+            os.remove(socket_path)
+        camera.stop()
+        print("📷 相机守护进程已退出")
+
+
+_camera = None
+_camera_lock = threading.Lock()
+
+
+def get_camera():
+    """进程内共享的相机：能导入picamera2时在进程内运行，否则使用守护进程"""
+    global _camera
+    with _camera_lock:
+        if _camera is None:
+            _camera = CameraService() if Picamera2 is not None else CameraClient()
+        return _camera
+
+
+def warm_up_async():
+    """在后台启动相机，让第一次拍照也不必等待初始化"""
+    def worker():
+        try:
+            get_camera().start()
+        except Exception as e:
+            print(f"⚠️ 相机预热失败: {e}")
+
+    thread = threading.Thread(target=worker, name="camera-warmup", daemon=True)
+    thread.start()
+    return thread
+
+
+def capture_photo(filename):
+    """用常驻相机拍照
+
+    Returns:
+        float: 拍照耗时（秒）
+    """
+    return get_camera().capture(filename)
+
+
+def capture_jpeg():
+    """用常驻相机拍照，返回内存中的JPEG数据（不写磁盘）"""
+    return get_camera().capture_jpeg()
+
+
+def shutdown_camera():
+    """释放相机（进程退出或不再需要拍照时调用）"""
+    global _camera
+    with _camera_lock:
+        camera, _camera = _camera, None
+    if camera is not None:
+        camera.stop()
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="常驻相机服务")
+    parser.add_argument("--serve", action="store_true", help="作为守护进程运行")
+    parser.add_argument("--socket", default=SOCKET_PATH)
+    parser.add_argument("--parent-pid", type=int, default=None)
+    args = parser.parse_args()
+
+    if args.serve:
+        serve(args.socket, args.parent_pid)
+    else:
+        capture_photo("current_image.jpg")
+        shutdown_camera()
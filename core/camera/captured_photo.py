@@ -0,0 +1,133 @@
+"""
+内存中的照片
+
+拍照得到的JPEG数据保存在 CapturedPhoto 中，预览、上传分析（base64）和存档
+都直接使用这份内存数据：
+- 预览：从内存按比例缩小解码，直接送屏
+- 分析：base64编码只做一次
+- 存档：在后台线程写入磁盘，不阻塞拍照到发送请求之间的流程；
+  退出前用 wait_pending_saves() 等待尚未写完的存档
+写入的路径会登记到最近照片表中，之后按路径访问（例如 encode_image）时直接命中内存。
+"""
+
+import base64
+import os
+import threading
+import time
+from collections import OrderedDict
+from io import BytesIO
+
+from PIL import Image
+
+from core.display.image_loader import load_preview_image
+
+MAX_RECENT_PHOTOS = 4  # 按路径保留在内存中的最近照片数
+
+_recent = OrderedDict()  # 绝对路径 -> CapturedPhoto
+_recent_lock = threading.Lock()
+
+_pending_writers = set()  # 尚未写完的存档线程
+_pending_lock = threading.Lock()
+
+
+class CapturedPhoto:
+    """一次拍摄的JPEG照片"""
+
+    def __init__(self, jpeg, quality=None):
+        """
+        Args:
+            jpeg: JPEG编码的照片数据
+            quality: 拍摄时的质量评分（PhotoScore，可选）
+        """
+        self.jpeg = bytes(jpeg)
+        self.quality = quality
+        self._size = None
+        self._base64 = None
+        self._writers = []
+
+    @property
+    def size(self):
+        """照片尺寸 (宽, 高)，只解析JPEG头"""
+        if self._size is None:
+            with Image.open(BytesIO(self.jpeg)) as img:
+                self._size = img.size
+        return self._size
+
+    def to_base64(self):
+        """base64编码的JPEG（只编码一次）"""
+        if self._base64 is None:
+            self._base64 = base64.b64encode(self.jpeg).decode("utf-8")
+        return self._base64
+
+    def data_url(self):
+        return f"data:image/jpeg;base64,{self.to_base64()}"
+
+    def preview(self, size):
+        """解码为指定尺寸的预览图（RGB）"""
+        img = load_preview_image(self.jpeg, size)
+        if img.size != tuple(size):
+            img = img.resize(size, Image.BILINEAR)
+        return img
+
+    def save_async(self, path):
+        """在后台线程中把照片写入 path，并登记为该路径的内存副本
+
+        Returns:
+            threading.Thread: 写入线程
+        """
+        path = os.path.abspath(path)
+        _remember(path, self)
+
+        def worker():
+            tmp_path = f"{path}.{threading.get_ident()}.tmp"
+            try:
+                with open(tmp_path, "wb") as f:
+                    f.write(self.jpeg)
+                os.replace(tmp_path, path)
+            except OSError as e:
+                print(f"⚠️ 保存照片失败 {path}: {e}")
+            finally:
+                with _pending_lock:
+                    _pending_writers.discard(threading.current_thread())
+
+        thread = threading.Thread(target=worker, name="photo-archive", daemon=True)
+        self._writers.append(thread)
+        with _pending_lock:
+            _pending_writers.add(thread)
+        thread.start()
+        return thread
+
+    def wait_saved(self, timeout=None):
+        """等待所有后台写入完成（需要照片文件已在磁盘上时调用）"""
+        for thread in self._writers:
+            thread.join(timeout)
+
+
+def wait_pending_saves(timeout=None):
+    """等待所有照片的后台存档写完（进程退出前调用，存档线程是守护线程）
+
+    Returns:
+        bool: 是否在超时前全部写完
+    """
+    with _pending_lock:
+        writers = list(_pending_writers)
+    deadline = None if timeout is None else time.monotonic() + timeout
+    for thread in writers:
+        thread.join(None if deadline is None else max(0.0, deadline - time.monotonic()))
+    return not any(thread.is_alive() for thread in writers)
+
+
+def _remember(path, photo):
+    with _recent_lock:
+        _recent[path] = photo
+        _recent.move_to_end(path)
+        while len(_recent) > MAX_RECENT_PHOTOS:
+            _recent.popitem(last=False)
+
+
+def get_captured_photo(path):
+    """按路径查找仍在内存中的照片，没有时返回None"""
+    if not path:
+        return None
+    with _recent_lock:
+        return _recent.get(os.path.abspath(path))
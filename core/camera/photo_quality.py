@@ -0,0 +1,109 @@
+"""
+照片质量评估
+
+在发送给视觉模型之前，在本地给照片打分，避免为模糊或过暗的照片浪费一次请求：
+- 清晰度：灰度图拉普拉斯算子响应的方差（优先使用 OpenCV，没有时用 NumPy 计算）
+- 曝光：平均亮度，以及接近全黑/全白的像素比例
+连拍时每张照片按缩小解码后的图像评分，只保留得分最高的一张；
+某一张已经合格时立即停止，清晰的照片不必等待后面几张。
+"""
+
+import time
+from typing import NamedTuple, Optional
+
+import numpy as np
+
+from core.display.image_loader import load_preview_image
+
+try:
+    import cv2
+except ImportError:
+    cv2 = None
+
+SCORE_SIZE = (640, 480)      # 评分用的缩小尺寸
+BURST_COUNT = 3              # 连拍张数
+BURST_INTERVAL_SECONDS = 0.1
+
+MIN_SHARPNESS = 60.0         # 低于该拉普拉斯方差视为模糊
+MIN_BRIGHTNESS = 40.0        # 平均亮度过低视为太暗
+MAX_BRIGHTNESS = 220.0       # 平均亮度过高视为过曝
+MAX_CLIPPED_FRACTION = 0.5   # 超过一半像素全黑或全白
+DARK_LEVEL = 16
+BRIGHT_LEVEL = 240
+
+
+class PhotoScore(NamedTuple):
+    """一张照片的质量评分"""
+    sharpness: float         # 拉普拉斯方差
+    brightness: float        # 平均亮度 0-255
+    dark_fraction: float     # 接近全黑的像素比例
+    bright_fraction: float   # 接近全白的像素比例
+
+    @property
+    def score(self):
+        """用于连拍选优的综合得分：清晰度按曝光正常的像素比例打折"""
+        return self.sharpness * (1.0 - self.dark_fraction - self.bright_fraction)
+
+    @property
+    def problem(self) -> Optional[str]:
+        """照片的主要问题（用于提示用户重拍），没有问题时返回None"""
+        if self.brightness < MIN_BRIGHTNESS or self.dark_fraction > MAX_CLIPPED_FRACTION:
+            return "照片太暗"
+        if self.brightness > MAX_BRIGHTNESS or self.bright_fraction > MAX_CLIPPED_FRACTION:
+            return "照片过曝"
+        if self.sharpness < MIN_SHARPNESS:
+            return "照片模糊"
+        return None
+
+
+def laplacian_variance(gray):
+    """灰度图拉普拉斯响应的方差，越大越清晰"""
+    if cv2 is not None:
+        return float(cv2.Laplacian(gray, cv2.CV_32F).var())
+
+    g = gray.astype(np.float32)
+    lap = (g[1:-1, :-2] + g[1:-1, 2:] + g[:-2, 1:-1] + g[2:, 1:-1]
+           - 4.0 * g[1:-1, 1:-1])
+    return float(lap.var())
+
+
+def score_gray(gray):
+    """给 (H, W) uint8 灰度图评分"""
+    pixels = gray.size
+    return PhotoScore(
+        sharpness=laplacian_variance(gray),
+        brightness=float(gray.mean()),
+        dark_fraction=float(np.count_nonzero(gray <= DARK_LEVEL)) / pixels,
+        bright_fraction=float(np.count_nonzero(gray >= BRIGHT_LEVEL)) / pixels,
+    )
+
+
+def score_jpeg(jpeg):
+    """给JPEG数据评分（按缩小尺寸解码，不解出全分辨率图像）"""
+    img = load_preview_image(jpeg, SCORE_SIZE)
+    return score_gray(np.asarray(img.convert('L')))
+
+
+def capture_best(capture_jpeg, count=BURST_COUNT, interval=BURST_INTERVAL_SECONDS):
+    """连拍若干张，返回得分最高的一张（某一张没有质量问题时不再继续拍）
+
+    Args:
+        capture_jpeg: 拍一张照片并返回JPEG数据的函数
+        count: 连拍张数
+        interval: 两张之间的间隔（秒）
+
+    Returns:
+        (JPEG数据, PhotoScore)
+    """
+    best = None
+    for i in range(count):
+        if i and interval:
+            time.sleep(interval)
+        jpeg = capture_jpeg()
+        score = score_jpeg(jpeg)
+        print(f"📷 连拍 {i + 1}/{count}: 清晰度 {score.sharpness:.0f}, 亮度 {score.brightness:.0f}")
+        if best is None or score.score > best[1].score:
+            best = (jpeg, score)
+        if score.problem is None:
+            break
+    return best
@@ -0,0 +1,134 @@
+"""
+LCD取景器
+
+拍照前把相机lores流（320x240 YUV420）按固定帧率送到LCD，让用户对准目标：
+- 帧率由节拍循环控制，处理不过来时跳过错过的节拍并计入丢帧，不会越积越多
+- 送屏走LCD合成线程，合成线程来不及刷新时旧帧被新帧取代（同样计入丢帧）
+- 取景线程以较低的调度优先级运行，不与语音录制和OLED进度显示争抢CPU
+"""
+
+import os
+import threading
+import time
+
+import numpy as np
+
+from core.display.lcd_encoder import RGB565Encoder
+
+VIEWFINDER_FPS = 10
+VIEWFINDER_NICE = 10  # 取景线程的nice增量
+
+
+def yuv420_to_rgb(yuv, width, height):
+    """把 (高*3/2, 宽) 的YUV420（I420）数组转换为 (高, 宽, 3) 的RGB数组
+
+    色度在四分之一分辨率上计算后再放大，转换系数为全范围BT.601。
+    """
+    y = yuv[:height, :width].astype(np.int32)
+    chroma = yuv[height:].reshape(-1)
+    quarter = (height // 2) * (width // 2)
+    u = chroma[:quarter].reshape(height // 2, width // 2).astype(np.int32) - 128
+    v = chroma[quarter:2 * quarter].reshape(height // 2, width // 2).astype(np.int32) - 128
+
+    # 定点系数（放大 2^16）
+    r_off = (91881 * v) >> 16
+    g_off = (22554 * u + 46802 * v) >> 16
+    b_off = (116130 * u) >> 16
+
+    rgb = np.empty((height, width, 3), dtype=np.uint8)
+    for channel, offset in enumerate((r_off, -g_off, b_off)):
+        full = offset.repeat(2, axis=0).repeat(2, axis=1)
+        rgb[..., channel] = np.clip(y + full, 0, 255)
+    return rgb
+
+
+class Viewfinder:
+    """在后台线程中把相机lores流送到LCD"""
+
+    def __init__(self, camera, lcd_display, fps=VIEWFINDER_FPS):
+        """
+        Args:
+            camera: 提供 capture_lores() 的相机服务
+            lcd_display: LCD的 DisplayManager
+            fps: 目标帧率
+        """
+        self.camera = camera
+        self.lcd_display = lcd_display
+        self.interval = 1.0 / fps
+        self._encoder = RGB565Encoder(lcd_display.width, lcd_display.height)
+        self._stop = threading.Event()
+        self._thread = None
+        self._stats_lock = threading.Lock()
+
+        # 统计信息
+        self.frames_shown = 0
+        self.frames_late = 0        # 处理超时而跳过的节拍
+        self.frames_superseded = 0  # 被更新的帧取代、没有送屏的帧
+
+    @property
+    def running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self):
+        if self.running:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="viewfinder", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout=2.0):
+        """停止取景并等待线程退出"""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def _lower_priority(self):
+        try:
+            os.setpriority(os.PRIO_PROCESS, threading.get_native_id(), VIEWFINDER_NICE)
+        except (AttributeError, OSError):
+            pass
+
+    def _on_flushed(self, future):
+        if future.cancelled() or future.exception() is not None:
+            return
+        with self._stats_lock:
+            if future.result():
+                self.frames_shown += 1
+            else:
+                self.frames_superseded += 1
+
+    def _show(self, yuv):
+        height, width = self.lcd_display.height, self.lcd_display.width
+        rgb = yuv420_to_rgb(yuv, width, height)
+        # 编码器复用输出缓冲区，送屏在合成线程中异步进行，所以提交一份拷贝
+        frame = self._encoder.encode_array(rgb, rotate_180=True).copy()
+        self.lcd_display.show_frame(frame).add_done_callback(self._on_flushed)
+
+    def _run(self):
+        self._lower_priority()
+        next_time = time.monotonic()
+        while not self._stop.is_set():
+            try:
+                self._show(self.camera.capture_lores())
+            except Exception as e:
+                print(f"⚠️ 取景器出错: {e}")
+                self._stop.wait(1.0)
+                next_time = time.monotonic()
+                continue
+
+            next_time += self.interval
+            delay = next_time - time.monotonic()
+            if delay < 0:
+                # 落后时跳过错过的节拍，而不是连续补帧
+                missed = int(-delay // self.interval) + 1
+                with self._stats_lock:
+                    self.frames_late += missed
+                next_time += missed * self.interval
+                delay = next_time - time.monotonic()
+            self._stop.wait(max(0.0, delay))
+
+    def stats(self):
+        """返回 (已送屏帧数, 丢帧数)"""
+        with self._stats_lock:
+            return self.frames_shown, self.frames_late + self.frames_superseded
@@ -9,6 +9,10 @@ from .derive_states import DeriveState
 from .performance_optimizer import global_resource_manager, global_optimizer
 from core.display.display_utils import DisplayManager
 from core.input.button_utils import InputController
+from core.input.gestures import LONG_PRESS_SECONDS
+from core.camera.camera_service import warm_up_async, shutdown_camera
+from core.camera.captured_photo import wait_pending_saves
+from core.audio.stt_engines import preload_async as preload_stt_engines
 
 class DeriveContext:
     """漂流状态机的上下文，管理共享数据和资源"""
@@ -40,6 +44,11 @@ class DeriveContext:
         self.controller = InputController()
         self.resource_manager.acquire_resource("controller", self.controller)
         
+        # 提前启动常驻相机，拍照时无需再等待传感器初始化
+        warm_up_async()
+        # 提前建立语音识别连接并加载本地模型，两者在进程内常驻
+        preload_stt_engines()
+        
         # 初始参数
         self.initial_text = initial_text
         self.response_id = None
@@ -47,7 +56,7 @@ class DeriveContext:
         # 按钮2长按检测相关变量
         self.btn2_pressed_time = 0
         self.btn2_state = 1
-        self.btn2_long_press_threshold = 2.0
+        self.btn2_long_press_threshold = LONG_PRESS_SECONDS
         self.return_to_menu = False
         
         # 缓存项目根目录路径
@@ -165,6 +174,20 @@ class DeriveContext:
             # 使用资源管理器清理所有资源
             self.resource_manager.release_all()
             
+            # 等待显示合成线程送完剩余帧并释放SPI/I2C设备，避免GPIO清理后还在写屏
+            for display in (self.oled_display, self.lcd_display):
+                display.close(timeout=1.0)
+            
+            # 等待照片存档写完（存档线程是守护线程，退出时会被直接终止）
+            if not wait_pending_saves(timeout=3.0):
+                print("⚠️ 照片存档等待超时")
+            
+            # 释放相机
+            try:
+                shutdown_camera()
+            except Exception as e:
+                print(f"释放相机时出错: {e}")
+            
             # 清理 GPIO
             try:
                 GPIO.cleanup()
@@ -42,6 +42,14 @@ class DeriveLogger:
             return new_path
         return None
     
+    def save_photo(self, photo, filename, image_type):
+        """把内存中的照片（CapturedPhoto）在后台写入日志目录"""
+        new_path = os.path.join(self.log_dir, filename)
+        photo.save_async(new_path)
+        self.log_data["images"][image_type] = filename
+        self.save_log()
+        return new_path
+    
     def log_prompt(self, prompt_type, prompt):
         """记录提示词并立即保存日志"""
         self.log_data["prompts"][prompt_type] = prompt
@@ -1,4 +1,3 @@
-import subprocess
 import os
 import sys
 import base64
@@ -15,6 +14,10 @@ import replicate
 
 # 导入性能优化器
 from .performance_optimizer import global_optimizer, cached_api_call
+from core.display.image_cache import prepare_image_async
+from core.camera.camera_service import capture_jpeg
+from core.camera.captured_photo import CapturedPhoto, get_captured_photo, wait_pending_saves
+from core.camera.photo_quality import capture_best
 
 # 加载环境变量
 load_dotenv()
@@ -24,29 +27,73 @@ client = OpenAI(
     timeout=90.0  # 增加超时时间到90秒，避免长时间API调用超时
 )
 
-def chat_with_gpt(input_content, system_content=None, previous_response_id=None):
-    """与GPT进行对话"""
+class StreamInterrupted(RuntimeError):
+    """流式响应在收到完成事件之前中断（连接断开等），可以重试"""
+
+
+def chat_with_gpt(input_content, system_content=None, previous_response_id=None, on_delta=None):
+    """与GPT进行对话
+    
+    Args:
+        on_delta: 可选，流式接收生成文字的回调（参数为新增的文字片段）。
+                  流式模式下返回的仍是完整的响应对象，与非流式一致
+    """
     input_data = [{"role": "user", "content": input_content}]
     if system_content:
         input_data.insert(0, {"role": "system", "content": system_content})
-        
-    response = client.responses.create(
+    
+    if on_delta is None:
+        response = client.responses.create(
+            model="gpt-4o",
+            input=input_data,
+            previous_response_id=previous_response_id
+        )
+        return response
+    
+    stream = client.responses.create(
         model="gpt-4o",
         input=input_data,
-        previous_response_id=previous_response_id
+        previous_response_id=previous_response_id,
+        stream=True
     )
+    response = None
+    for event in stream:
+        if event.type == "response.output_text.delta":
+            on_delta(event.delta)
+        elif event.type in ("response.completed", "response.incomplete"):
+            response = event.response
+        elif event.type == "response.failed":
+            error = getattr(event.response, "error", None)
+            raise RuntimeError(f"响应生成失败: {getattr(error, 'message', error)}")
+        elif event.type == "error":
+            raise RuntimeError(f"流式响应出错: {event.message}")
+    
+    if response is None:
+        raise StreamInterrupted("流式响应意外结束")
     return response
 
 class DeriveChatUtils:
     """漂流聊天工具类，封装与GPT的对话功能"""
     
-    def __init__(self, initial_response_id=None):
+    def __init__(self, initial_response_id=None, on_text=None):
+        """
+        Args:
+            initial_response_id: 上一轮对话的ID
+            on_text: 可选，流式显示生成中文字的回调（参数为目前为止的完整文本），
+                     例如 DisplayManager.text_streamer()
+        """
         self.response_id = initial_response_id
+        self.on_text = on_text
         # 集成性能优化器
         self.optimizer = global_optimizer
     
-    def chat_with_continuity(self, prompt, system_content=None):
-        """带连续性的对话函数 - 优化版本，包含重试机制"""
+    def chat_with_continuity(self, prompt, system_content=None, on_text=None):
+        """带连续性的对话函数 - 优化版本，包含重试机制
+        
+        on_text（或构造时传入的回调）不为空时使用流式模式，边生成边回调，
+        返回的文本、response_id 和缓存行为与非流式一致
+        """
+        on_text = on_text or self.on_text
         max_retries = 3
         retry_delay = 2  # 秒
         
@@ -76,10 +123,23 @@ class DeriveChatUtils:
                 # 记录API调用
                 self.optimizer.record_api_call("gpt_chat")
                 
+                # 流式模式：累积增量文字，每次回调目前为止的完整文本（重试时重新累积）
+                on_delta = None
+                if on_text is not None:
+                    parts = []
+                    
+                    def on_delta(delta):
+                        parts.append(delta)
+                        try:
+                            on_text("".join(parts))
+                        except Exception as e:  # 显示出错不影响请求本身
+                            print(f"⚠️ 流式显示出错: {e}")
+                
                 response = chat_with_gpt(
                     input_content=prompt,
                     system_content=system_content,
-                    previous_response_id=self.response_id
+                    previous_response_id=self.response_id,
+                    on_delta=on_delta
                 )
                 self.response_id = response.id
                 
@@ -116,7 +176,8 @@ class DeriveChatUtils:
                     "Internal server error"
                 ]
                 
-                is_retryable = any(error_pattern.lower() in error_msg.lower() for error_pattern in retryable_errors)
+                is_retryable = isinstance(e, StreamInterrupted) or any(
+                    error_pattern.lower() in error_msg.lower() for error_pattern in retryable_errors)
                 
                 print(f"\n❌ 对话请求失败 (尝试 {attempt + 1}/{max_retries}): {error_msg[:200]}...")
                 
@@ -437,6 +498,9 @@ class DeriveImageUtils:
         
         print(f"图像已保存到: {image_path}")
         
+        # 后台生成LCD/OLED送屏帧，显示时不再解码
+        prepare_image_async(image_path)
+        
         # 保存图像到日志目录
         try:
             context.logger.save_image(image_path, image_type)
@@ -490,23 +554,65 @@ def cleanup_handler(signum, frame):
         print(f"清理过程中出错: {e}")
     finally:
         import os
+        wait_pending_saves(timeout=3.0)  # 照片存档写完再退出
         os._exit(0)  # 强制退出，避免卡死
 
-def run_camera_test():
-    """拍照函数"""
+def take_photo():
+    """用常驻相机拍照，返回内存中的照片
+
+    照片在后台写入项目根目录下的 current_image.jpg（供旧脚本使用），
+    调用者直接使用返回的 CapturedPhoto 预览、编码和存档，不必等待写盘。
+
+    Returns:
+        CapturedPhoto，拍照失败时返回None
+    """
     # 获取项目根目录
     current_file = os.path.abspath(__file__)
     project_root = os.path.dirname(os.path.dirname(os.path.dirname(current_file)))
-    camera_script = os.path.join(project_root, "core", "camera", "camera_manager.py")
 
     try:
-        print("启动拍照脚本...")
-        subprocess.run(["/usr/bin/python3", camera_script], check=True)
-        print("拍照完成。")
-    except subprocess.CalledProcessError as e:
-        print(f"拍照脚本运行出错: {e}")
+        print("开始拍照...")
+        # 按本地清晰度/曝光评分，第一张合格就直接使用，否则连拍几张保留最好的一张
+        jpeg, quality = capture_best(capture_jpeg)
+        photo = CapturedPhoto(jpeg, quality)
+        print(f"拍照完成。清晰度 {quality.sharpness:.0f}, 亮度 {quality.brightness:.0f}")
+        photo.save_async(os.path.join(project_root, "current_image.jpg"))
+        return photo
+    except Exception as e:
+        print(f"拍照出错: {e}")
+        return None
+
+def ask_retake_if_poor(context, photo):
+    """照片质量不合格时询问用户是否重拍（在发送任何网络请求之前）
+
+    Returns:
+        str: 'retake' 重拍，'keep' 继续使用这张照片，'menu' 用户长按返回菜单（不要再分析照片）
+    """
+    problem = photo.quality.problem if photo is not None and photo.quality else None
+    if problem is None:
+        return 'keep'
+
+    context.logger.log_step("照片质量", f"{problem}: {photo.quality}")
+    result = context.oled_display.wait_for_button_with_text(
+        context.controller,
+        f"{problem}\n按BT1重拍\n按BT2继续使用",
+        context=context
+    )
+    if result == 2 or context.should_return_to_menu():
+        return 'menu'
+    return 'retake' if context.controller.last_button == 'BTN1' else 'keep'
+
+def run_camera_test():
+    """拍照函数（照片写入 current_image.jpg 后返回）"""
+    photo = take_photo()
+    if photo is not None:
+        photo.wait_saved()
+    return photo
 
 def encode_image(image_path):
-    """编码图片成base64"""
+    """编码图片成base64（刚拍摄的照片直接使用内存中的数据）"""
+    photo = get_captured_photo(image_path)
+    if photo is not None:
+        return photo.to_base64()
     with open(image_path, "rb") as f:
         return base64.b64encode(f.read()).decode("utf-8") 
\ No newline at end of file
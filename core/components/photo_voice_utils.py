@@ -11,14 +11,21 @@ try:
     if stt_path not in sys.path:
         sys.path.append(stt_path)
     
-    from stt_utils import SpeechToText
+    from stt_utils import get_speech_to_text
     STT_AVAILABLE = True
 except ImportError as e:
     print(f"语音识别模块不可用: {e}")
     STT_AVAILABLE = False
 
+from core.audio.vad import VoiceActivityDetector
+
+# OLED上显示的识别中间结果字数（只显示最新的部分）
+INTERIM_DISPLAY_CHARS = 9
+
 # 导入相机模块
-from .derive_utils import run_camera_test
+from .derive_utils import take_photo, ask_retake_if_poor
+from core.camera.camera_service import get_camera
+from core.camera.viewfinder import Viewfinder
 
 class PhotoVoiceManager:
     """拍照+语音录制管理器 - 处理拍照脚本和并行语音录制（25秒）"""
@@ -32,10 +39,14 @@ class PhotoVoiceManager:
         
         # 录制配置
         self.voice_duration = 25   # 语音录制25秒（测试用，更充足的时间）
+        self.aim_seconds = 3       # 拍照前LCD取景的时间
         
         # 结果存储
         self.photo_taken = False
+        self.photo = None  # 拍摄的照片（CapturedPhoto，数据在内存中）
         self.voice_text = None
+        self.interim_text = ""  # 流式识别的中间结果
+        self.vad = None  # 语音活动检测，说完后提前结束录音
         self.voice_error = None
         
     def take_photo_with_voice(self) -> Tuple[bool, Optional[str], Optional[str]]:
@@ -51,6 +62,9 @@ class PhotoVoiceManager:
             # 重置状态
             self._reset_state()
             
+            # 麦克风在整个拍照+语音期间预采集，提示出现前开口说的话也能录进去
+            self._start_preroll()
+            
             # 显示准备界面
             self._show_preparation()
             
@@ -70,6 +84,17 @@ class PhotoVoiceManager:
             success = self._start_photo_voice_process()
             
             if success:
+                # 照片模糊或过暗时在分析前让用户重拍（已录制的语音保留）
+                while self.photo_taken:
+                    choice = ask_retake_if_poor(self.context, self.photo)
+                    if choice == 'menu':
+                        self.context.logger.log_step("用户操作", "用户长按返回菜单")
+                        return False, None, "用户取消操作"
+                    if choice != 'retake':
+                        break
+                    self.context.oled_display.show_text_oled("重新拍照\n请对准目标")
+                    self._camera_script_worker()
+                
                 self.context.logger.log_step("拍照+语音完成", f"照片: {self.photo_taken}, 语音: {self.voice_text[:50] if self.voice_text else 'None'}...")
                 return self.photo_taken, self.voice_text, None
             else:
@@ -81,12 +106,36 @@ class PhotoVoiceManager:
             error_msg = f"拍照+语音异常: {str(e)}"
             self.context.logger.log_step("拍照+语音错误", error_msg)
             return False, None, error_msg
+        finally:
+            self._stop_preroll()
+    
+    def _get_stt(self):
+        """进程内共享的语音识别器"""
+        return get_speech_to_text(language_code='zh-CN', channels=1)
+    
+    def _start_preroll(self):
+        """启动麦克风预采集（失败时录音仍会单独打开麦克风）"""
+        if not STT_AVAILABLE:
+            return
+        try:
+            self._get_stt().start_preroll()
+        except Exception as e:
+            print(f"⚠️ 麦克风预采集启动失败: {e}")
+    
+    def _stop_preroll(self):
+        if not STT_AVAILABLE:
+            return
+        try:
+            self._get_stt().stop_preroll()
+        except Exception as e:
+            print(f"⚠️ 停止麦克风预采集失败: {e}")
     
     def _reset_state(self):
         """重置内部状态"""
         self.is_countdown_active = False
         self.is_voice_recording = False
         self.photo_taken = False
+        self.photo = None
         self.voice_text = None
         self.voice_error = None
     
@@ -105,9 +154,8 @@ class PhotoVoiceManager:
                 target=self._camera_script_worker
             )
             
-            # 显示开始提示
-            self.context.oled_display.show_text_oled("即将开始\n对准周围环境+说话...")
-            time.sleep(1)
+            # 显示开始提示（预采集已在运行，不需要等待麦克风就绪）
+            self.context.oled_display.show_text_oled("开始\n对准周围环境+说话...")
             
             # 先启动拍照脚本
             self.is_countdown_active = True
@@ -138,11 +186,8 @@ class PhotoVoiceManager:
         try:
             self.context.logger.log_step("语音录制", "在主线程开始25秒语音录制")
             
-            # 创建语音识别实例
-            stt = SpeechToText(
-                language_code='zh-CN',
-                channels=1
-            )
+            # 取得进程内共享的语音识别器（客户端和设备检查只在第一次时进行）
+            stt = self._get_stt()
             
             # 在主线程中执行录音，同时显示进度
             start_time = time.time()
@@ -154,8 +199,12 @@ class PhotoVoiceManager:
             )
             self.progress_thread.start()
             
-            # 主线程执行录音（阻塞）
-            self.voice_text = stt.record_and_transcribe(duration=self.voice_duration)
+            # 主线程边录音边识别（阻塞），检测到说完后提前结束，录音结束时识别也基本完成
+            self.interim_text = ""
+            self.vad = VoiceActivityDetector(stt.recognizer_samplerate)
+            self.voice_text = stt.stream_transcribe(duration=self.voice_duration, on_interim=self._on_interim,
+                                                    vad=self.vad)
+            self.context.logger.log_step("语音预处理", stt.last_preprocess.describe())
             
             # 录音完成，停止进度显示
             self.is_voice_recording = False
@@ -180,29 +229,41 @@ class PhotoVoiceManager:
             return False
     
     def _camera_script_worker(self):
-        """拍照脚本工作线程 - 直接启动camera脚本"""
+        """拍照工作线程 - LCD取景一段时间后拍照"""
+        viewfinder = Viewfinder(get_camera(), self.context.lcd_display)
         try:
-            self.context.logger.log_step("拍照脚本", "启动run camera脚本")
-            # 直接调用camera脚本，让脚本自己处理倒计时和拍照
-            run_camera_test()
-            self.photo_taken = True
-            self.context.logger.log_step("拍照完成", "camera脚本执行完成")
+            self.context.logger.log_step("拍照", f"LCD取景{self.aim_seconds}秒后拍照")
+            viewfinder.start()
+            time.sleep(self.aim_seconds)
+            
+            # 取景画面仍在刷新，直接从同一相机会话拍摄全分辨率照片
+            self.photo = take_photo()
+            self.photo_taken = self.photo is not None
+            self.context.logger.log_step("拍照完成", f"照片: {'成功' if self.photo_taken else '失败'}")
                 
         except Exception as e:
-            self.voice_error = f"拍照脚本失败: {str(e)}"
+            self.voice_error = f"拍照失败: {str(e)}"
             self.photo_taken = False
             self.context.logger.log_step("拍照失败", str(e))
         finally:
+            viewfinder.stop()
+            shown, dropped = viewfinder.stats()
+            self.context.logger.log_step("取景器", f"送屏 {shown} 帧，丢帧 {dropped} 帧")
             self.is_countdown_active = False
     
+    def _on_interim(self, text: str):
+        """流式识别中间结果回调"""
+        self.interim_text = text
+    
     def _progress_display_worker(self, start_time: float):
         """进度显示工作线程 - 显示语音录制进度"""
         while self.is_voice_recording:
             elapsed = time.time() - start_time
             
             # 生成语音录制进度显示
+            # 进度文字每次都不同，用不分页、不缓存的方式显示
             progress_text = self._generate_voice_progress(elapsed)
-            self.context.oled_display.show_text_oled(progress_text)
+            self.context.oled_display.show_text_tail(progress_text)
             
             time.sleep(0.5)  # 0.5秒更新一次
     
@@ -218,11 +279,15 @@ class PhotoVoiceManager:
         voice_bar = '#' * voice_filled + '-' * (bar_length - voice_filled)
         percentage = int(voice_progress * 100)
         
-        # 简化显示（3行）
+        # 简化显示（3行），识别出文字后第3行改为显示最新的文字
         if STT_AVAILABLE:
-            display_text = f"语音录制中\n"
+            status = self.vad.describe() if self.vad else "语音录制中"
+            display_text = f"{status}\n"
             display_text += f"[{voice_bar}] {percentage}%\n"
-            display_text += f"剩余 {remaining_time:.0f} 秒"
+            if self.interim_text:
+                display_text += self.interim_text[-INTERIM_DISPLAY_CHARS:]
+            else:
+                display_text += f"最长剩余 {remaining_time:.0f} 秒"
         else:
             display_text = "拍照模式\n"
             display_text += "语音功能不可用\n"
@@ -1,6 +1,5 @@
 import os
 import shutil
-from PIL import Image
 from ..derive_utils import run_camera_test, encode_image
 
 class PhotoHandlers:
@@ -50,8 +49,7 @@ class PhotoHandlers:
             timestamped_key = state_machine.save_photo_with_timestamp(photo_path, is_new_photo)
             
             # 在LCD上显示照片
-            img = Image.open(photo_path)
-            state_machine.lcd_display.show_image(img)
+            state_machine.lcd_display.show_image(photo_path)
             
             state_machine.logger.log_step(log_step, f"{'新' if is_new_photo else ''}照片已保存: {state_machine.data[timestamped_key]}")
             
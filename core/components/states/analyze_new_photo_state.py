@@ -5,6 +5,7 @@ import os
 from ..abstract_state import AbstractState
 from ..derive_states import DeriveState
 from ..derive_utils import DeriveChatUtils, encode_image
+from core.camera.captured_photo import get_captured_photo
 
 class AnalyzeNewPhotoState(AbstractState):
     """分析新照片状态 - 结合照片和语音信息"""
@@ -28,20 +29,25 @@ class AnalyzeNewPhotoState(AbstractState):
             context.logger.log_step("🔍 新照片分析调试", f"开始分析新照片")
             context.logger.log_step("📁 新照片路径", f"路径: {new_photo_path}")
             context.logger.log_step("🗣️ 语音文本", f"长度: {len(voice_text)}, 内容: {voice_text[:50]}...")
-            context.logger.log_step("📁 文件存在检查", f"文件存在: {os.path.exists(new_photo_path)}")
+            photo = get_captured_photo(new_photo_path)
+            if photo is not None:
+                # 刚拍摄的照片还在内存中，不必等待写盘或重新读取文件
+                context.logger.log_step("🖼️ 图片验证", f"格式: JPEG（内存）, 尺寸: {photo.size}, 大小: {len(photo.jpeg)} bytes")
+            else:
+                context.logger.log_step("📁 文件存在检查", f"文件存在: {os.path.exists(new_photo_path)}")
             
-            if os.path.exists(new_photo_path):
-                file_size = os.path.getsize(new_photo_path)
-                context.logger.log_step("📏 文件大小", f"大小: {file_size} bytes")
+                if os.path.exists(new_photo_path):
+                    file_size = os.path.getsize(new_photo_path)
+                    context.logger.log_step("📏 文件大小", f"大小: {file_size} bytes")
                 
-                # 验证图片
-                try:
-                    from PIL import Image
-                    with Image.open(new_photo_path) as img:
-                        context.logger.log_step("🖼️ 图片验证", f"格式: {img.format}, 尺寸: {img.size}")
-                except Exception as e:
-                    context.logger.log_step("❌ 图片验证失败", f"错误: {str(e)}")
-                    raise ValueError(f"无效的图片文件: {str(e)}")
+                    # 验证图片
+                    try:
+                        from PIL import Image
+                        with Image.open(new_photo_path) as img:
+                            context.logger.log_step("🖼️ 图片验证", f"格式: {img.format}, 尺寸: {img.size}")
+                    except Exception as e:
+                        context.logger.log_step("❌ 图片验证失败", f"错误: {str(e)}")
+                        raise ValueError(f"无效的图片文件: {str(e)}")
             
             # 编码图片为base64
             context.logger.log_step("🔄 Base64编码", "开始编码...")
@@ -63,7 +69,7 @@ class AnalyzeNewPhotoState(AbstractState):
             context.logger.log_step("🎯 第一步", "开始简单新照片描述")
             
             # 使用聊天工具分析照片和语音
-            chat_utils = DeriveChatUtils(context.response_id)
+            chat_utils = DeriveChatUtils(context.response_id, on_text=context.oled_display.text_streamer())
             
             # 第一步：简单描述提示
             simple_description_prompt = "请简单描述这张照片中看到的内容。"
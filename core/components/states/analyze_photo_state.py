@@ -4,6 +4,7 @@ import os
 from ..abstract_state import AbstractState
 from ..derive_states import DeriveState
 from ..derive_utils import DeriveChatUtils, encode_image
+from core.camera.captured_photo import get_captured_photo
 
 class AnalyzePhotoState(AbstractState):
     """分析照片状态"""
@@ -23,20 +24,25 @@ class AnalyzePhotoState(AbstractState):
         # 添加详细调试信息
         context.logger.log_step("🔍 分析照片调试", f"开始分析照片")
         context.logger.log_step("📁 照片路径", f"路径: {photo_path}")
-        context.logger.log_step("📁 文件存在检查", f"文件存在: {os.path.exists(photo_path)}")
+        photo = get_captured_photo(photo_path)
+        if photo is not None:
+            # 刚拍摄的照片还在内存中，不必等待写盘或重新读取文件
+            context.logger.log_step("🖼️ 图片验证", f"格式: JPEG（内存）, 尺寸: {photo.size}, 大小: {len(photo.jpeg)} bytes")
+        else:
+            context.logger.log_step("📁 文件存在检查", f"文件存在: {os.path.exists(photo_path)}")
         
-        if os.path.exists(photo_path):
-            file_size = os.path.getsize(photo_path)
-            context.logger.log_step("📏 文件大小", f"大小: {file_size} bytes")
+            if os.path.exists(photo_path):
+                file_size = os.path.getsize(photo_path)
+                context.logger.log_step("📏 文件大小", f"大小: {file_size} bytes")
             
-            # 验证图片
-            try:
-                from PIL import Image
-                with Image.open(photo_path) as img:
-                    context.logger.log_step("🖼️ 图片验证", f"格式: {img.format}, 尺寸: {img.size}")
-            except Exception as e:
-                context.logger.log_step("❌ 图片验证失败", f"错误: {str(e)}")
-                raise Exception(f"无效的图片文件: {str(e)}")
+                # 验证图片
+                try:
+                    from PIL import Image
+                    with Image.open(photo_path) as img:
+                        context.logger.log_step("🖼️ 图片验证", f"格式: {img.format}, 尺寸: {img.size}")
+                except Exception as e:
+                    context.logger.log_step("❌ 图片验证失败", f"错误: {str(e)}")
+                    raise Exception(f"无效的图片文件: {str(e)}")
         
         # 编码图片为base64
         context.logger.log_step("🔄 Base64编码", "开始编码...")
@@ -47,7 +53,7 @@ class AnalyzePhotoState(AbstractState):
         context.logger.log_step("🔗 Data URL", f"总长度: {len(data_url)} 字符")
         
         # 使用聊天工具分析照片
-        chat_utils = DeriveChatUtils(context.response_id)
+        chat_utils = DeriveChatUtils(context.response_id, on_text=context.oled_display.text_streamer())
         
         # 构建分析照片的输入
         input_content = [
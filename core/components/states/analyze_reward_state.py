@@ -23,7 +23,9 @@ class AnalyzeRewardState(AbstractState):
             original_photo_analysis = context.get_data('photo_description', '')
             
             # 使用聊天工具分析奖励
-            chat_utils = DeriveChatUtils(context.response_id)
+            # 回复是JSON，生成过程中只显示进度
+            chat_utils = DeriveChatUtils(context.response_id, on_text=context.oled_display.text_streamer(
+                "史莱姆在想\n给什么奖励...", show_text=False))
             
             reward_prompt = f"""
             作为一个有执念的史莱姆，我需要根据这张新照片给出合适的奖励。
@@ -13,7 +13,7 @@ class AskPhotoState(AbstractState):
     def execute(self, context) -> None:
         """执行询问拍照逻辑"""
         # 使用聊天工具生成询问语句
-        chat_utils = DeriveChatUtils(context.response_id)
+        chat_utils = DeriveChatUtils(context.response_id, on_text=context.oled_display.text_streamer())
         
         photo_question = chat_utils.generate_text('photo_question', text=context.get_data('personality'))
         context.response_id = chat_utils.response_id
@@ -23,7 +23,7 @@ class GenerateFeedbackState(AbstractState):
             slime_obsession = context.get_slime_attribute('obsession')
             
             # 使用聊天工具生成反馈
-            chat_utils = DeriveChatUtils(context.response_id)
+            chat_utils = DeriveChatUtils(context.response_id, on_text=context.oled_display.text_streamer())
             
             feedback_prompt = f"""
             作为一个有执念的史莱姆，我刚刚给了玩家一个{reward_level}级的奖励"{reward_description}"。
@@ -23,7 +23,7 @@ class InitState(AbstractState):
         context.logger.log_step("获取心情文本", f"使用心情: {mood_text[:50]}...")
         
         # 使用聊天工具生成性格
-        chat_utils = DeriveChatUtils(context.response_id)
+        chat_utils = DeriveChatUtils(context.response_id, on_text=context.oled_display.text_streamer())
         
         # 生成史莱姆性格
         personality = chat_utils.generate_text(
@@ -85,7 +85,8 @@ class InitState(AbstractState):
                 try:
                     response = chat_utils.chat_with_continuity(
                         system_content="你是一个数据提取助手。你的任务是准确提取文本中的关键信息，并以JSON格式返回，不添加任何其他内容，如代码块标记、注释等。",
-                        prompt=prompt
+                        prompt=prompt,
+                        on_text=context.oled_display.text_streamer("正在提取\n性格属性...", show_text=False)
                     )
                     context.response_id = chat_utils.response_id
                     
@@ -85,7 +85,7 @@ class ProcessMoodState(AbstractState):
             )
             
             # 使用聊天工具处理心情
-            chat_utils = DeriveChatUtils(context.response_id)
+            chat_utils = DeriveChatUtils(context.response_id, on_text=context.oled_display.text_streamer())
             
             processed_mood = chat_utils.generate_text(
                 'mood_extraction',
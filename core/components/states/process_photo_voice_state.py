@@ -4,6 +4,7 @@ import os
 from ..abstract_state import AbstractState
 from ..derive_states import DeriveState
 from ..derive_utils import DeriveChatUtils, encode_image
+from core.camera.captured_photo import get_captured_photo
 
 class ProcessPhotoVoiceState(AbstractState):
     """处理拍照+语音数据状态"""
@@ -50,32 +51,37 @@ class ProcessPhotoVoiceState(AbstractState):
             context.logger.log_step("📁 照片路径", f"原始路径: {photo_path}")
             context.logger.log_step("🗣️ 语音文本", f"文本长度: {len(voice_text)}, 内容: {voice_text[:100]}...")
             
-            # 检查照片文件是否存在
-            if not os.path.exists(photo_path):
-                raise FileNotFoundError(f"照片文件不存在: {photo_path}")
-            
-            # 获取绝对路径
-            abs_photo_path = os.path.abspath(photo_path)
-            context.logger.log_step("📁 绝对路径", f"绝对路径: {abs_photo_path}")
-            
-            # 检查文件大小
-            file_size = os.path.getsize(photo_path)
-            context.logger.log_step("📏 文件大小", f"文件大小: {file_size} bytes")
-            
-            if file_size == 0:
-                raise ValueError("照片文件为空")
-            
-            # 验证是否为有效的图片文件
-            try:
-                from PIL import Image
-                with Image.open(photo_path) as img:
-                    img_format = img.format
-                    img_mode = img.mode  
-                    img_size = img.size
-                    context.logger.log_step("🖼️ 图片信息", f"格式: {img_format}, 模式: {img_mode}, 尺寸: {img_size}")
-            except Exception as e:
-                context.logger.log_step("❌ 图片验证失败", f"不是有效的图片文件: {str(e)}")
-                raise ValueError(f"无效的图片文件: {str(e)}")
+            photo = get_captured_photo(photo_path)
+            if photo is not None:
+                # 刚拍摄的照片还在内存中，不必等待写盘或重新读取文件
+                context.logger.log_step("🖼️ 图片信息", f"格式: JPEG（内存）, 尺寸: {photo.size}, 大小: {len(photo.jpeg)} bytes")
+            else:
+                # 检查照片文件是否存在
+                if not os.path.exists(photo_path):
+                    raise FileNotFoundError(f"照片文件不存在: {photo_path}")
+            
+                # 获取绝对路径
+                abs_photo_path = os.path.abspath(photo_path)
+                context.logger.log_step("📁 绝对路径", f"绝对路径: {abs_photo_path}")
+            
+                # 检查文件大小
+                file_size = os.path.getsize(photo_path)
+                context.logger.log_step("📏 文件大小", f"文件大小: {file_size} bytes")
+            
+                if file_size == 0:
+                    raise ValueError("照片文件为空")
+            
+                # 验证是否为有效的图片文件
+                try:
+                    from PIL import Image
+                    with Image.open(photo_path) as img:
+                        img_format = img.format
+                        img_mode = img.mode  
+                        img_size = img.size
+                        context.logger.log_step("🖼️ 图片信息", f"格式: {img_format}, 模式: {img_mode}, 尺寸: {img_size}")
+                except Exception as e:
+                    context.logger.log_step("❌ 图片验证失败", f"不是有效的图片文件: {str(e)}")
+                    raise ValueError(f"无效的图片文件: {str(e)}")
             
             # 编码照片为base64
             context.logger.log_step("🔄 开始编码", "开始Base64编码...")
@@ -96,7 +102,7 @@ class ProcessPhotoVoiceState(AbstractState):
             # === 第一步：简单描述照片（避免内容过滤） ===
             context.logger.log_step("🎯 第一步", "开始简单照片描述")
             
-            chat_utils = DeriveChatUtils(context.response_id)
+            chat_utils = DeriveChatUtils(context.response_id, on_text=context.oled_display.text_streamer())
             
             # 简单描述提示（保证成功）
             simple_description_prompt = "请简单描述这张照片中看到的内容。"
@@ -186,7 +192,7 @@ class ProcessPhotoVoiceState(AbstractState):
         
         try:
             # 使用聊天工具分析语音内容
-            chat_utils = DeriveChatUtils(context.response_id)
+            chat_utils = DeriveChatUtils(context.response_id, on_text=context.oled_display.text_streamer())
             
             # 构建语音分析提示
             voice_analysis_prompt = f"""
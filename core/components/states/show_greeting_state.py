@@ -13,7 +13,7 @@ class ShowGreetingState(AbstractState):
     def execute(self, context) -> None:
         """执行显示打招呼逻辑"""
         # 使用聊天工具生成打招呼语句
-        chat_utils = DeriveChatUtils(context.response_id)
+        chat_utils = DeriveChatUtils(context.response_id, on_text=context.oled_display.text_streamer())
         
         greeting = chat_utils.generate_text('greeting', personality=context.get_data('personality'))
         context.set_data('greeting', greeting)
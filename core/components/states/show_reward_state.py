@@ -35,9 +35,7 @@ class ShowRewardState(AbstractState):
             if reward_image_path:
                 try:
                     # 先在LCD上显示奖励图片
-                    from PIL import Image
-                    img = Image.open(reward_image_path)
-                    context.lcd_display.show_image(img)
+                    context.lcd_display.show_image(reward_image_path)
                     context.logger.log_step("显示奖励", f"奖励图片已显示: {reward_image_path}")
                     
                     # 在OLED上显示祝贺文字
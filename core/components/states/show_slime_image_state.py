@@ -1,7 +1,6 @@
 import os
 import time
 from typing import Optional
-from PIL import Image
 
 from ..abstract_state import AbstractState
 from ..derive_states import DeriveState
@@ -26,8 +25,7 @@ class ShowSlimeImageState(AbstractState):
             time.sleep(1)
             
             # 显示图片
-            img = Image.open(slime_image_path)
-            context.lcd_display.show_image(img)
+            context.lcd_display.show_image(slime_image_path)
             
             context.logger.log_step("显示图片", "史莱姆图片显示成功")
             
@@ -18,7 +18,9 @@ class SuggestDestinationState(AbstractState):
         
         try:
             # 使用聊天工具生成建议
-            chat_utils = DeriveChatUtils(context.response_id)
+            # 回复是JSON，生成过程中只显示进度
+            chat_utils = DeriveChatUtils(context.response_id, on_text=context.oled_display.text_streamer(
+                "正在思考\n建议...", show_text=False))
             
             # 生成更具体的建议
             suggestion_prompt = f"""
@@ -33,7 +33,7 @@ class SummaryState(AbstractState):
             context.logger.log_step("生成总结", f"开始生成{cycle_count}轮漂流的总结")
             
             # 使用聊天工具生成总结
-            chat_utils = DeriveChatUtils(context.response_id)
+            chat_utils = DeriveChatUtils(context.response_id, on_text=context.oled_display.text_streamer())
             
             summary_prompt = f"""
             作为一个有执念的史莱姆，我和玩家一起完成了{cycle_count}轮漂流探索。
@@ -1,8 +1,6 @@
 import os
-import shutil
 import time
 from typing import Optional
-from PIL import Image
 
 from ..abstract_state import AbstractState
 from ..derive_states import DeriveState
@@ -33,16 +31,20 @@ class TakeNewPhotoState(AbstractState):
             # 执行拍照+语音并行录制
             photo_success, voice_text, error_msg = photo_voice_manager.take_photo_with_voice()
             
+            # 用户长按返回菜单时不再处理和分析照片
+            if context.should_return_to_menu():
+                return
+            
             if photo_success:
                 # 处理拍照成功的情况
                 photo_path = os.path.join(context.get_project_root(), "current_image.jpg")
-                if os.path.exists(photo_path):
-                    # 保存带时间戳的新照片副本
-                    timestamped_path = self._save_new_photo_with_timestamp(context, photo_path)
+                photo = photo_voice_manager.photo
+                if photo is not None:
+                    # 后台保存带时间戳的新照片副本
+                    timestamped_path = self._save_new_photo_with_timestamp(context, photo, photo_path)
                     
-                    # 在LCD上显示照片
-                    img = Image.open(photo_path)
-                    context.lcd_display.show_image(img)
+                    # 在LCD上显示照片（直接从内存解码预览）
+                    context.lcd_display.show_image(photo.preview((context.lcd_display.width, context.lcd_display.height)))
                     
                     # 保存照片数据
                     context.set_data('new_photo_path', photo_path)
@@ -59,7 +61,7 @@ class TakeNewPhotoState(AbstractState):
                         context.logger.log_step("新照片语音", "使用默认语音描述")
                     
                     context.logger.log_step("拍摄新照片", f"新照片已保存至: {photo_path}")
-                    context.logger.save_image(timestamped_path, 'new_photo')
+                    context.logger.save_photo(photo, os.path.basename(timestamped_path), 'new_photo')
                     
                     # 显示成功信息
                     voice_status = "有语音" if voice_text else "无语音"
@@ -98,14 +100,14 @@ class TakeNewPhotoState(AbstractState):
         
         return DeriveState.ANALYZE_NEW_PHOTO
     
-    def _save_new_photo_with_timestamp(self, context, photo_path):
-        """保存带时间戳的新照片副本"""
+    def _save_new_photo_with_timestamp(self, context, photo, photo_path):
+        """在后台保存带时间戳的新照片副本"""
         filename = os.path.basename(photo_path)
         name, ext = os.path.splitext(filename)
         timestamped_filename = f"{name}_new_{context.logger.timestamp}{ext}"
         timestamped_path = os.path.join(context.get_project_root(), timestamped_filename)
         
-        # 复制照片
-        shutil.copy2(photo_path, timestamped_path)
+        # 写入副本（后台进行，之后按路径访问时直接使用内存中的照片）
+        photo.save_async(timestamped_path)
         
         return timestamped_path 
\ No newline at end of file
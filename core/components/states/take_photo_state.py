@@ -1,12 +1,10 @@
 import os
-import shutil
 import time
 from typing import Optional
-from PIL import Image
 
 from ..abstract_state import AbstractState
 from ..derive_states import DeriveState
-from ..derive_utils import run_camera_test
+from ..derive_utils import take_photo, ask_retake_if_poor
 
 class TakePhotoState(AbstractState):
     """拍照状态"""
@@ -41,22 +39,28 @@ class TakePhotoState(AbstractState):
         
         context.oled_display.show_text_oled("正在拍照...")
         
-        # 运行相机脚本拍照
-        run_camera_test()
+        # 用常驻相机拍照，照片保存在内存中
+        photo = take_photo()
+        
+        # 模糊或过暗时先让用户重拍，不浪费一次照片分析请求
+        choice = ask_retake_if_poor(context, photo)
+        if choice == 'menu':
+            context.logger.log_step("用户操作", "用户长按按钮2返回菜单")
+            return
+        if choice == 'retake':
+            context.logger.log_step(log_step, "照片质量不佳，用户选择重拍")
+            return self._take_photo_process(context, is_new_photo)
         
-        # 查找最新拍摄的照片
         try:
-            # 先检查项目根目录是否有照片
+            if photo is None:
+                raise RuntimeError("拍照失败")
             photo_path = os.path.join(context.get_project_root(), "current_image.jpg")
-            if not os.path.exists(photo_path):
-                raise FileNotFoundError("未找到拍摄的照片")
             
-            # 保存带时间戳的照片副本
-            timestamped_key = self._save_photo_with_timestamp(context, photo_path, is_new_photo)
+            # 后台保存带时间戳的照片副本
+            timestamped_key = self._save_photo_with_timestamp(context, photo, photo_path, is_new_photo)
             
-            # 在LCD上显示照片
-            img = Image.open(photo_path)
-            context.lcd_display.show_image(img)
+            # 在LCD上显示照片（直接从内存解码预览）
+            context.lcd_display.show_image(photo.preview((context.lcd_display.width, context.lcd_display.height)))
             
             context.logger.log_step(log_step, f"{'新' if is_new_photo else ''}照片已保存: {context.get_data(timestamped_key)}")
             
@@ -79,26 +83,26 @@ class TakePhotoState(AbstractState):
             # 出错时递归重试
             return self._take_photo_process(context, is_new_photo)
     
-    def _save_photo_with_timestamp(self, context, photo_path, is_new_photo=False):
-        """保存带时间戳的照片副本"""
+    def _save_photo_with_timestamp(self, context, photo, photo_path, is_new_photo=False):
+        """在后台保存带时间戳的照片副本"""
         filename = os.path.basename(photo_path)
         suffix = "new" if is_new_photo else ""
         timestamped_filename = self._create_timestamped_filename(context, filename, suffix)
         timestamped_path = os.path.join(context.get_project_root(), timestamped_filename)
         
-        # 复制照片
-        shutil.copy2(photo_path, timestamped_path)
+        # 写入副本（后台进行，之后按路径访问时直接使用内存中的照片）
+        photo.save_async(timestamped_path)
         
         # 保存到相应的数据键
         if is_new_photo:
             context.set_data('new_image_path', photo_path)
             context.set_data('new_timestamped_image', timestamped_path)
-            context.logger.save_image(timestamped_path, 'new_photo')
+            context.logger.save_photo(photo, timestamped_filename, 'new_photo')
             return 'new_timestamped_image'
         else:
             context.set_data('image_path', photo_path)
             context.set_data('timestamped_image', timestamped_path)
-            context.logger.save_image(timestamped_path, 'original_photo')
+            context.logger.save_photo(photo, timestamped_filename, 'original_photo')
             return 'timestamped_image'
     
     def _create_timestamped_filename(self, context, base_filename, suffix=""):
@@ -1,8 +1,6 @@
 import os
-import shutil
 import time
 from typing import Optional
-from PIL import Image
 
 from ..abstract_state import AbstractState
 from ..derive_states import DeriveState
@@ -25,9 +23,14 @@ class TakePhotoWithVoiceState(AbstractState):
             # 执行拍照+语音录制
             photo_success, voice_text, error_msg = photo_voice_manager.take_photo_with_voice()
             
+            # 用户长按返回菜单时不再处理和分析照片
+            if context.should_return_to_menu():
+                return
+            
             if photo_success:
                 # 拍照成功，处理照片
-                self._handle_photo_success(context, voice_text or photo_voice_manager.get_fallback_voice_text())
+                self._handle_photo_success(context, photo_voice_manager.photo,
+                                           voice_text or photo_voice_manager.get_fallback_voice_text())
             else:
                 # 拍照失败，记录错误并重试
                 context.logger.log_step("拍照+语音错误", error_msg or "拍照失败")
@@ -37,20 +40,16 @@ class TakePhotoWithVoiceState(AbstractState):
             context.logger.log_step("错误", f"拍照+语音状态执行失败: {str(e)}")
             self._handle_photo_failure(context, str(e))
     
-    def _handle_photo_success(self, context, voice_text: str):
+    def _handle_photo_success(self, context, photo, voice_text: str):
         """处理拍照成功的情况"""
         try:
-            # 查找拍摄的照片
             photo_path = os.path.join(context.get_project_root(), "current_image.jpg")
-            if not os.path.exists(photo_path):
-                raise FileNotFoundError("未找到拍摄的照片")
             
-            # 保存带时间戳的照片副本
-            timestamped_path = self._save_photo_with_timestamp(context, photo_path)
+            # 后台保存带时间戳的照片副本
+            timestamped_path = self._save_photo_with_timestamp(context, photo, photo_path)
             
-            # 在LCD上显示照片
-            img = Image.open(photo_path)
-            context.lcd_display.show_image(img)
+            # 在LCD上显示照片（直接从内存解码预览）
+            context.lcd_display.show_image(photo.preview((context.lcd_display.width, context.lcd_display.height)))
             
             # 保存照片和语音数据
             context.set_data('image_path', photo_path)
@@ -59,7 +58,7 @@ class TakePhotoWithVoiceState(AbstractState):
             
             context.logger.log_step("拍照+语音成功", f"照片已保存: {photo_path}")
             context.logger.log_step("拍照语音", f"语音内容: {voice_text}")
-            context.logger.save_image(timestamped_path, 'photo_with_voice')
+            context.logger.save_photo(photo, os.path.basename(timestamped_path), 'photo_with_voice')
             
             # 显示拍照结果
             self._show_photo_result(context, voice_text)
@@ -126,15 +125,15 @@ class TakePhotoWithVoiceState(AbstractState):
             context=context
         )
     
-    def _save_photo_with_timestamp(self, context, photo_path: str) -> str:
-        """保存带时间戳的照片副本"""
+    def _save_photo_with_timestamp(self, context, photo, photo_path: str) -> str:
+        """在后台保存带时间戳的照片副本"""
         filename = os.path.basename(photo_path)
         name, ext = os.path.splitext(filename)
         timestamped_filename = f"{name}_with_voice_{context.logger.timestamp}{ext}"
         timestamped_path = os.path.join(context.get_project_root(), timestamped_filename)
         
-        # 复制照片
-        shutil.copy2(photo_path, timestamped_path)
+        # 写入副本（后台进行，之后按路径访问时直接使用内存中的照片）
+        photo.save_async(timestamped_path)
         
         return timestamped_path
     
@@ -12,12 +12,17 @@ try:
     if stt_path not in sys.path:
         sys.path.append(stt_path)
     
-    from stt_utils import SpeechToText
+    from stt_utils import get_speech_to_text
     STT_AVAILABLE = True
 except ImportError as e:
     print(f"⚠️ 语音识别模块不可用: {e}")
     STT_AVAILABLE = False
 
+from core.audio.vad import VoiceActivityDetector
+
+# OLED上显示的识别中间结果字数（只显示最新的部分）
+INTERIM_DISPLAY_CHARS = 9
+
 class VoiceInputManager:
     """语音输入管理器 - 处理录音、进度显示和错误处理"""
     
@@ -28,6 +33,8 @@ class VoiceInputManager:
         self.progress_thread = None
         self.recorded_text = None
         self.recording_error = None
+        self.interim_text = ""  # 流式识别的中间结果，录音时显示在OLED上
+        self.vad = None  # 语音活动检测，说完后提前结束录音
         
         # 录音配置
         self.recording_config = {
@@ -51,6 +58,9 @@ class VoiceInputManager:
         try:
             self.context.logger.log_step("语音输入", f"开始录制用户心情，时长{duration}秒")
             
+            # 麦克风在整个语音输入期间预采集，提示出现前开口说的话也能录进去
+            self._start_preroll()
+            
             # 显示录音准备界面
             self._show_recording_preparation()
             
@@ -135,6 +145,32 @@ class VoiceInputManager:
             error_msg = f"语音录制异常: {str(e)}"
             self.context.logger.log_step("语音错误", error_msg)
             return False, None, error_msg
+        finally:
+            self._stop_preroll()
+    
+    def _get_stt(self):
+        """进程内共享的语音识别器"""
+        return get_speech_to_text(
+            language_code=self.recording_config['language'],
+            channels=self.recording_config['channels']
+        )
+    
+    def _start_preroll(self):
+        """启动麦克风预采集（失败时录音仍会单独打开麦克风）"""
+        if not STT_AVAILABLE:
+            return
+        try:
+            self._get_stt().start_preroll()
+        except Exception as e:
+            print(f"⚠️ 麦克风预采集启动失败: {e}")
+    
+    def _stop_preroll(self):
+        if not STT_AVAILABLE:
+            return
+        try:
+            self._get_stt().stop_preroll()
+        except Exception as e:
+            print(f"⚠️ 停止麦克风预采集失败: {e}")
     
     def _show_recording_preparation(self):
         """显示录音准备界面"""
@@ -158,9 +194,8 @@ class VoiceInputManager:
                 args=(duration,)
             )
             
-            # 显示开始提示
-            self.context.oled_display.show_text_oled("即将开始录音\n准备说话...")
-            time.sleep(1)
+            # 显示开始提示（预采集已在运行，不需要等待麦克风就绪）
+            self.context.oled_display.show_text_oled("开始录音\n请说话...")
             
             # 开始录音
             self.is_recording = True
@@ -181,14 +216,15 @@ class VoiceInputManager:
     def _recording_worker(self, duration: int):
         """录音工作线程"""
         try:
-            # 创建语音识别实例
-            stt = SpeechToText(
-                language_code=self.recording_config['language'],
-                channels=self.recording_config['channels']
-            )
+            # 取得进程内共享的语音识别器（客户端和设备检查只在第一次时进行）
+            stt = self._get_stt()
             
-            # 开始录音识别
-            self.recorded_text = stt.record_and_transcribe(duration=duration)
+            # 边录音边识别，中间结果实时显示；检测到说完后提前结束，duration为最长录音时长
+            self.interim_text = ""
+            self.vad = VoiceActivityDetector(stt.recognizer_samplerate)
+            self.recorded_text = stt.stream_transcribe(duration=duration, on_interim=self._on_interim,
+                                                       vad=self.vad)
+            self.context.logger.log_step("语音预处理", stt.last_preprocess.describe())
             
         except Exception as e:
             self.recording_error = f"录音失败: {str(e)}"
@@ -196,6 +232,10 @@ class VoiceInputManager:
         finally:
             self.is_recording = False
     
+    def _on_interim(self, text: str):
+        """流式识别中间结果回调（在识别线程中调用）"""
+        self.interim_text = text
+    
     def _progress_worker(self, duration: int):
         """进度显示工作线程"""
         start_time = time.time()
@@ -207,8 +247,9 @@ class VoiceInputManager:
                 break
                 
             # 更新进度显示
+            # 进度文字每次都不同，用不分页、不缓存的方式显示
             progress_text = self._generate_progress_text(elapsed_time, duration)
-            self.context.oled_display.show_text_oled(progress_text)
+            self.context.oled_display.show_text_tail(progress_text)
             
             # 记录进度日志（每2秒记录一次）
             if int(elapsed_time) % 2 == 0 and elapsed_time > 0:
@@ -234,10 +275,14 @@ class VoiceInputManager:
         
         remaining_time = max(0, total_duration - elapsed_time)
         
-        # 简化为3行显示
-        display_text = f"录音 {elapsed_time:.0f}/{total_duration}秒\n"
+        # 第1行显示说话状态（说完后自动结束），识别出文字后第3行改为显示最新的文字
+        status = self.vad.describe() if self.vad else "准备录音"
+        display_text = f"{status} {elapsed_time:.0f}秒\n"
         display_text += f"[{bar}] {percentage}%\n"
-        display_text += f"剩余 {remaining_time:.0f} 秒"
+        if self.interim_text:
+            display_text += self.interim_text[-INTERIM_DISPLAY_CHARS:]
+        else:
+            display_text += f"最长剩余 {remaining_time:.0f} 秒"
         
         return display_text
     
@@ -0,0 +1,126 @@
+"""
+显示合成线程
+
+每个物理显示器（"LCD" / "OLED"）由一个合成线程独占：
+- 各线程通过 submit() 非阻塞地提交刷新任务，立即返回 Future
+- 每个显示器只保留最新一帧待刷新任务，被新任务取代的旧帧直接丢弃
+- 刷新在合成线程中进行，持有该显示器的锁，不同线程的写入不会交错
+
+Future 在刷新完成时得到结果：True 表示本帧已送屏，
+False 表示本帧被更新的帧取代（此时屏幕上已是更新的内容）。
+"""
+
+import atexit
+import threading
+from concurrent.futures import Future, wait
+
+
+class DisplayCompositor:
+    """单个物理显示器的刷新线程"""
+
+    def __init__(self, name):
+        self.name = name
+        self.lock = threading.Lock()  # 持有期间独占物理显示器
+        self._cond = threading.Condition()
+        self._pending = None          # (任务, Future, 被取代的Future列表)
+        self._last_future = None
+        self._closed = False
+
+        # 统计信息
+        self.submitted = 0
+        self.flushed = 0
+        self.dropped = 0
+
+        self._thread = threading.Thread(target=self._run, name=f"compositor-{name}", daemon=True)
+        self._thread.start()
+
+    @property
+    def closed(self):
+        return self._closed
+
+    def submit(self, job):
+        """提交一个刷新任务（在合成线程中调用 job()）
+
+        Returns:
+            Future: 刷新完成后得到 True，被新任务取代时得到 False
+        """
+        future = Future()
+        with self._cond:
+            if self._closed:
+                raise RuntimeError(f"{self.name} 合成线程已关闭")
+            superseded = []
+            if self._pending is not None:
+                _, old_future, old_superseded = self._pending
+                superseded = old_superseded + [old_future]
+                self.dropped += 1
+            self._pending = (job, future, superseded)
+            self._last_future = future
+            self.submitted += 1
+            self._cond.notify()
+        return future
+
+    def wait_idle(self, timeout=None):
+        """等待已提交的任务全部刷新完成
+
+        Returns:
+            bool: 是否在超时前完成
+        """
+        with self._cond:
+            future = self._last_future
+        if future is None:
+            return True
+        done, _ = wait([future], timeout=timeout)
+        return bool(done)
+
+    def close(self, timeout=None):
+        """刷新完剩余任务后停止线程"""
+        with self._cond:
+            self._closed = True
+            self._cond.notify()
+        if threading.current_thread() is not self._thread:
+            self._thread.join(timeout)
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while self._pending is None and not self._closed:
+                    self._cond.wait()
+                if self._pending is None:
+                    return
+                job, future, superseded = self._pending
+                self._pending = None
+
+            with self.lock:
+                try:
+                    job()
+                except Exception as e:
+                    print(f"⚠️ {self.name} 刷新失败: {e}")
+                    future.set_exception(e)
+                else:
+                    self.flushed += 1
+                    future.set_result(True)
+
+            for old_future in superseded:
+                old_future.set_result(False)
+
+
+_compositors = {}
+_registry_lock = threading.Lock()
+
+
+def get_compositor(name):
+    """获取（必要时创建）进程内共享的显示器合成线程"""
+    with _registry_lock:
+        compositor = _compositors.get(name)
+        if compositor is None or compositor.closed:
+            compositor = _compositors[name] = DisplayCompositor(name)
+        return compositor
+
+
+@atexit.register
+def _drain_all():
+    """进程退出前刷新完所有待处理的帧"""
+    with _registry_lock:
+        compositors = list(_compositors.values())
+    for compositor in compositors:
+        compositor.close(timeout=1.0)
@@ -1,8 +1,9 @@
 import os
 import sys
 from luma.core.interface.serial import spi
-from PIL import Image, ImageDraw, ImageFont
+from PIL import Image, ImageDraw
 import time
+import numpy as np
 import board
 import busio
 from adafruit_ssd1306 import SSD1306_I2C
@@ -12,109 +13,29 @@ import RPi.GPIO as GPIO
 project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 sys.path.insert(0, project_root)
 
-class BitBangLCD:
-    def __init__(self):
-        # GPIO定义
-        self.DC = 24
-        self.RST = 25
-        self.CS = 8
-        self.CLK = 11
-        self.MOSI = 10
-        self.width = 320   # 横向宽度
-        self.height = 240  # 横向高度
-        
-        # 初始化GPIO
-        GPIO.setmode(GPIO.BCM)
-        GPIO.setwarnings(False)
-        for pin in [self.DC, self.RST, self.CS, self.CLK, self.MOSI]:
-            GPIO.setup(pin, GPIO.OUT)
-            
-        # 初始化LCD
-        self._init_lcd()
-        
-    def _spi_write(self, byte):
-        """BitBang SPI写入一个字节"""
-        for i in range(8):
-            GPIO.output(self.CLK, 0)
-            GPIO.output(self.MOSI, (byte & 0x80) != 0)
-            byte <<= 1
-            GPIO.output(self.CLK, 1)
+from core.display.lcd_transport import BitBangTransport, create_lcd_transport
+from core.display.st7789 import ST7789
+from core.display.lcd_encoder import RGB565Encoder
+from core.display.compositor import get_compositor
+from core.display.frame_diff import find_dirty_rects, rect_area
+from core.display.oled_backend import SSD1306DeltaFlusher, pack_pages
+from core.display.page_cache import PageCache, RenderedPages, page_starts
+from core.display.image_cache import get_image_cache
+from core.display.font_cache import DEFAULT_FONT_PATH, get_font
+from core.display.text_layout import layout_lines
+from core.input.gestures import GestureRecognizer
 
-    def _write_command(self, cmd):
-        """写入命令"""
-        GPIO.output(self.DC, 0)
-        GPIO.output(self.CS, 0)
-        self._spi_write(cmd)
-        GPIO.output(self.CS, 1)
+# 等待输入时检查返回菜单状态的间隔（秒），输入本身由事件队列即时唤醒
+CONTEXT_CHECK_SECONDS = 0.5
 
-    def _write_data(self, data):
-        """写入数据"""
-        GPIO.output(self.DC, 1)
-        GPIO.output(self.CS, 0)
-        self._spi_write(data)
-        GPIO.output(self.CS, 1)
+# 逐步显示生成中文字时的最短刷新间隔（秒）
+STREAM_REFRESH_SECONDS = 0.15
 
-    def _reset(self):
-        """重置显示器"""
-        GPIO.output(self.RST, 0)
-        time.sleep(0.05)
-        GPIO.output(self.RST, 1)
-        time.sleep(0.05)
+class BitBangLCD(ST7789):
+    """BitBang SPI驱动的LCD（保持旧接口，硬件SPI不可用时使用）"""
 
-    def _init_lcd(self):
-        """初始化LCD"""
-        self._reset()
-        self._write_command(0x36)
-        self._write_data(0xF0)
-        
-        # 其他初始化命令
-        self._write_command(0x3A); self._write_data(0x05)
-        self._write_command(0xB2); [self._write_data(i) for i in (0x0C,0x0C,0x00,0x33,0x33)]
-        self._write_command(0xB7); self._write_data(0x35)
-        self._write_command(0xBB); self._write_data(0x19)
-        self._write_command(0xC0); self._write_data(0x2C)
-        self._write_command(0xC2); self._write_data(0x01)
-        self._write_command(0xC3); self._write_data(0x12)
-        self._write_command(0xC4); self._write_data(0x20)
-        self._write_command(0xC6); self._write_data(0x0F)
-        self._write_command(0xD0); [self._write_data(i) for i in (0xA4, 0xA1)]
-        self._write_command(0xE0); [self._write_data(i) for i in (0xD0,0x04,0x0D,0x11,0x13,0x2B,0x3F,0x54,0x4C,0x18,0x0D,0x0B,0x1F,0x23)]
-        self._write_command(0xE1); [self._write_data(i) for i in (0xD0,0x04,0x0C,0x11,0x13,0x2C,0x3F,0x44,0x51,0x2F,0x1F,0x1F,0x20,0x23)]
-        self._write_command(0x21)
-        self._write_command(0x11)
-        time.sleep(0.12)
-        self._write_command(0x29)
-
-    def display(self, image):
-        """显示图像"""
-        # 调整图像大小为屏幕实际大小
-        image = image.resize((self.width, self.height)).convert('RGB')
-        pixelbytes = []
-        for y in range(self.height):
-            for x in range(self.width):
-                r, g, b = image.getpixel((x, y))
-                rgb565 = ((r & 0xF8) << 8) | ((g & 0xFC) << 3) | (b >> 3)
-                pixelbytes.append((rgb565 >> 8) & 0xFF)
-                pixelbytes.append(rgb565 & 0xFF)
-
-        # 设置显示区域为全屏
-        self._write_command(0x2A)
-        [self._write_data(i) for i in (0, 0, (self.width-1) >> 8, (self.width-1) & 0xFF)]
-        self._write_command(0x2B)
-        [self._write_data(i) for i in (0, 0, (self.height-1) >> 8, (self.height-1) & 0xFF)]
-        
-        # 写入数据
-        self._write_command(0x2C)
-        GPIO.output(self.DC, 1)
-        GPIO.output(self.CS, 0)
-        for byte in pixelbytes:
-            self._spi_write(byte)
-        GPIO.output(self.CS, 1)
-
-    def clear(self):
-        """清空显示"""
-        black_image = Image.new('RGB', (self.width, self.height), 'black')
-        self.display(black_image)
+    def __init__(self):
+        super().__init__(BitBangTransport())
 
 class DisplayManager:
     def __init__(self, display_type="LCD"):
@@ -124,14 +45,27 @@ class DisplayManager:
             GPIO.setwarnings(False)
             
         self.display_type = display_type
-        # 设置默认中文字体路径
-        self.font_path = '/usr/share/fonts/truetype/wqy/wqy-microhei.ttc'
-        if display_type == "LCD":
-            self.device = BitBangLCD()  # 使用新的BitBang实现
-            self.width = 320  # 修正为实际的LCD尺寸
-            self.height = 240
-        else:
-            self._init_oled()
+        self.closed = False  # close() 之后不再使用设备
+        # 设置默认中文字体路径（字体对象由 font_cache 在进程内共享）
+        self.font_path = DEFAULT_FONT_PATH
+        # 每个物理显示器由一个合成线程独占刷新，初始化期间同样持有显示器锁
+        self.compositor = get_compositor(display_type)
+        with self.compositor.lock:
+            if display_type == "LCD":
+                # 优先使用硬件SPI，不可用时回退到BitBang
+                self.device = ST7789(create_lcd_transport())
+                self.width = 320  # 修正为实际的LCD尺寸
+                self.height = 240
+                # 局部刷新：记录上一次推送到屏幕的帧，变化面积超过比例时整屏刷新
+                self.last_lcd_frame = None
+                self.lcd_full_refresh_ratio = 0.5
+                self.lcd_max_dirty_rects = 4
+                # 调用线程上预渲染缓存帧用的编码器（设备编码器只在合成线程中使用）
+                self._frame_encoder = RGB565Encoder(self.width, self.height)
+            else:
+                self._init_oled()
+        # 滚动文本的分页预渲染缓存（LCD帧较大，缓存帧数更少）
+        self.page_cache = PageCache(max_frames=8 if display_type == "LCD" else 64)
         self.current_menu_index = 0  # 当前菜单选择索引
         self.indicator_frame = 0     # 指示器动画帧
         self.last_indicator_update = time.time()
@@ -139,40 +73,129 @@ class DisplayManager:
     
     def _init_oled(self):
         """初始化OLED显示屏"""
-        i2c = busio.I2C(board.SCL, board.SDA)
-        self.device = SSD1306_I2C(128, 64, i2c, addr=0x3C)
+        self._i2c = busio.I2C(board.SCL, board.SDA)
+        self.device = SSD1306_I2C(128, 64, self._i2c, addr=0x3C)
         self.width = 128
         self.height = 64
+        # 页级增量刷新，只发送变化的显存段
+        self.oled_flusher = SSD1306DeltaFlusher(self.device)
     
     def _display_image(self, image):
-        """统一处理图像显示"""
+        """统一处理图像显示：拷贝图像后提交给合成线程，不等待总线传输
+
+        Returns:
+            Future: 刷新完成（或被更新的帧取代）时得到结果
+        """
+        snapshot = image.copy()  # 调用者之后可能继续在原图上绘制
+        return self.compositor.submit(lambda: self._flush_image(snapshot))
+    
+    def _flush_image(self, image):
+        """在合成线程中编码并刷新图像"""
         if self.display_type == "LCD":
-            # 只有LCD需要旋转180度
-            rotated_image = image.rotate(180)
-            self.device.display(rotated_image)
+            # 只有LCD需要旋转180度，旋转在编码时完成，不再额外拷贝图像
+            frame = self.device.encoder.encode_array(image, rotate_180=True)
+            self._push_lcd_frame(frame)
         else:  # OLED保持原样
-            self.device.image(image)
-            self.device.show()
+            self.oled_flusher.load_image(image)
+            self.oled_flusher.flush()
+    
+    def _prepare_frame(self, image):
+        """把图像转换为可以直接送屏的帧（用于缓存）"""
+        if self.display_type == "LCD":
+            return self._frame_encoder.encode_array(image, rotate_180=True).copy()
+        return pack_pages(image)
+
+    def _show_frame(self, frame):
+        """显示 _prepare_frame 生成的帧（异步，返回Future）"""
+        return self.compositor.submit(lambda: self._flush_frame(frame))
+
+    def show_frame(self, frame):
+        """显示已编码的送屏帧（LCD为旋转180度后的大端RGB565数组，OLED为页格式显存）
+
+        用于相机取景等由调用者自行编码的连续画面，异步返回Future。
+        """
+        return self._show_frame(frame)
+
+    def _flush_frame(self, frame):
+        if self.display_type == "LCD":
+            self._push_lcd_frame(frame)
+        else:
+            self.oled_flusher.load_buffer(frame)
+            self.oled_flusher.flush()
+
+    def _push_lcd_frame(self, frame):
+        """推送LCD帧，只发送与上一帧不同的矩形区域（在合成线程中调用）"""
+        if self.last_lcd_frame is None:
+            self.device.write_frame(frame)
+            self.last_lcd_frame = frame.copy()
+            return
+        
+        rects = find_dirty_rects(self.last_lcd_frame, frame, max_rects=self.lcd_max_dirty_rects)
+        if not rects:
+            return  # 画面没有变化
+        
+        dirty_area = sum(rect_area(rect) for rect in rects)
+        if dirty_area > self.lcd_full_refresh_ratio * self.width * self.height:
+            self.device.write_frame(frame)
+        else:
+            for rect in rects:
+                self.device.write_region(frame, rect)
+        np.copyto(self.last_lcd_frame, frame)
     
     def clear(self):
-        """清空显示屏"""
+        """清空显示屏（异步，返回Future）"""
+        return self.compositor.submit(self._flush_clear)
+    
+    def _flush_clear(self):
         if self.display_type == "LCD":
             self.device.clear()  # 使用新的clear方法
+            self.last_lcd_frame = None  # 屏幕内容已变化，下一帧整屏刷新
         else:  # OLED
             self.device.fill(0)
-            self.device.show()
+            self.oled_flusher.flush()
+    
+    def invalidate(self):
+        """屏幕内容已被其他进程改写，下一帧整屏刷新
+
+        直接在显示器锁内清除上一帧记录（不经合成线程提交，避免被随后的新帧取代而丢失）。
+        """
+        with self.compositor.lock:
+            if self.display_type == "LCD":
+                self.last_lcd_frame = None
+            else:
+                self.oled_flusher.invalidate()
+
+    def close(self, timeout=1.0):
+        """清屏并送完已提交的帧，然后释放总线（LCD的SPI设备和DC/RST引脚，OLED的I2C）
+
+        合成线程由同一显示器的所有 DisplayManager 共享，不在这里停止。
+        重新创建 DisplayManager 之前先关闭旧的，避免每次都泄漏一个设备句柄。
+        """
+        if self.closed:
+            return
+        self.closed = True
+        self.clear()
+        if not self.wait_for_flush(timeout):
+            print(f"⚠️ {self.display_type} 刷新等待超时")
+        with self.compositor.lock:
+            try:
+                if self.display_type == "LCD":
+                    self.device.close()
+                else:
+                    self._i2c.deinit()
+            except Exception as e:
+                print(f"关闭{self.display_type}时出错: {e}")
+
+    def wait_for_flush(self, timeout=None):
+        """等待已提交的帧全部送屏，返回是否在超时前完成"""
+        return self.compositor.wait_idle(timeout)
     
     def show_text(self, text, x=10, y=10, font_size=20, max_width=None):
         """显示文本，支持中文和自动换行"""
         image = Image.new("1" if self.display_type == "OLED" else "RGB", (self.width, self.height))
         draw = ImageDraw.Draw(image)
         
-        # 尝试加载中文字体，如果失败则使用默认字体
-        try:
-            font = ImageFont.truetype(self.font_path, font_size)
-        except:
-            print("警告：无法加载中文字体，将使用默认字体")
-            font = ImageFont.load_default()
+        font = get_font(font_size)
 
         if max_width:
             self._draw_wrapped_text(draw, text, x, y, max_width, font)
@@ -198,13 +221,8 @@ class DisplayManager:
 
     def _draw_wrapped_text(self, draw, text, x, y, max_width, font):
         """绘制自动换行的文本"""
-        # 计算每行大约能容纳多少个字符
-        avg_char_width = font.getlength("测")/2  # 获取一个汉字的平均宽度
-        chars_per_line = int(max_width / avg_char_width)
-        
-        # 使用textwrap进行自动换行
-        import textwrap
-        lines = textwrap.wrap(text, width=chars_per_line)
+        # 按实际字宽自动换行
+        lines = layout_lines(text, font, max_width)
         
         # 绘制每一行
         y_text = y
@@ -227,11 +245,16 @@ class DisplayManager:
             image_input: 可以是图片文件路径(str)或PIL Image对象
         """
         try:
-            # 如果输入是字符串（文件路径），则打开图片
+            # 如果输入是字符串（文件路径），直接mmap预处理好的送屏帧，不再解码原图
             if isinstance(image_input, str):
-                img = Image.open(image_input)
+                cache = get_image_cache()
+                if self.display_type == "LCD":
+                    self._show_frame(cache.lcd_frame(image_input))
+                else:
+                    self._show_frame(cache.oled_frame(image_input))
+                return
             # 如果输入已经是PIL Image对象，直接使用
-            elif isinstance(image_input, Image.Image):
+            if isinstance(image_input, Image.Image):
                 img = image_input
             else:
                 raise ValueError("输入必须是图片路径或PIL Image对象")
@@ -280,11 +303,7 @@ class DisplayManager:
         image = Image.new("1" if self.display_type == "OLED" else "RGB", (self.width, self.height))
         draw = ImageDraw.Draw(image)
         
-        try:
-            font = ImageFont.truetype(self.font_path, 12)
-        except:
-            print("警告：无法加载中文字体，将使用默认字体")
-            font = ImageFont.load_default()
+        font = get_font(12)
 
         # 计算显示范围
         total_items = len(items)
@@ -360,41 +379,70 @@ class DisplayManager:
         """获取当前选中的索引"""
         return self.current_menu_index
 
-    def split_text(self, text, chars_per_line):
+    def split_text(self, text, chars_per_line, font_size=12):
         """处理文本换行，支持手动换行和自动换行
         Args:
             text: 要显示的文本
-            chars_per_line: 每行字符数
+            chars_per_line: 每行字符数（中文字符算2个长度），换算为像素行宽
+            font_size: 排版使用的字号，默认12
         Returns:
             lines: 处理后的文本行列表
         """
-        lines = []
-        # 首先处理手动换行
-        paragraphs = text.split('\n')
-        
-        for paragraph in paragraphs:
-            if not paragraph:  # 处理空行
-                lines.append('')
-                continue
-            
-            # 处理每个段落的自动换行
-            current_line = ''
-            for char in paragraph:
-                # 计算字符宽度（中文字符算2个长度）
-                char_width = 2 if ord(char) > 127 else 1
-                
-                # 如果当前行加上新字符会超过限制，开始新行
-                if sum(2 if ord(c) > 127 else 1 for c in current_line) + char_width > chars_per_line:
-                    lines.append(current_line)
-                    current_line = char
-                else:
-                    current_line += char
-            
-            # 添加最后一行
-            if current_line:
-                lines.append(current_line)
-        
-        return lines
+        max_width = min(chars_per_line * font_size / 2, self.width - 10)
+        return list(layout_lines(text, get_font(font_size), max_width))
+
+    def _text_pages(self, text, font_size, chars_per_line, visible_lines, chrome):
+        """获取一段文字的分页预渲染帧（按文本和排版参数缓存）
+        Args:
+            chrome: 页面装饰
+                "plain"  只有滚动箭头
+                "paged"  滚动箭头和右下角页码
+                "hint"   滚动箭头和右上角 "BT1 BT2" 按钮提示
+        Returns:
+            (RenderedPages, 总行数)
+        """
+        lines = self.split_text(text, chars_per_line, font_size)
+        total_lines = len(lines)
+        key = (text, font_size, chars_per_line, visible_lines, chrome)
+
+        def build():
+            image = Image.new("1", (self.width, self.height))
+            draw = ImageDraw.Draw(image)
+            font = get_font(font_size)
+            small_font = get_font(8)  # 小字体用于提示
+            total_pages = (total_lines + visible_lines - 1) // visible_lines
+
+            def render(start_line):
+                # 清空图像
+                draw.rectangle((0, 0, self.width, self.height), fill=0)
+
+                # 绘制当前可见的行
+                y = 10
+                for i in range(start_line, min(start_line + visible_lines, total_lines)):
+                    draw.text((10, y), lines[i], font=font, fill=255)
+                    y += 20  # 行间距
+
+                # 绘制滚动指示器
+                if start_line > 0:  # 顶部箭头
+                    draw.polygon([(120, 5), (123, 2), (126, 5)], fill=255)
+                if start_line + visible_lines < total_lines:  # 底部箭头
+                    draw.polygon([(120, 59), (123, 62), (126, 59)], fill=255)
+
+                if chrome == "paged":
+                    # 绘制页码指示器
+                    page_info = f"({start_line // visible_lines + 1}/{total_pages})"
+                    draw.text((90, 55), page_info, font=font, fill=255)
+                elif chrome == "hint":
+                    # 在右上角添加按钮提示
+                    draw.text((85, 2), "BT1 BT2", font=small_font, fill=255)
+
+                return self._prepare_frame(image)
+
+            # 自动翻页按整页前进，摇杆翻页最后一页对齐到末尾
+            starts = page_starts(total_lines, visible_lines, clamp_last=(chrome != "paged"))
+            return RenderedPages(render, starts)
+
+        return self.page_cache.get(key, build), total_lines
 
     def show_text_oled(self, text, font_size=12, chars_per_line=18, visible_lines=3):
         """专门为OLED优化的文本显示，滚动一遍后结束
@@ -404,58 +452,19 @@ class DisplayManager:
             chars_per_line: 每行字符数，默认18
             visible_lines: 同时显示的行数，默认3
         """
-        # 创建新图像
-        image = Image.new("1", (self.width, self.height))
-        draw = ImageDraw.Draw(image)
-        
-        try:
-            font = ImageFont.truetype(self.font_path, font_size)
-        except:
-            print("警告：无法加载中文字体，将使用默认字体")
-            font = ImageFont.load_default()
-
-        # 处理文本换行
-        lines = self.split_text(text, chars_per_line)
-        
-        total_lines = len(lines)
+        total_lines = len(self.split_text(text, chars_per_line, font_size))
         
         # 如果文本行数不超过可见行数，直接显示
         if total_lines <= visible_lines:
-            y = 10
-            for line in lines:
-                draw.text((10, y), line, font=font, fill=255)
-                y += 20  # 行间距
-            self._display_image(image)
+            pages, _ = self._text_pages(text, font_size, chars_per_line, visible_lines, "plain")
+            self._show_frame(pages.frame(0))
         else:
-            # 如果文本行数超过可见行数，滚动显示一遍
-            # 计算需要滚动的次数
+            # 如果文本行数超过可见行数，滚动显示一遍（所有页已预渲染，翻页只交换缓冲区）
+            pages, _ = self._text_pages(text, font_size, chars_per_line, visible_lines, "paged")
             total_pages = (total_lines + visible_lines - 1) // visible_lines
             
             for page in range(total_pages):
-                # 清空图像
-                draw.rectangle((0, 0, self.width, self.height), fill=0)
-                
-                # 计算当前页的起始行
-                start_line = page * visible_lines
-                end_line = min(start_line + visible_lines, total_lines)
-                
-                # 绘制当前页的行
-                y = 10
-                for i in range(start_line, end_line):
-                    draw.text((10, y), lines[i], font=font, fill=255)
-                    y += 20  # 行间距
-                
-                # 绘制页码指示器
-                page_info = f"({page + 1}/{total_pages})"
-                draw.text((90, 55), page_info, font=font, fill=255)
-                
-                # 绘制滚动指示器
-                if page > 0:  # 不是第一页，显示顶部箭头
-                    draw.polygon([(120, 5), (123, 2), (126, 5)], fill=255)
-                if page < total_pages - 1:  # 不是最后一页，显示底部箭头
-                    draw.polygon([(120, 59), (123, 62), (126, 59)], fill=255)
-                
-                self._display_image(image)
+                self._show_frame(pages.frame(page * visible_lines))
                 
                 # 每页显示时间：第一页和最后一页稍长，中间页较短
                 if page == 0 or page == total_pages - 1:
@@ -463,43 +472,56 @@ class DisplayManager:
                 else:
                     time.sleep(1.5)  # 中间页停留1.5秒
 
-    def show_text_oled_interactive(self, text, font_size=12, chars_per_line=9, visible_lines=3):
-        """支持摇杆控制的OLED文本显示"""
-        # 创建新图像
+    def show_text_tail(self, text, font_size=12, chars_per_line=18, visible_lines=3):
+        """显示文本的最后几行（用于逐步生成中的文字，新内容总在底部）
+
+        内容每次都不同，不使用分页和排版缓存，直接渲染后提交给合成线程。
+        """
+        max_width = min(chars_per_line * font_size / 2, self.width - 10)
+        font = get_font(font_size)
+        lines = layout_lines(text, font, max_width, cache=False)
+        start_line = max(0, len(lines) - visible_lines)
+
         image = Image.new("1", (self.width, self.height))
         draw = ImageDraw.Draw(image)
-        
-        try:
-            font = ImageFont.truetype(self.font_path, font_size)
-        except:
-            print("警告：无法加载中文字体，将使用默认字体")
-            font = ImageFont.load_default()
+        y = 10
+        for line in lines[start_line:]:
+            draw.text((10, y), line, font=font, fill=255)
+            y += 20  # 行间距
+        if start_line > 0:  # 顶部箭头：前面还有内容
+            draw.polygon([(120, 5), (123, 2), (126, 5)], fill=255)
+        return self._display_image(image)
 
-        # 处理文本换行
-        lines = self.split_text(text, chars_per_line)
-        
-        # 如果文本行数超过可见行数，需要滚动显示
-        total_lines = len(lines)
+    def text_streamer(self, title=None, show_text=True, font_size=12, chars_per_line=18, visible_lines=3):
+        """返回逐步显示生成中文字的回调，回调参数为目前为止的完整文本
+
+        刷新频率限制在 STREAM_REFRESH_SECONDS 一次（合成线程也只保留最新的一帧）。
+        Args:
+            title: 标题（show_text=False 时显示在字数上方）
+            show_text: False时只显示标题和已生成的字数，用于JSON等不适合直接显示的输出
+        """
+        last_refresh = 0.0
+
+        def update(text):
+            nonlocal last_refresh
+            now = time.monotonic()
+            if now - last_refresh < STREAM_REFRESH_SECONDS:
+                return
+            last_refresh = now
+            if not show_text:
+                text = f"{title}\n已生成 {len(text)} 字" if title else f"已生成 {len(text)} 字"
+            self.show_text_tail(text, font_size, chars_per_line, visible_lines)
+
+        return update
+
+    def show_text_oled_interactive(self, text, font_size=12, chars_per_line=9, visible_lines=3):
+        """支持摇杆控制的OLED文本显示"""
+        pages, total_lines = self._text_pages(text, font_size, chars_per_line, visible_lines, "plain")
         start_line = 0
         
         def draw_current_page():
-            """绘制当前页面"""
-            # 清空图像
-            draw.rectangle((0, 0, self.width, self.height), fill=0)
-            
-            # 绘制当前可见的行
-            y = 10
-            for i in range(start_line, min(start_line + visible_lines, total_lines)):
-                draw.text((10, y), lines[i], font=font, fill=255)
-                y += 20  # 行间距
-            
-            # 绘制滚动指示器
-            if start_line > 0:  # 顶部箭头
-                draw.polygon([(120, 5), (123, 2), (126, 5)], fill=255)
-            if start_line + visible_lines < total_lines:  # 底部箭头
-                draw.polygon([(120, 59), (123, 62), (126, 59)], fill=255)
-            
-            self._display_image(image)
+            """显示当前页面（预渲染的帧）"""
+            self._show_frame(pages.frame(start_line))
         
         def scroll_up():
             """向上滚动"""
@@ -572,62 +594,20 @@ class DisplayManager:
         Returns:
             int: 1表示短按按钮（BT1或BT2），2表示Button2长按返回菜单
         """
-        # 创建新图像
-        image = Image.new("1", (self.width, self.height))
-        draw = ImageDraw.Draw(image)
-        
-        try:
-            font = ImageFont.truetype(self.font_path, 12)
-            small_font = ImageFont.truetype(self.font_path, 8)  # 小字体用于提示
-        except:
-            print("警告：无法加载中文字体，将使用默认字体")
-            font = ImageFont.load_default()
-            small_font = ImageFont.load_default()
-
-        # 处理文本换行
-        lines = self.split_text(text, chars_per_line)
-        
-        # 如果文本行数超过可见行数，需要滚动显示
-        total_lines = len(lines)
+        # 所有分页（包括箭头和按钮提示）只渲染一次，翻页时直接交换缓冲区
+        pages, total_lines = self._text_pages(text, 12, chars_per_line, visible_lines, "hint")
         start_line = 0
         
         def draw_current_page():
-            """绘制当前页面"""
-            # 清空图像
-            draw.rectangle((0, 0, self.width, self.height), fill=0)
-            
-            # 绘制当前可见的行
-            y = 10
-            for i in range(start_line, min(start_line + visible_lines, total_lines)):
-                draw.text((10, y), lines[i], font=font, fill=255)
-                y += 20  # 行间距
-            
-            # 绘制滚动指示器
-            if start_line > 0:  # 顶部箭头
-                draw.polygon([(120, 5), (123, 2), (126, 5)], fill=255)
-            if start_line + visible_lines < total_lines:  # 底部箭头
-                draw.polygon([(120, 59), (123, 62), (126, 59)], fill=255)
-            
-            # 在右上角添加按钮提示
-            draw.text((85, 2), "BT1 BT2", font=small_font, fill=255)
-            
-            self._display_image(image)
+            """显示当前页面（预渲染的帧）"""
+            self._show_frame(pages.frame(start_line))
         
-        # 保存按钮和摇杆状态
-        button_state = {
-            'BTN1': GPIO.input(controller.BUTTON_PINS['BTN1']),
-            'BTN2': GPIO.input(controller.BUTTON_PINS['BTN2']),
-            'UP': GPIO.input(controller.JOYSTICK_PINS['UP']),
-            'DOWN': GPIO.input(controller.JOYSTICK_PINS['DOWN'])
-        }
+        # 短按/长按和摇杆连续翻页由手势识别器按时间戳判断
+        gestures = GestureRecognizer(controller)
         
-        # 按钮长按检测变量
-        btn1_pressed_time = 0
-        btn2_pressed_time = 0
-        long_press_threshold = 2.0  # 长按阈值
-        
-        # 清除之前的按钮记录
+        # 清除之前的按钮记录和进入界面前残留的事件
         controller.last_button = None
+        gestures.reset()
         
         # 绘制初始页面
         draw_current_page()
@@ -638,155 +618,33 @@ class DisplayManager:
                 print("检测到返回菜单状态，中断等待")
                 return 2
             
-            current_time = time.time()
-            
-            # 检查按钮1 - 改为在释放时检测
-            current_btn1 = GPIO.input(controller.BUTTON_PINS['BTN1'])
-            if current_btn1 == 0 and button_state['BTN1'] == 1:  # 按钮刚被按下
-                btn1_pressed_time = current_time
-            elif current_btn1 == 1 and button_state['BTN1'] == 0:  # 按钮刚被释放
-                if btn1_pressed_time > 0:
-                    press_duration = current_time - btn1_pressed_time
-                    controller.last_button = 'BTN1'
-                    print(f"Button1 按下时长: {press_duration:.2f}秒")
-                    time.sleep(0.1)  # 防抖
-                    return 1  # Button1总是返回1（短按功能）
-            button_state['BTN1'] = current_btn1
-            
-            # 检查按钮2 - 改为在释放时检测短按/长按
-            current_btn2 = GPIO.input(controller.BUTTON_PINS['BTN2'])
-            if current_btn2 == 0 and button_state['BTN2'] == 1:  # 按钮刚被按下
-                btn2_pressed_time = current_time
-            elif current_btn2 == 1 and button_state['BTN2'] == 0:  # 按钮刚被释放
-                if btn2_pressed_time > 0:
-                    press_duration = current_time - btn2_pressed_time
-                    print(f"Button2 按下时长: {press_duration:.2f}秒")
-                    
-                    if press_duration >= long_press_threshold:
-                        # 长按：返回菜单
-                        print("检测到Button2长按，返回菜单")
-                        if context:
-                            context.trigger_return_to_menu()
-                        return 2
-                    else:
-                        # 短按：普通功能
-                        print("检测到Button2短按")
-                        controller.last_button = 'BTN2'
-                        time.sleep(0.1)  # 防抖
-                        return 1
-            button_state['BTN2'] = current_btn2
-            
-            # 检查摇杆上
-            current_up = GPIO.input(controller.JOYSTICK_PINS['UP'])
-            if current_up == 0 and button_state['UP'] == 1:  # 摇杆向上
-                if start_line > 0:
-                    start_line = max(0, start_line - visible_lines)
-                    draw_current_page()
-                    time.sleep(0.1)
-            button_state['UP'] = current_up
-            
-            # 检查摇杆下
-            current_down = GPIO.input(controller.JOYSTICK_PINS['DOWN'])
-            if current_down == 0 and button_state['DOWN'] == 1:  # 摇杆向下
-                if start_line + visible_lines < total_lines:
-                    start_line = min(total_lines - visible_lines, start_line + visible_lines)
-                    draw_current_page()
-                    time.sleep(0.1)
-            button_state['DOWN'] = current_down
-            
-            time.sleep(0.05)  # 减少检查间隔，提高响应性
-
-    def show_continue_drift_option(self, controller, question="是否继续漂流？", context=None):
-        """显示是否继续漂流的选择界面
-        Args:
-            controller: InputController实例
-            question: 显示的问题文本
-            context: DeriveContext实例（可选）
-        Returns:
-            bool: True表示继续，False表示结束
-        """
-        # 创建新图像
-        image = Image.new("1", (self.width, self.height))
-        draw = ImageDraw.Draw(image)
-        
-        try:
-            font = ImageFont.truetype(self.font_path, 12)
-            small_font = ImageFont.truetype(self.font_path, 8)  # 小字体用于提示
-        except:
-            print("警告：无法加载中文字体，将使用默认字体")
-            font = ImageFont.load_default()
-            small_font = ImageFont.load_default()
-        
-        # 处理文本换行 - 将问题文本分行显示
-        lines = self.split_text(question, 18)  # 18个字符一行
-        
-        def draw_question():
-            # 清空图像
-            draw.rectangle((0, 0, self.width, self.height), fill=0)
-            
-            # 绘制问题文本
-            y = 10
-            for line in lines:
-                draw.text((10, y), line, font=font, fill=255)
-                y += 15  # 行间距
-            
-            # 在底部显示按钮选项
-            draw.text((10, 50), "按BT1继续漂流", font=font, fill=255)
-            draw.text((10, 50+15), "按BT2结束漂流", font=font, fill=255)
-            
-            # 在右上角添加按钮提示
-            draw.text((85, 2), "BT1 BT2", font=small_font, fill=255)
-            
-            self._display_image(image)
-        
-        # 保存按钮状态
-        button_state = {
-            'BTN1': GPIO.input(controller.BUTTON_PINS['BTN1']),
-            'BTN2': GPIO.input(controller.BUTTON_PINS['BTN2'])
-        }
-        
-        # 绘制界面
-        draw_question()
-        
-        while True:
-            # 检查context的返回菜单状态（如果提供了context）
-            if context and context.should_return_to_menu():
-                print("检测到返回菜单状态，中断选择")
-                return False
-            
-            # 检查按钮1 (继续漂流)
-            current_btn1 = GPIO.input(controller.BUTTON_PINS['BTN1'])
-            if current_btn1 == 0 and button_state['BTN1'] == 1:  # 按钮被按下
-                time.sleep(0.1)  # 防抖
-                return True
-            button_state['BTN1'] = current_btn1
-            
-            # 检查按钮2 (结束漂流)
-            current_btn2 = GPIO.input(controller.BUTTON_PINS['BTN2'])
-            if current_btn2 == 0 and button_state['BTN2'] == 1:  # 按钮被按下
-                time.sleep(0.1)  # 防抖
-                return False
-            button_state['BTN2'] = current_btn2
+            # 阻塞等待手势，超时只用于定期检查返回菜单状态
+            gesture = gestures.get_gesture(timeout=CONTEXT_CHECK_SECONDS)
+            if gesture is None:
+                continue
             
-            # 检查摇杆上
-            current_up = GPIO.input(controller.JOYSTICK_PINS['UP'])
-            if current_up == 0 and button_state['UP'] == 1:  # 摇杆向上
-                if start_line > 0:
-                    start_line = max(0, start_line - visible_lines)
-                    draw_current_page()
-                    time.sleep(0.1)
-            button_state['UP'] = current_up
+            if gesture.kind == 'long_press' and gesture.name == 'BTN2':
+                # 长按达到阈值立即返回菜单，不必等待释放
+                print("检测到Button2长按，返回菜单")
+                if context:
+                    context.trigger_return_to_menu()
+                return 2
             
-            # 检查摇杆下
-            current_down = GPIO.input(controller.JOYSTICK_PINS['DOWN'])
-            if current_down == 0 and button_state['DOWN'] == 1:  # 摇杆向下
-                if start_line + visible_lines < total_lines:
-                    start_line = min(total_lines - visible_lines, start_line + visible_lines)
-                    draw_current_page()
-                    time.sleep(0.1)
-            button_state['DOWN'] = current_down
+            if gesture.kind == 'short_press':
+                # 短按：普通功能（Button1总是返回1）
+                print(f"Button{gesture.name[-1]} 按下时长: {gesture.duration:.2f}秒")
+                controller.last_button = gesture.name
+                return 1
             
-            time.sleep(0.05)  # 减少检查间隔，提高响应性 
+            # 摇杆翻页，按住不放时连续翻页
+            if gesture.kind not in ('press', 'repeat'):
+                continue
+            if gesture.name == 'UP' and start_line > 0:
+                start_line = max(0, start_line - visible_lines)
+                draw_current_page()
+            elif gesture.name == 'DOWN' and start_line + visible_lines < total_lines:
+                start_line = min(total_lines - visible_lines, start_line + visible_lines)
+                draw_current_page()
 
     def wait_for_selection(self, controller, options, title="请选择", context=None):
         """显示选择列表并等待用户选择
@@ -805,13 +663,8 @@ class DisplayManager:
         image = Image.new("1", (self.width, self.height))
         draw = ImageDraw.Draw(image)
         
-        try:
-            font = ImageFont.truetype(self.font_path, 12)
-            small_font = ImageFont.truetype(self.font_path, 8)  # 小字体用于提示
-        except:
-            print("警告：无法加载中文字体，将使用默认字体")
-            font = ImageFont.load_default()
-            small_font = ImageFont.load_default()
+        font = get_font(12)
+        small_font = get_font(8)  # 小字体用于提示
 
         # 选择状态
         current_selection = 0
@@ -892,13 +745,10 @@ class DisplayManager:
             
             self._display_image(image)
         
-        # 保存按钮和摇杆状态
-        button_state = {
-            'BTN1': GPIO.input(controller.BUTTON_PINS['BTN1']),
-            'BTN2': GPIO.input(controller.BUTTON_PINS['BTN2']),
-            'UP': GPIO.input(controller.JOYSTICK_PINS['UP']),
-            'DOWN': GPIO.input(controller.JOYSTICK_PINS['DOWN'])
-        }
+        gestures = GestureRecognizer(controller)
+        
+        # 清除进入界面前残留的事件
+        gestures.reset()
         
         # 绘制初始界面
         draw_selection()
@@ -909,41 +759,30 @@ class DisplayManager:
                 print("检测到返回菜单状态，中断选择")
                 return -1
             
-            # 检查按钮1 (确认选择)
-            current_btn1 = GPIO.input(controller.BUTTON_PINS['BTN1'])
-            if current_btn1 == 0 and button_state['BTN1'] == 1:  # 按钮被按下
+            gesture = gestures.get_gesture(timeout=CONTEXT_CHECK_SECONDS)
+            if gesture is None:
+                continue
+            
+            if gesture.kind == 'long_press' and gesture.name == 'BTN2':
+                print("检测到Button2长按，返回菜单")
+                if context:
+                    context.trigger_return_to_menu()
+                return -1
+            if gesture.kind == 'short_press' and gesture.name == 'BTN1':  # 确认选择
                 print(f"选择了: {options[current_selection]} (索引: {current_selection})")
-                time.sleep(0.1)  # 防抖
                 return current_selection
-            button_state['BTN1'] = current_btn1
-            
-            # 检查按钮2 (取消/返回)
-            current_btn2 = GPIO.input(controller.BUTTON_PINS['BTN2'])
-            if current_btn2 == 0 and button_state['BTN2'] == 1:  # 按钮被按下
+            if gesture.kind == 'short_press' and gesture.name == 'BTN2':  # 取消/返回
                 print("用户取消选择")
-                time.sleep(0.1)  # 防抖
                 return -1
-            button_state['BTN2'] = current_btn2
-            
-            # 检查摇杆上
-            current_up = GPIO.input(controller.JOYSTICK_PINS['UP'])
-            if current_up == 0 and button_state['UP'] == 1:  # 摇杆向上
-                if current_selection > 0:
-                    current_selection -= 1
-                    draw_selection()
-                    time.sleep(0.2)
-            button_state['UP'] = current_up
             
-            # 检查摇杆下
-            current_down = GPIO.input(controller.JOYSTICK_PINS['DOWN'])
-            if current_down == 0 and button_state['DOWN'] == 1:  # 摇杆向下
-                if current_selection < total_options - 1:
-                    current_selection += 1
-                    draw_selection()
-                    time.sleep(0.2)
-            button_state['DOWN'] = current_down
-            
-            time.sleep(0.05)  # 减少检查间隔
+            if gesture.kind not in ('press', 'repeat'):
+                continue
+            if gesture.name == 'UP' and current_selection > 0:
+                current_selection -= 1
+                draw_selection()
+            elif gesture.name == 'DOWN' and current_selection < total_options - 1:
+                current_selection += 1
+                draw_selection()
 
     def show_continue_drift_option(self, controller, question="是否继续漂流？", context=None):
         """显示是否继续漂流的选择界面
@@ -958,13 +797,8 @@ class DisplayManager:
         image = Image.new("1", (self.width, self.height))
         draw = ImageDraw.Draw(image)
         
-        try:
-            font = ImageFont.truetype(self.font_path, 12)
-            small_font = ImageFont.truetype(self.font_path, 8)  # 小字体用于提示
-        except:
-            print("警告：无法加载中文字体，将使用默认字体")
-            font = ImageFont.load_default()
-            small_font = ImageFont.load_default()
+        font = get_font(12)
+        small_font = get_font(8)  # 小字体用于提示
         
         # 处理文本换行 - 将问题文本分行显示
         lines = self.split_text(question, 18)  # 18个字符一行
@@ -988,11 +822,10 @@ class DisplayManager:
             
             self._display_image(image)
         
-        # 保存按钮状态
-        button_state = {
-            'BTN1': GPIO.input(controller.BUTTON_PINS['BTN1']),
-            'BTN2': GPIO.input(controller.BUTTON_PINS['BTN2'])
-        }
+        gestures = GestureRecognizer(controller)
+        
+        # 清除进入界面前残留的事件
+        gestures.reset()
         
         # 绘制界面
         draw_question()
@@ -1003,36 +836,16 @@ class DisplayManager:
                 print("检测到返回菜单状态，中断选择")
                 return False
             
-            # 检查按钮1 (继续漂流)
-            current_btn1 = GPIO.input(controller.BUTTON_PINS['BTN1'])
-            if current_btn1 == 0 and button_state['BTN1'] == 1:  # 按钮被按下
-                time.sleep(0.1)  # 防抖
-                return True
-            button_state['BTN1'] = current_btn1
+            gesture = gestures.get_gesture(timeout=CONTEXT_CHECK_SECONDS)
+            if gesture is None:
+                continue
             
-            # 检查按钮2 (结束漂流)
-            current_btn2 = GPIO.input(controller.BUTTON_PINS['BTN2'])
-            if current_btn2 == 0 and button_state['BTN2'] == 1:  # 按钮被按下
-                time.sleep(0.1)  # 防抖
+            if gesture.kind == 'long_press' and gesture.name == 'BTN2':
+                print("检测到Button2长按，返回菜单")
+                if context:
+                    context.trigger_return_to_menu()
+                return False
+            if gesture.kind == 'short_press' and gesture.name == 'BTN1':  # 继续漂流
+                return True
+            if gesture.kind == 'short_press' and gesture.name == 'BTN2':  # 结束漂流
                 return False
-            button_state['BTN2'] = current_btn2
-            
-            # 检查摇杆上
-            current_up = GPIO.input(controller.JOYSTICK_PINS['UP'])
-            if current_up == 0 and button_state['UP'] == 1:  # 摇杆向上
-                if start_line > 0:
-                    start_line = max(0, start_line - visible_lines)
-                    draw_current_page()
-                    time.sleep(0.1)
-            button_state['UP'] = current_up
-            
-            # 检查摇杆下
-            current_down = GPIO.input(controller.JOYSTICK_PINS['DOWN'])
-            if current_down == 0 and button_state['DOWN'] == 1:  # 摇杆向下
-                if start_line + visible_lines < total_lines:
-                    start_line = min(total_lines - visible_lines, start_line + visible_lines)
-                    draw_current_page()
-                    time.sleep(0.1)
-            button_state['DOWN'] = current_down
-            
-            time.sleep(0.05)  # 减少检查间隔，提高响应性 
\ No newline at end of file
@@ -0,0 +1,73 @@
+"""
+字体缓存
+
+整个进程共享字体对象，避免每个界面都重新解析几MB的TTC字体文件。
+图集中有的字号（8px、12px）优先使用mmap的预编译位图图集，
+其余字号使用缓存的FreeType字体。
+"""
+
+import os
+import threading
+
+from PIL import ImageFont
+
+from core.display.glyph_atlas import GlyphAtlas
+
+DEFAULT_FONT_PATH = '/usr/share/fonts/truetype/wqy/wqy-microhei.ttc'
+
+_project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+ATLAS_PATH = os.path.join(_project_root, 'assets', 'fonts', 'wqy_microhei.atlas')
+
+_lock = threading.Lock()
+_truetype_fonts = {}
+_atlas = None
+_atlas_loaded = False
+
+
+def get_truetype_font(size, font_path=DEFAULT_FONT_PATH):
+    """获取缓存的FreeType字体，加载失败时返回Pillow默认字体"""
+    key = (font_path, size)
+    font = _truetype_fonts.get(key)
+    if font is None:
+        with _lock:
+            font = _truetype_fonts.get(key)
+            if font is None:
+                try:
+                    font = ImageFont.truetype(font_path, size)
+                except OSError:
+                    print("警告：无法加载中文字体，将使用默认字体")
+                    font = ImageFont.load_default()
+                _truetype_fonts[key] = font
+    return font
+
+
+def get_atlas():
+    """加载（只加载一次）预编译字形图集，文件不存在时返回 None"""
+    global _atlas, _atlas_loaded
+    if not _atlas_loaded:
+        with _lock:
+            if not _atlas_loaded:
+                if os.path.exists(ATLAS_PATH):
+                    try:
+                        _atlas = GlyphAtlas(ATLAS_PATH)
+                    except (OSError, ValueError) as e:
+                        print(f"警告：字形图集加载失败，使用FreeType字体: {e}")
+                else:
+                    print("提示：未找到字形图集，可运行 python -m core.display.glyph_atlas 生成")
+                _atlas_loaded = True
+    return _atlas
+
+
+def get_font(size, font_path=DEFAULT_FONT_PATH):
+    """获取指定字号的字体对象（可直接传给 draw.text）
+
+    默认字体且图集包含该字号时返回 AtlasFont，否则返回缓存的FreeType字体。
+    """
+    if font_path == DEFAULT_FONT_PATH:
+        atlas = get_atlas()
+        font = atlas.get(size) if atlas else None
+        if font is not None:
+            if font.fallback is None:
+                font.fallback = get_truetype_font(size, font_path)
+            return font
+    return get_truetype_font(size, font_path)
@@ -0,0 +1,57 @@
+"""
+帧差分工具
+
+比较前后两帧，找出变化区域并合并为少量包围矩形，用于LCD局部刷新。
+矩形坐标均为包含端点的 (x0, y0, x1, y1)。
+"""
+
+import numpy as np
+
+
+def find_dirty_rects(previous, current, max_rects=4, merge_gap=8):
+    """找出两帧之间变化的矩形区域
+
+    Args:
+        previous: 上一帧 (H, W) 数组
+        current: 当前帧 (H, W) 数组
+        max_rects: 最多返回的矩形数量，多出的会合并
+        merge_gap: 两段变化行之间相隔不超过该行数时合并为同一矩形
+
+    Returns:
+        [(x0, y0, x1, y1), ...]，无变化时返回空列表
+    """
+    changed = previous != current
+    rows = np.flatnonzero(changed.any(axis=1))
+    if rows.size == 0:
+        return []
+
+    # 按行切分成若干条带，相距较近的变化行归为同一条带
+    breaks = np.flatnonzero(np.diff(rows) > merge_gap) + 1
+    rects = []
+    for band in np.split(rows, breaks):
+        y0, y1 = int(band[0]), int(band[-1])
+        cols = np.flatnonzero(changed[y0:y1 + 1].any(axis=0))
+        rects.append((int(cols[0]), y0, int(cols[-1]), y1))
+
+    # 条带过多时，反复合并面积增量最小的相邻一对
+    while len(rects) > max_rects:
+        best_index = 0
+        best_cost = None
+        for i in range(len(rects) - 1):
+            merged = _union(rects[i], rects[i + 1])
+            cost = rect_area(merged) - rect_area(rects[i]) - rect_area(rects[i + 1])
+            if best_cost is None or cost < best_cost:
+                best_index, best_cost = i, cost
+        rects[best_index:best_index + 2] = [_union(rects[best_index], rects[best_index + 1])]
+
+    return rects
+
+
+def rect_area(rect):
+    """矩形面积（像素数）"""
+    x0, y0, x1, y1 = rect
+    return (x1 - x0 + 1) * (y1 - y0 + 1)
+
+
+def _union(a, b):
+    return (min(a[0], b[0]), min(a[1], b[1]), max(a[2], b[2]), max(a[3], b[3]))
@@ -0,0 +1,246 @@
+"""
+预编译位图字形图集
+
+把常用字符（ASCII、中文标点、GB2312一级汉字）在固定字号下预先栅格化为
+1-bit位图，写入一个紧凑的二进制文件。运行时通过mmap映射该文件，
+绘制文字时直接拼接字形位图，不再经过FreeType。
+
+文件格式（小端）：
+    头部:   magic(4s) version(u2) face_count(u2)
+    字号表: size(u2) line_height(u2) glyph_count(u4) index_offset(u4) bitmap_offset(u4)
+    索引:   每个字号一张按码位排序的 GLYPH_DTYPE 表
+    位图:   每个字形按行 np.packbits 打包，行宽 ceil(w / 8) 字节
+
+构建（需要 wqy-microhei 字体）：
+    python -m core.display.glyph_atlas [输出路径]
+"""
+
+import mmap
+import os
+import struct
+import sys
+
+import numpy as np
+from PIL import Image, ImageDraw, ImageFont
+
+ATLAS_MAGIC = b'SLGA'
+ATLAS_VERSION = 1
+ATLAS_SIZES = (8, 12)
+
+_HEADER = struct.Struct('<4sHH')
+_FACE = struct.Struct('<HHIII')
+
+GLYPH_DTYPE = np.dtype([
+    ('codepoint', '<u4'),
+    ('x', '<i2'),        # 相对文字原点（左上，"la"锚点）的偏移
+    ('y', '<i2'),
+    ('width', '<u2'),
+    ('height', '<u2'),
+    ('advance', '<u2'),  # 前进宽度，1/64像素
+    ('offset', '<u4'),   # 位图在位图区内的字节偏移
+])
+
+
+def default_charset():
+    """图集默认包含的字符：ASCII、常用标点符号、GB2312一级汉字"""
+    chars = [chr(cp) for cp in range(0x20, 0x7F)]
+    chars += [chr(cp) for cp in range(0x2010, 0x2028)]  # 破折号、引号、省略号
+    chars += [chr(cp) for cp in range(0x3000, 0x3040)]  # 中文标点
+    chars += [chr(cp) for cp in range(0xFF01, 0xFF5F)]  # 全角符号
+    chars += list("·×÷←↑→↓▲△▼▽●○■□★☆")
+
+    # GB2312一级汉字：区位 16-55 区，55区只有89个字
+    for high in range(0xB0, 0xD8):
+        for low in range(0xA1, 0xFF):
+            if high == 0xD7 and low > 0xF9:
+                break
+            chars.append(bytes((high, low)).decode('gb2312'))
+
+    return ''.join(sorted(set(chars)))
+
+
+def _rasterize(font, size, charset):
+    """用FreeType栅格化字符集，返回 (索引表, 位图字节)"""
+    entries = []
+    blobs = []
+    offset = 0
+    canvas_size = size * 3
+
+    for ch in charset:
+        canvas = Image.new('L', (canvas_size, canvas_size))
+        draw = ImageDraw.Draw(canvas)
+        draw.fontmode = "1"
+        draw.text((size, size), ch, font=font, fill=255)
+        bbox = canvas.getbbox()
+        advance = int(round(font.getlength(ch) * 64))
+
+        if bbox is None:  # 空白字符
+            entries.append((ord(ch), 0, 0, 0, 0, advance, offset))
+            continue
+
+        bits = np.asarray(canvas.crop(bbox)) > 0
+        packed = np.packbits(bits, axis=1).tobytes()
+        entries.append((
+            ord(ch), bbox[0] - size, bbox[1] - size,
+            bbox[2] - bbox[0], bbox[3] - bbox[1], advance, offset,
+        ))
+        blobs.append(packed)
+        offset += len(packed)
+
+    index = np.array(entries, dtype=GLYPH_DTYPE)
+    return index, b''.join(blobs)
+
+
+def build_atlas(font_path, output_path, sizes=ATLAS_SIZES, charset=None):
+    """栅格化字体并写入图集文件
+
+    Returns:
+        int: 写入的字形总数
+    """
+    charset = charset or default_charset()
+    faces = []
+    for size in sizes:
+        font = ImageFont.truetype(font_path, size)
+        ascent, descent = font.getmetrics()
+        index, bitmap = _rasterize(font, size, charset)
+        faces.append((size, ascent + descent, index, bitmap))
+
+    header_size = _HEADER.size + _FACE.size * len(faces)
+    face_headers = []
+    position = header_size
+    for size, line_height, index, bitmap in faces:
+        index_offset = position
+        bitmap_offset = index_offset + index.nbytes
+        face_headers.append(_FACE.pack(size, line_height, len(index), index_offset, bitmap_offset))
+        position = bitmap_offset + len(bitmap)
+
+    os.makedirs(os.path.dirname(os.path.abspath(output_path)), exist_ok=True)
+    tmp_path = output_path + '.tmp'
+    with open(tmp_path, 'wb') as f:
+        f.write(_HEADER.pack(ATLAS_MAGIC, ATLAS_VERSION, len(faces)))
+        for face_header in face_headers:
+            f.write(face_header)
+        for _, _, index, bitmap in faces:
+            f.write(index.tobytes())
+            f.write(bitmap)
+    os.replace(tmp_path, output_path)
+
+    return sum(len(index) for _, _, index, _ in faces)
+
+
+class GlyphAtlas:
+    """mmap映射的字形图集，按字号提供 AtlasFont"""
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, 'rb') as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, version, face_count = _HEADER.unpack_from(self._mmap, 0)
+        if magic != ATLAS_MAGIC or version != ATLAS_VERSION:
+            raise ValueError(f"不是有效的字形图集文件: {path}")
+
+        self.fonts = {}
+        for i in range(face_count):
+            size, line_height, count, index_offset, bitmap_offset = _FACE.unpack_from(
+                self._mmap, _HEADER.size + i * _FACE.size)
+            index = np.frombuffer(self._mmap, dtype=GLYPH_DTYPE, count=count, offset=index_offset)
+            bitmap = np.frombuffer(self._mmap, dtype=np.uint8, offset=bitmap_offset)
+            self.fonts[size] = AtlasFont(size, line_height, index, bitmap)
+
+    def get(self, size):
+        """返回指定字号的 AtlasFont，不存在时返回 None"""
+        return self.fonts.get(size)
+
+
+class AtlasFont:
+    """位图图集字体
+
+    实现了 ImageDraw.text 使用的 getmask/getbbox/getlength 接口，
+    可以像 FreeTypeFont 一样直接传给 draw.text。图集缺少某个字符时，
+    整行交给 fallback 字体（通常是同字号的 FreeTypeFont）绘制。
+    """
+
+    def __init__(self, size, line_height, index, bitmap, fallback=None):
+        self.size = size
+        self.line_height = line_height
+        self.fallback = fallback
+        self._index = index
+        self._bitmap = bitmap
+        self._lookup = {cp: i for i, cp in enumerate(index['codepoint'].tolist())}
+        self._glyphs = {}  # 已解包的字形缓存: 码位 -> (x, y, 0/255位图, 前进宽度)
+
+    def has_text(self, text):
+        lookup = self._lookup
+        return all(ord(ch) in lookup for ch in text)
+
+    def _glyph(self, ch):
+        cp = ord(ch)
+        glyph = self._glyphs.get(cp)
+        if glyph is None:
+            entry = self._index[self._lookup[cp]]
+            width, height = int(entry['width']), int(entry['height'])
+            stride = (width + 7) // 8
+            start = int(entry['offset'])
+            packed = self._bitmap[start:start + stride * height].reshape(height, stride)
+            pixels = np.unpackbits(packed, axis=1, count=width) * np.uint8(255)
+            glyph = (int(entry['x']), int(entry['y']), pixels, entry['advance'] / 64.0)
+            self._glyphs[cp] = glyph
+        return glyph
+
+    def _layout(self, text):
+        """返回 [(x, y, 位图), ...] 和总前进宽度"""
+        placed = []
+        pen = 0.0
+        for ch in text:
+            x, y, pixels, advance = self._glyph(ch)
+            if pixels.size:
+                placed.append((int(pen) + x, y, pixels))
+            pen += advance
+        return placed, pen
+
+    def getlength(self, text, *args, **kwargs):
+        if not self.has_text(text):
+            return self.fallback.getlength(text, *args, **kwargs)
+        return self._layout(text)[1]
+
+    def getbbox(self, text, *args, **kwargs):
+        if not self.has_text(text):
+            return self.fallback.getbbox(text, *args, **kwargs)
+        placed, pen = self._layout(text)
+        if not placed:
+            return (0, 0, int(pen), 0)
+        top = min(y for _, y, _ in placed)
+        bottom = max(y + pixels.shape[0] for _, y, pixels in placed)
+        return (0, top, max(int(pen), max(x + p.shape[1] for x, _, p in placed)), bottom)
+
+    def getmask(self, text, mode="", *args, **kwargs):
+        """返回以文字原点为左上角的 "L" 模式遮罩（ImagingCore）"""
+        if not self.has_text(text):
+            return self._fallback_mask(text, mode)
+
+        placed, pen = self._layout(text)
+        height = max([self.line_height] + [y + p.shape[0] for _, y, p in placed])
+        width = max([int(pen)] + [x + p.shape[1] for x, _, p in placed])
+        canvas = np.zeros((height, max(width, 1)), dtype=np.uint8)
+        for x, y, pixels in placed:
+            x0, y0 = max(x, 0), max(y, 0)
+            region = canvas[y0:y + pixels.shape[0], x0:x + pixels.shape[1]]
+            np.maximum(region, pixels[y0 - y:, x0 - x:], out=region)
+        return Image.fromarray(canvas, 'L').im
+
+    def _fallback_mask(self, text, mode):
+        """FreeType绘制整行，结果平移到以文字原点为左上角的遮罩"""
+        mask, (dx, dy) = self.fallback.getmask2(text, mode or "L")
+        width, height = mask.size
+        canvas = Image.new('L', (max(width + dx, 1), max(height + dy, 1)))
+        canvas.im.paste(mask, (dx, dy, dx + width, dy + height))
+        return canvas.im
+
+
+if __name__ == "__main__":
+    from core.display.font_cache import ATLAS_PATH, DEFAULT_FONT_PATH
+
+    output = sys.argv[1] if len(sys.argv) > 1 else ATLAS_PATH
+    count = build_atlas(DEFAULT_FONT_PATH, output)
+    print(f"✅ 字形图集已生成: {output}（{count} 个字形，{os.path.getsize(output) // 1024} KB）")
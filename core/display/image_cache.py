@@ -0,0 +1,165 @@
+"""
+送屏图像缓存
+
+生成或拍摄的图片保存后，预先转换为屏幕原生格式的旁路文件（sidecar）：
+- <hash>.rgb565  LCD用，已缩放到320x240并旋转180度的大端RGB565帧
+- <hash>.oled    OLED用，缩放到128x64、抖动为1-bit并打包为页格式的显存
+
+文件以图片内容的哈希命名，同一张图片只转换一次。显示时直接mmap旁路文件，
+不再解码、缩放和编码原图。
+"""
+
+import hashlib
+import os
+import threading
+
+import numpy as np
+from PIL import Image
+
+from core.display.image_loader import load_preview_image
+from core.display.lcd_encoder import RGB565Encoder
+from core.display.oled_backend import pack_pages
+
+_project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+DISPLAY_CACHE_DIR = os.path.join(_project_root, '.display_cache')
+
+LCD_SIZE = (320, 240)
+OLED_SIZE = (128, 64)
+
+
+class ImageSidecarCache:
+    """按内容哈希保存送屏帧的磁盘缓存"""
+
+    def __init__(self, cache_dir=DISPLAY_CACHE_DIR, max_entries=64):
+        """
+        Args:
+            cache_dir: 旁路文件目录
+            max_entries: 最多保留的图片数，超出时删除最久未使用的
+        """
+        self.cache_dir = cache_dir
+        self.max_entries = max_entries
+        self._encoder = RGB565Encoder(*LCD_SIZE)
+        self._prepare_lock = threading.Lock()
+        self._key_lock = threading.Lock()
+        self._keys = {}  # 路径 -> ((修改时间, 大小), 内容哈希)
+
+    def content_key(self, path):
+        """图片内容的哈希（文件未变化时直接使用上次的结果）"""
+        stat = os.stat(path)
+        signature = (stat.st_mtime_ns, stat.st_size)
+        with self._key_lock:
+            cached = self._keys.get(path)
+        if cached and cached[0] == signature:
+            return cached[1]
+
+        digest = hashlib.blake2b(digest_size=16)
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(1 << 16), b''):
+                digest.update(chunk)
+        key = digest.hexdigest()
+        with self._key_lock:
+            self._keys[path] = (signature, key)
+        return key
+
+    def sidecar_path(self, key, kind):
+        return os.path.join(self.cache_dir, f"{key}.{kind}")
+
+    def prepare(self, path):
+        """生成图片的LCD和OLED旁路文件（已存在时跳过）
+
+        Returns:
+            str: 内容哈希
+        """
+        key = self.content_key(path)
+        lcd_path = self.sidecar_path(key, 'rgb565')
+        oled_path = self.sidecar_path(key, 'oled')
+
+        with self._prepare_lock:
+            if os.path.exists(lcd_path) and os.path.exists(oled_path):
+                return key
+
+            os.makedirs(self.cache_dir, exist_ok=True)
+            img = load_preview_image(path, LCD_SIZE)
+            if img.size != LCD_SIZE:
+                img = img.resize(LCD_SIZE, Image.BILINEAR)
+            frame = self._encoder.encode_array(img, rotate_180=True)
+            self._write_atomic(lcd_path, frame.tobytes())
+
+            oled_image = img.convert('L').resize(OLED_SIZE, Image.LANCZOS).convert('1')
+            self._write_atomic(oled_path, pack_pages(oled_image).tobytes())
+
+            self._prune()
+        return key
+
+    def prepare_async(self, path):
+        """在后台线程中生成旁路文件，不阻塞调用者"""
+        def worker():
+            try:
+                self.prepare(path)
+            except Exception as e:
+                print(f"⚠️ 预处理送屏图像失败: {e}")
+
+        thread = threading.Thread(target=worker, name="image-sidecar", daemon=True)
+        thread.start()
+        return thread
+
+    def lcd_frame(self, path):
+        """mmap图片的LCD帧，(240, 320) 的只读大端RGB565数组"""
+        return self._map(path, 'rgb565', '>u2', (LCD_SIZE[1], LCD_SIZE[0]))
+
+    def oled_frame(self, path):
+        """mmap图片的OLED显存，(8, 128) 的只读uint8数组"""
+        return self._map(path, 'oled', np.uint8, (OLED_SIZE[1] // 8, OLED_SIZE[0]))
+
+    def _map(self, path, kind, dtype, shape):
+        key = self.content_key(path)
+        sidecar = self.sidecar_path(key, kind)
+        expected_size = int(np.prod(shape)) * np.dtype(dtype).itemsize
+        if not os.path.exists(sidecar) or os.path.getsize(sidecar) != expected_size:
+            if os.path.exists(sidecar):
+                os.remove(sidecar)  # 写入中断留下的残缺文件
+            self.prepare(path)
+        else:
+            os.utime(sidecar)  # 记录最近使用时间，用于淘汰
+        return np.memmap(sidecar, dtype=dtype, mode='r', shape=shape)
+
+    def _write_atomic(self, path, data):
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+
+    def _prune(self):
+        """删除最久未使用的旁路文件，只保留 max_entries 张图片"""
+        entries = {}
+        for name in os.listdir(self.cache_dir):
+            key, _, kind = name.partition('.')
+            if kind in ('rgb565', 'oled'):
+                mtime = os.path.getmtime(os.path.join(self.cache_dir, name))
+                entries[key] = max(entries.get(key, 0), mtime)
+
+        stale = sorted(entries, key=entries.get)[:max(0, len(entries) - self.max_entries)]
+        for key in stale:
+            for kind in ('rgb565', 'oled'):
+                try:
+                    os.remove(self.sidecar_path(key, kind))
+                except FileNotFoundError:
+                    pass
+
+
+_image_cache = None
+_image_cache_lock = threading.Lock()
+
+
+def get_image_cache():
+    """进程内共享的送屏图像缓存"""
+    global _image_cache
+    with _image_cache_lock:
+        if _image_cache is None:
+            _image_cache = ImageSidecarCache()
+        return _image_cache
+
+
+def prepare_image_async(path):
+    """图片保存后调用：后台生成送屏旁路文件"""
+    return get_image_cache().prepare_async(path)
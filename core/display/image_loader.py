@@ -0,0 +1,53 @@
+"""
+小屏预览图解码
+
+相机拍摄的JPEG有几百万像素，而LCD只有320x240。JPEG可以在DCT域按
+1/2、1/4、1/8直接缩小解码，不必先解出全分辨率图像再缩放：
+- 优先使用 simplejpeg（libjpeg-turbo）的 min_width/min_height 缩放解码
+- 没有 simplejpeg 时使用 PIL 的 draft 模式（同样由libjpeg按比例缩小）
+非JPEG图片正常解码。
+"""
+
+from io import BytesIO
+
+from PIL import Image
+
+try:
+    import simplejpeg
+except ImportError:
+    simplejpeg = None
+
+JPEG_SOI = b'\xff\xd8'
+
+
+def load_preview_image(path, size):
+    """解码图片用于小屏预览
+
+    Args:
+        path: 图片路径，或内存中的图片数据（bytes）
+        size: 目标尺寸 (宽, 高)，解码结果不小于该尺寸（原图更小时保持原尺寸）
+
+    Returns:
+        RGB模式的PIL Image，尺寸接近目标尺寸（再由调用者缩放到精确尺寸）
+    """
+    width, height = size
+
+    in_memory = isinstance(path, (bytes, bytearray))
+    if simplejpeg is not None:
+        if in_memory:
+            data = path
+        else:
+            with open(path, 'rb') as f:
+                data = f.read()
+        if data[:2] == JPEG_SOI:
+            try:
+                pixels = simplejpeg.decode_jpeg(
+                    data, colorspace='RGB', min_width=width, min_height=height)
+                return Image.fromarray(pixels, 'RGB')
+            except ValueError as e:
+                print(f"⚠️ simplejpeg解码失败，改用PIL: {e}")
+
+    with Image.open(BytesIO(path) if in_memory else path) as img:
+        if img.format == 'JPEG':
+            img.draft('RGB', (width, height))
+        return img.convert('RGB')
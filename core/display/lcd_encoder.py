@@ -0,0 +1,92 @@
+"""
+LCD帧编码工具
+
+把PIL图像一次性向量化地转换为ST7789所需的大端RGB565字节流：
+- 缩放（最近邻索引表）和180度旋转合并在同一次取样中完成
+- 输出缓冲区在帧之间复用，不再为每帧分配大列表
+"""
+
+import numpy as np
+from PIL import Image
+
+
+class RGB565Encoder:
+    """RGB565帧编码器，持有预分配的输出缓冲区"""
+
+    def __init__(self, width: int = 320, height: int = 240):
+        self.width = width
+        self.height = height
+
+        # 预分配缓冲区：大端帧（直接发送给LCD）和计算用的本机序缓冲
+        self._frame = np.zeros((height, width), dtype='>u2')
+        self._frame_bytes = self._frame.view(np.uint8).reshape(-1)
+        self._pixel = np.empty((height, width), dtype=np.uint16)
+        self._channel = np.empty((height, width), dtype=np.uint16)
+
+        # 缩放索引表缓存: (源宽, 源高, 是否旋转) -> (行索引, 列索引)
+        self._index_cache = {}
+
+    def _index_tables(self, src_width: int, src_height: int, rotate_180: bool):
+        """获取最近邻缩放的行列索引表（旋转通过反转索引顺序实现）"""
+        key = (src_width, src_height, rotate_180)
+        tables = self._index_cache.get(key)
+        if tables is None:
+            rows = (np.arange(self.height) * src_height) // self.height
+            cols = (np.arange(self.width) * src_width) // self.width
+            if rotate_180:
+                rows = rows[::-1]
+                cols = cols[::-1]
+            tables = (rows[:, None], cols[None, :])
+            self._index_cache[key] = tables
+        return tables
+
+    def encode_array(self, image, rotate_180: bool = False) -> np.ndarray:
+        """编码为 (height, width) 的大端RGB565数组
+
+        Args:
+            image: PIL Image对象，或 (H, W, 3) 的uint8 RGB数组
+            rotate_180: 是否同时旋转180度
+
+        Returns:
+            复用的内部帧数组，下次编码前需要用完
+        """
+        if isinstance(image, Image.Image):
+            if image.mode != 'RGB':
+                image = image.convert('RGB')
+            rgb = np.asarray(image)
+        else:
+            rgb = np.asarray(image, dtype=np.uint8)
+
+        src_height, src_width = rgb.shape[:2]
+        if (src_width, src_height) == (self.width, self.height):
+            # 尺寸一致时旋转只是一个反向视图，不产生拷贝
+            src = rgb[::-1, ::-1] if rotate_180 else rgb
+        else:
+            rows, cols = self._index_tables(src_width, src_height, rotate_180)
+            src = rgb[rows, cols]
+
+        pixel = self._pixel
+        channel = self._channel
+
+        # R: 高5位
+        np.copyto(pixel, src[..., 0])
+        pixel &= 0xF8
+        pixel <<= 8
+        # G: 中间6位
+        np.copyto(channel, src[..., 1])
+        channel &= 0xFC
+        channel <<= 3
+        pixel |= channel
+        # B: 低5位
+        np.copyto(channel, src[..., 2])
+        channel >>= 3
+        pixel |= channel
+
+        # 写入大端帧缓冲（赋值时完成字节序转换）
+        self._frame[...] = pixel
+        return self._frame
+
+    def encode(self, image, rotate_180: bool = False) -> memoryview:
+        """编码为可直接发送的字节视图（复用内部缓冲区）"""
+        self.encode_array(image, rotate_180)
+        return memoryview(self._frame_bytes)
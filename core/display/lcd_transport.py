@@ -0,0 +1,211 @@
+"""
+LCD传输层
+
+ST7789的命令/数据字节通过可替换的传输后端发送：
+- SpidevTransport: 硬件SPI（spidev），按块调用writebytes2批量发送
+- BitBangTransport: GPIO软件模拟SPI，作为没有启用SPI时的回退
+- LoopbackTransport: 只记录字节流，用于无硬件测试
+"""
+
+import os
+import time
+
+# 默认引脚（BCM编号），与原BitBangLCD一致
+LCD_PINS = {
+    'DC': 24,
+    'RST': 25,
+    'CS': 8,     # SPI0 CE0
+    'CLK': 11,   # SPI0 SCLK
+    'MOSI': 10,  # SPI0 MOSI
+}
+
+DEFAULT_SPI_SPEED_HZ = 40_000_000
+DEFAULT_CHUNK_SIZE = 4096  # spidev内核缓冲区默认大小
+
+
+class LCDTransport:
+    """LCD传输层基类"""
+
+    name = "base"
+
+    def reset(self):
+        """硬件复位"""
+        raise NotImplementedError
+
+    def write_command(self, cmd, data=None):
+        """发送一个命令字节，以及可选的参数字节"""
+        self._send(bytes((cmd,)), is_data=False)
+        if data:
+            self.write_data(data)
+
+    def write_data(self, data):
+        """发送一段数据（bytes/bytearray/memoryview）"""
+        if len(data):
+            self._send(data, is_data=True)
+
+    def _send(self, buf, is_data):
+        raise NotImplementedError
+
+    def close(self):
+        """释放传输资源"""
+        pass
+
+
+class _GPIOControlMixin:
+    """DC/RST引脚控制（硬件SPI和BitBang共用）"""
+
+    def _setup_control_pins(self, pins):
+        import RPi.GPIO as GPIO
+        self.GPIO = GPIO
+        self.DC = pins['DC']
+        self.RST = pins['RST']
+
+        if not GPIO.getmode():
+            GPIO.setmode(GPIO.BCM)
+        GPIO.setwarnings(False)
+        GPIO.setup(self.DC, GPIO.OUT)
+        GPIO.setup(self.RST, GPIO.OUT)
+
+    def _release_pins(self, *pins):
+        """释放本传输设置过的GPIO引脚（不影响其他设备使用的引脚）"""
+        try:
+            self.GPIO.cleanup(list(pins))
+        except Exception:
+            pass
+
+    def reset(self):
+        """重置显示器"""
+        self.GPIO.output(self.RST, 0)
+        time.sleep(0.05)
+        self.GPIO.output(self.RST, 1)
+        time.sleep(0.05)
+
+
+class BitBangTransport(_GPIOControlMixin, LCDTransport):
+    """GPIO软件模拟SPI（回退方案，每字节8次时钟翻转）"""
+
+    name = "bitbang"
+
+    def __init__(self, pins=None):
+        pins = {**LCD_PINS, **(pins or {})}
+        self._setup_control_pins(pins)
+        self.CS = pins['CS']
+        self.CLK = pins['CLK']
+        self.MOSI = pins['MOSI']
+        for pin in [self.CS, self.CLK, self.MOSI]:
+            self.GPIO.setup(pin, self.GPIO.OUT)
+
+    def _spi_write(self, byte):
+        """BitBang SPI写入一个字节"""
+        GPIO = self.GPIO
+        for i in range(8):
+            GPIO.output(self.CLK, 0)
+            GPIO.output(self.MOSI, (byte & 0x80) != 0)
+            byte <<= 1
+            GPIO.output(self.CLK, 1)
+
+    def _send(self, buf, is_data):
+        GPIO = self.GPIO
+        GPIO.output(self.DC, 1 if is_data else 0)
+        GPIO.output(self.CS, 0)
+        for byte in buf:
+            self._spi_write(byte)
+        GPIO.output(self.CS, 1)
+
+    def close(self):
+        self._release_pins(self.DC, self.RST, self.CS, self.CLK, self.MOSI)
+
+
+class SpidevTransport(_GPIOControlMixin, LCDTransport):
+    """硬件SPI传输（需要在raspi-config中启用SPI）"""
+
+    name = "spidev"
+
+    def __init__(self, bus=0, device=0, speed_hz=DEFAULT_SPI_SPEED_HZ,
+                 chunk_size=DEFAULT_CHUNK_SIZE, pins=None):
+        import spidev
+
+        pins = {**LCD_PINS, **(pins or {})}
+        self.spi = spidev.SpiDev()
+        self.spi.open(bus, device)  # 片选由内核驱动的CE0控制
+        self.spi.max_speed_hz = int(speed_hz)
+        self.spi.mode = 0
+        self.chunk_size = chunk_size
+        self._setup_control_pins(pins)
+
+    def _send(self, buf, is_data):
+        self.GPIO.output(self.DC, 1 if is_data else 0)
+        view = memoryview(buf).cast('B')
+        chunk_size = self.chunk_size
+        for start in range(0, len(view), chunk_size):
+            self.spi.writebytes2(view[start:start + chunk_size])
+
+    def close(self):
+        try:
+            self.spi.close()
+        except Exception:
+            pass
+        self._release_pins(self.DC, self.RST)
+
+
+class LoopbackTransport(LCDTransport):
+    """回环传输：记录所有发送的字节，便于在没有硬件时断言字节流"""
+
+    name = "loopback"
+
+    def __init__(self):
+        self.reset_count = 0
+        self.log = []  # [('cmd'|'data', bytes)]
+
+    def reset(self):
+        self.reset_count += 1
+
+    def _send(self, buf, is_data):
+        kind = 'data' if is_data else 'cmd'
+        chunk = bytes(buf)
+        # 连续的数据写入合并为一条，便于断言
+        if is_data and self.log and self.log[-1][0] == 'data':
+            self.log[-1] = ('data', self.log[-1][1] + chunk)
+        else:
+            self.log.append((kind, chunk))
+
+    def commands(self):
+        """按顺序返回 (命令, 参数字节) 列表"""
+        result = []
+        for kind, chunk in self.log:
+            if kind == 'cmd':
+                result.append((chunk[0], b''))
+            elif result:
+                result[-1] = (result[-1][0], result[-1][1] + chunk)
+        return result
+
+    def clear(self):
+        self.log.clear()
+
+
+def create_lcd_transport(backend=None, speed_hz=None, **kwargs):
+    """创建LCD传输后端
+
+    Args:
+        backend: 'spidev' / 'bitbang' / 'loopback'，默认读取环境变量
+                 SLIME_LCD_TRANSPORT，未设置时优先使用spidev
+        speed_hz: SPI时钟频率，默认读取环境变量 SLIME_LCD_SPI_HZ
+    Returns:
+        LCDTransport实例，spidev不可用时回退到BitBang
+    """
+    backend = (backend or os.getenv("SLIME_LCD_TRANSPORT", "spidev")).lower()
+
+    if backend == "loopback":
+        return LoopbackTransport()
+
+    if backend == "spidev":
+        if speed_hz is None:
+            speed_hz = int(os.getenv("SLIME_LCD_SPI_HZ", DEFAULT_SPI_SPEED_HZ))
+        try:
+            transport = SpidevTransport(speed_hz=speed_hz, **kwargs)
+            print(f"✅ LCD使用硬件SPI传输 ({speed_hz / 1e6:.0f}MHz)")
+            return transport
+        except (ImportError, OSError) as e:
+            print(f"⚠️ 硬件SPI不可用({e})，回退到BitBang传输")
+
+    return BitBangTransport(pins=kwargs.get('pins'))
@@ -0,0 +1,146 @@
+"""
+SSD1306 OLED增量刷新
+
+SSD1306显存按页组织：每页8行像素，每列1个字节。
+记录上一次刷新到屏幕的显存内容，只把变化的页内列段通过
+列/页地址命令发送，而不是每次都重发整屏1KB。
+1-bit图像到页格式的打包使用NumPy位运算一次完成。
+"""
+
+import numpy as np
+from PIL import Image
+
+SET_COL_ADDR = 0x21
+SET_PAGE_ADDR = 0x22
+
+I2C_CONTROL_COMMAND = 0x00  # Co=0, D/C#=0：后续字节都是命令
+I2C_CONTROL_DATA = 0x40     # Co=0, D/C#=1：后续字节都是显存数据
+
+
+def pack_pages(image, out=None):
+    """把1-bit图像打包为SSD1306页格式显存
+
+    Args:
+        image: PIL Image（非"1"模式会先转换）或 (H, W) 的bool数组，H需为8的倍数
+        out: 可选的 (H // 8, W) uint8 目标数组（例如设备显存视图）
+
+    Returns:
+        (H // 8, W) 的uint8数组，每个字节的bit0对应该页最上面一行
+    """
+    if isinstance(image, Image.Image):
+        if image.mode != "1":
+            image = image.convert("1")
+        bits = np.asarray(image)
+    else:
+        bits = np.asarray(image, dtype=bool)
+
+    height, width = bits.shape
+    pages = height // 8
+    packed = np.packbits(bits.reshape(pages, 8, width), axis=1, bitorder='little').reshape(pages, width)
+    if out is None:
+        return packed
+    out[...] = packed
+    return out
+
+
+class SSD1306DeltaFlusher:
+    """adafruit SSD1306_I2C 的页级增量刷新器"""
+
+    def __init__(self, device, segment_gap=8, full_refresh_ratio=0.6):
+        """
+        Args:
+            device: adafruit_ssd1306.SSD1306_I2C 实例
+            segment_gap: 同一页内两段变化相隔不超过该列数时合并发送
+            full_refresh_ratio: 变化字节数超过显存的该比例时直接整屏刷新
+        """
+        self.device = device
+        self.width = device.width
+        self.pages = device.height // 8
+        self.col_offset = (128 - self.width) // 2 if self.width != 128 else 0
+        self.segment_gap = segment_gap
+        self.full_refresh_ratio = full_refresh_ratio
+
+        # device.buffer[0] 是I2C数据控制字节，之后才是显存
+        self._framebuf = np.frombuffer(device.buffer, dtype=np.uint8, offset=1).reshape(self.pages, self.width)
+        self._shadow = None  # 上一次刷新到屏幕的显存副本
+
+        # 统计信息
+        self.last_flush_bytes = 0
+
+    def load_image(self, image):
+        """把图像直接打包写入设备显存（替代 SSD1306_I2C.image 的逐像素循环）"""
+        size = image.size if isinstance(image, Image.Image) else image.shape[::-1]
+        if tuple(size) != (self.width, self.pages * 8):
+            raise ValueError(f"图像尺寸必须与显示器一致 ({self.width}x{self.pages * 8})")
+        pack_pages(image, out=self._framebuf)
+
+    def load_buffer(self, packed):
+        """把已打包好的页格式显存（如预渲染的分页）拷贝到设备显存"""
+        np.copyto(self._framebuf, packed)
+
+    def invalidate(self):
+        """屏幕内容未知（如被其他程序写过），下一次刷新整屏"""
+        self._shadow = None
+
+    def changed_segments(self):
+        """返回变化的列段 [(page, col0, col1), ...]（包含端点）"""
+        if self._shadow is None:
+            return [(page, 0, self.width - 1) for page in range(self.pages)]
+
+        segments = []
+        diff = self._framebuf != self._shadow
+        for page in np.flatnonzero(diff.any(axis=1)):
+            cols = np.flatnonzero(diff[page])
+            breaks = np.flatnonzero(np.diff(cols) > self.segment_gap) + 1
+            for run in np.split(cols, breaks):
+                segments.append((int(page), int(run[0]), int(run[-1])))
+        return segments
+
+    def flush(self):
+        """把显存变化部分发送到屏幕
+
+        Returns:
+            int: 本次发送的显存字节数
+        """
+        if self._shadow is None or getattr(self.device, 'page_addressing', False):
+            return self._flush_full()
+
+        segments = self.changed_segments()
+        if not segments:
+            self.last_flush_bytes = 0
+            return 0
+
+        changed_bytes = sum(col1 - col0 + 1 for _, col0, col1 in segments)
+        if changed_bytes > self.full_refresh_ratio * self.pages * self.width:
+            return self._flush_full()
+
+        for page, col0, col1 in segments:
+            self._write_segment(page, col0, col1)
+
+        np.copyto(self._shadow, self._framebuf)
+        self.last_flush_bytes = changed_bytes
+        return changed_bytes
+
+    def _flush_full(self):
+        self.device.show()
+        if self._shadow is None:
+            self._shadow = self._framebuf.copy()
+        else:
+            np.copyto(self._shadow, self._framebuf)
+        self.last_flush_bytes = self.pages * self.width
+        return self.last_flush_bytes
+
+    def _write_segment(self, page, col0, col1):
+        """设置列/页窗口后写入一段显存（命令和数据各一次I2C传输）"""
+        commands = bytes((
+            I2C_CONTROL_COMMAND,
+            SET_COL_ADDR, col0 + self.col_offset, col1 + self.col_offset,
+            SET_PAGE_ADDR, page, page,
+        ))
+        data = bytes((I2C_CONTROL_DATA,)) + self._framebuf[page, col0:col1 + 1].tobytes()
+
+        i2c_device = self.device.i2c_device
+        with i2c_device:
+            i2c_device.write(commands)
+        with i2c_device:
+            i2c_device.write(data)
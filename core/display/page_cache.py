@@ -0,0 +1,89 @@
+"""
+分页预渲染缓存
+
+滚动文本界面把每一页（包括箭头、页码、按钮提示）渲染一次，
+保存为可以直接送屏的帧（OLED为打包好的页格式显存，LCD为RGB565帧）。
+翻页时只需要交换缓冲区并刷新，不再重新用PIL绘制。
+"""
+
+import threading
+from collections import OrderedDict
+
+
+def page_starts(total_lines, visible_lines, clamp_last=True):
+    """向下翻页时依次经过的起始行
+
+    Args:
+        clamp_last: 最后一页是否对齐到末尾（与 start_line = min(total - visible, ...) 的滚动方式一致）
+    """
+    starts = [0]
+    while starts[-1] + visible_lines < total_lines:
+        next_start = starts[-1] + visible_lines
+        if clamp_last:
+            next_start = min(total_lines - visible_lines, next_start)
+        starts.append(next_start)
+    return starts
+
+
+class RenderedPages:
+    """一段文字的全部分页帧，按起始行索引"""
+
+    def __init__(self, render, starts):
+        """
+        Args:
+            render: render(start_line) -> 送屏帧
+            starts: 需要预先渲染的起始行列表
+        """
+        self._render = render
+        self._frames = {}
+        for start_line in starts:
+            self.frame(start_line)
+
+    def __len__(self):
+        return len(self._frames)
+
+    def frame(self, start_line):
+        """获取某个起始行的帧，未预渲染过的起始行按需渲染后缓存"""
+        frame = self._frames.get(start_line)
+        if frame is None:
+            frame = self._frames[start_line] = self._render(start_line)
+        return frame
+
+
+class PageCache:
+    """有上限的LRU分页缓存，按缓存的总帧数淘汰最久未用的条目"""
+
+    def __init__(self, max_frames=64):
+        self.max_frames = max_frames
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+        # 统计信息
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key, build):
+        """获取缓存的 RenderedPages，不存在时调用 build() 渲染"""
+        with self._lock:
+            pages = self._entries.get(key)
+            if pages is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return pages
+
+        pages = build()
+        with self._lock:
+            self.misses += 1
+            self._entries[key] = pages
+            self._evict()
+        return pages
+
+    def _evict(self):
+        total = sum(len(pages) for pages in self._entries.values())
+        while total > self.max_frames and len(self._entries) > 1:
+            _, pages = self._entries.popitem(last=False)
+            total -= len(pages)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
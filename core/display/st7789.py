@@ -0,0 +1,113 @@
+"""
+ST7789 LCD驱动
+
+与具体传输方式无关：初始化序列和帧写入都通过LCDTransport发送，
+硬件SPI、BitBang和回环测试共用同一套逻辑。
+"""
+
+import time
+
+import numpy as np
+from PIL import Image
+
+from core.display.lcd_encoder import RGB565Encoder
+
+# 初始化序列: (命令, 参数, 发送后等待秒数)
+ST7789_INIT_SEQUENCE = (
+    (0x36, (0xF0,), 0),
+    (0x3A, (0x05,), 0),  # 16-bit/pixel
+    (0xB2, (0x0C, 0x0C, 0x00, 0x33, 0x33), 0),
+    (0xB7, (0x35,), 0),
+    (0xBB, (0x19,), 0),
+    (0xC0, (0x2C,), 0),
+    (0xC2, (0x01,), 0),
+    (0xC3, (0x12,), 0),
+    (0xC4, (0x20,), 0),
+    (0xC6, (0x0F,), 0),
+    (0xD0, (0xA4, 0xA1), 0),
+    (0xE0, (0xD0, 0x04, 0x0D, 0x11, 0x13, 0x2B, 0x3F, 0x54, 0x4C, 0x18, 0x0D, 0x0B, 0x1F, 0x23), 0),
+    (0xE1, (0xD0, 0x04, 0x0C, 0x11, 0x13, 0x2C, 0x3F, 0x44, 0x51, 0x2F, 0x1F, 0x1F, 0x20, 0x23), 0),
+    (0x21, (), 0),        # Display Inversion
+    (0x11, (), 0.12),     # Sleep out
+    (0x29, (), 0),        # Display on
+)
+
+CASET = 0x2A
+RASET = 0x2B
+RAMWR = 0x2C
+
+
+class ST7789:
+    """ST7789 LCD（320x240横屏）"""
+
+    def __init__(self, transport, width=320, height=240):
+        self.transport = transport
+        self.width = width    # 横向宽度
+        self.height = height  # 横向高度
+
+        # 帧编码器（复用输出缓冲区）
+        self.encoder = RGB565Encoder(self.width, self.height)
+
+        # 初始化LCD
+        self._init_lcd()
+
+    def _write_command(self, cmd, data=None):
+        """写入命令"""
+        self.transport.write_command(cmd, bytes(data) if data else None)
+
+    def _write_data(self, data):
+        """写入数据（单个字节或字节序列）"""
+        if isinstance(data, int):
+            data = bytes((data,))
+        self.transport.write_data(data)
+
+    def _init_lcd(self):
+        """初始化LCD"""
+        self.transport.reset()
+        for cmd, params, delay in ST7789_INIT_SEQUENCE:
+            self._write_command(cmd, params)
+            if delay:
+                time.sleep(delay)
+
+    def _set_window(self, x0, y0, x1, y1):
+        """设置写入窗口（包含端点）"""
+        self._write_command(CASET, (x0 >> 8, x0 & 0xFF, x1 >> 8, x1 & 0xFF))
+        self._write_command(RASET, (y0 >> 8, y0 & 0xFF, y1 >> 8, y1 & 0xFF))
+
+    def write_frame(self, pixelbytes):
+        """把已编码的整屏RGB565写入显存（字节视图或编码器输出的帧数组）"""
+        if isinstance(pixelbytes, np.ndarray):
+            pixelbytes = memoryview(pixelbytes.view(np.uint8).reshape(-1))
+        self._set_window(0, 0, self.width - 1, self.height - 1)
+        self._write_command(RAMWR)
+        self.transport.write_data(pixelbytes)
+
+    def write_region(self, frame, rect):
+        """只写入帧中的一个矩形区域
+
+        Args:
+            frame: 已编码的 (height, width) 大端RGB565数组
+            rect: (x0, y0, x1, y1)，包含端点
+        """
+        x0, y0, x1, y1 = rect
+        region = np.ascontiguousarray(frame[y0:y1 + 1, x0:x1 + 1])
+        self._set_window(x0, y0, x1, y1)
+        self._write_command(RAMWR)
+        self.transport.write_data(memoryview(region.view(np.uint8).reshape(-1)))
+
+    def display(self, image, rotate_180=False):
+        """显示图像
+        Args:
+            image: PIL Image对象，任意尺寸会被缩放到屏幕大小
+            rotate_180: 是否在编码时同时旋转180度
+        """
+        self.write_frame(self.encoder.encode(image, rotate_180=rotate_180))
+
+    def clear(self):
+        """清空显示"""
+        black_image = Image.new('RGB', (self.width, self.height), 'black')
+        self.display(black_image)
+
+    def close(self):
+        """释放传输资源"""
+        self.transport.close()
@@ -0,0 +1,131 @@
+"""
+文本排版
+
+按字体的实际字宽（像素）单次扫描完成自动换行：
+- 中文字符之间可以断行，英文单词和数字只在空格处断行
+- 避头尾：行首不出现句号、逗号、右括号等，行尾不留左括号、左引号
+- 超长的英文单词按宽度强制截断
+排版结果按 (文本, 字体, 宽度) 缓存，同一段文字反复分页时只排版一次。
+"""
+
+import threading
+from collections import OrderedDict
+
+# 不能出现在行首的标点
+NO_LINE_START = set("，。、；：？！,.;:?!)]}%）】》」』〉〕”’…—～·")
+# 不能出现在行尾的标点
+NO_LINE_END = set("([{（【《「『〈〔“‘")
+
+LAYOUT_CACHE_SIZE = 256
+
+_lock = threading.Lock()
+_layout_cache = OrderedDict()
+_advance_tables = {}
+
+
+def _is_wide(ch):
+    """中日韩文字和全角符号，前后都可以断行"""
+    return ord(ch) >= 0x2E80
+
+
+def _can_break(prev, ch):
+    """能否在 prev 和 ch 之间换行"""
+    if ch in NO_LINE_START or prev in NO_LINE_END:
+        return False
+    if prev == ' ':
+        return True
+    if ch == ' ':
+        return False
+    return _is_wide(prev) or _is_wide(ch)
+
+
+def _advance_table(font):
+    """字体的单字宽度缓存 {字符: 像素宽度}"""
+    table = _advance_tables.get(font)
+    if table is None:
+        table = _advance_tables.setdefault(font, {})
+    return table
+
+
+def _break_paragraph(paragraph, font, max_width, lines):
+    advances = _advance_table(font)
+    start = 0
+    width = 0.0
+    brk = None       # 最近的断行位置（新行从该下标开始）
+    brk_width = 0.0  # 行首到断行位置的宽度
+    length = len(paragraph)
+    i = 0
+
+    while i < length:
+        ch = paragraph[i]
+        advance = advances.get(ch)
+        if advance is None:
+            advance = advances[ch] = font.getlength(ch)
+
+        if i > start and _can_break(paragraph[i - 1], ch):
+            brk, brk_width = i, width
+
+        if width + advance > max_width and i > start:
+            if ch == ' ':
+                # 溢出的空格直接吞掉
+                lines.append(paragraph[start:i].rstrip(' '))
+                start, width, brk = i + 1, 0.0, None
+                i += 1
+                continue
+            if brk is not None:
+                lines.append(paragraph[start:brk].rstrip(' '))
+                start, width = brk, width - brk_width
+            else:
+                lines.append(paragraph[start:i])
+                start, width = i, 0.0
+            brk = None
+            continue  # 在新行中重新放置当前字符
+
+        width += advance
+        i += 1
+
+    if start < length:
+        lines.append(paragraph[start:])
+
+
+def layout_lines(text, font, max_width, cache=True):
+    """把文本排成不超过 max_width 像素宽的若干行
+
+    Args:
+        text: 文本，'\\n' 为手动换行，空段落保留为空行
+        font: 提供 getlength 的字体对象（FreeTypeFont 或 AtlasFont）
+        max_width: 行宽（像素）
+        cache: 是否缓存结果（逐步生成中的文字每次都不同，不应挤掉缓存中的条目）
+
+    Returns:
+        tuple: 排好的文本行
+    """
+    key = (text, font, max_width)
+    with _lock:
+        lines = _layout_cache.get(key)
+        if lines is not None:
+            _layout_cache.move_to_end(key)
+            return lines
+
+    result = []
+    for paragraph in text.split('\n'):
+        if paragraph:
+            _break_paragraph(paragraph, font, max_width, result)
+        else:
+            result.append('')
+    lines = tuple(result)
+    if not cache:
+        return lines
+
+    with _lock:
+        _layout_cache[key] = lines
+        if len(_layout_cache) > LAYOUT_CACHE_SIZE:
+            _layout_cache.popitem(last=False)
+    return lines
+
+
+def clear_layout_cache():
+    """清空排版缓存（例如更换字体图集后）"""
+    with _lock:
+        _layout_cache.clear()
+        _advance_tables.clear()
@@ -1,10 +1,30 @@
 import RPi.GPIO as GPIO
 import time
-from typing import Dict, Callable, Optional
+import queue
+import threading
+from typing import Dict, Callable, Optional, NamedTuple
 import signal
 
+DEBOUNCE_SECONDS = 0.01      # 边沿触发后等待电平稳定的时间
+POLL_INTERVAL_SECONDS = 0.01  # 边沿检测不可用时的轮询间隔
+SIGNAL_CHECK_SECONDS = 0.5   # 阻塞等待时检查中断信号的间隔
+
+
+class InputEvent(NamedTuple):
+    """一次输入电平变化"""
+    name: str         # 'BTN1', 'BTN2', 'UP', 'DOWN', 'LEFT', 'RIGHT'
+    pressed: bool     # True表示按下，False表示释放
+    timestamp: float  # 电平变化的时间（time.time()）
+
+
 class InputController:
-    """输入控制器类，用于管理摇杆和按钮输入"""
+    """输入控制器类，用于管理摇杆和按钮输入
+
+    引脚电平变化由GPIO边沿中断（add_event_detect）捕获，去抖后作为带时间戳的
+    InputEvent 放入线程安全的事件队列；各种等待函数直接阻塞在队列上，不再轮询。
+    边沿检测不可用时（例如 RPi.GPIO 0.7.1 在新内核上报 "Failed to add edge
+    detection"），退回到单个后台线程轮询，对外接口不变。
+    """
     
     def __init__(self):
         # 定义摇杆引脚
@@ -20,13 +40,14 @@ class InputController:
             'BTN1': 12,   # GPIO12 (SW6)
             'BTN2': 21    # GPIO21 (SW7)
         }
+        self._pin_names = {pin: name for name, pin in {**self.JOYSTICK_PINS, **self.BUTTON_PINS}.items()}
         
         # 初始化GPIO
         GPIO.setmode(GPIO.BCM)
         GPIO.setwarnings(False)
         
         # 设置所有引脚为输入，启用内部上拉电阻
-        for pin in {**self.JOYSTICK_PINS, **self.BUTTON_PINS}.values():
+        for pin in self._pin_names:
             GPIO.setup(pin, GPIO.IN, pull_up_down=GPIO.PUD_UP)
             
         # 存储所有输入状态
@@ -42,6 +63,74 @@ class InputController:
         
         # 记录最后按下的按钮
         self.last_button = None
+        
+        # 事件队列：中断回调线程写入，等待函数读取
+        self.events: "queue.Queue[InputEvent]" = queue.Queue()
+        self._levels = {pin: GPIO.input(pin) for pin in self._pin_names}  # 最近一次确认的电平
+        self._level_lock = threading.Lock()
+        self._stop_polling = threading.Event()
+        self._poll_thread = None
+        self._start_event_detection()
+    
+    def _start_event_detection(self):
+        """为所有引脚启用边沿中断，失败时启动轮询线程"""
+        try:
+            for pin in self._pin_names:
+                try:
+                    # 同一进程中之前的控制器可能已在该引脚上注册
+                    GPIO.remove_event_detect(pin)
+                except Exception:
+                    pass
+                GPIO.add_event_detect(pin, GPIO.BOTH, callback=self._on_edge)
+            self.edge_detection = True
+        except RuntimeError as e:
+            print(f"⚠️ GPIO边沿检测不可用，改用后台轮询: {e}")
+            for pin in self._pin_names:
+                try:
+                    GPIO.remove_event_detect(pin)
+                except Exception:
+                    pass
+            self.edge_detection = False
+            self._poll_thread = threading.Thread(target=self._poll_loop, name="input-poll", daemon=True)
+            self._poll_thread.start()
+    
+    def _on_edge(self, pin):
+        """GPIO中断回调：等待电平稳定后记录一次变化"""
+        timestamp = time.time()
+        time.sleep(DEBOUNCE_SECONDS)
+        self._record_level(pin, GPIO.input(pin), timestamp)
+    
+    def _poll_loop(self):
+        while not self._stop_polling.wait(POLL_INTERVAL_SECONDS):
+            timestamp = time.time()
+            for pin in self._pin_names:
+                self._record_level(pin, GPIO.input(pin), timestamp)
+    
+    def _record_level(self, pin, level, timestamp):
+        with self._level_lock:
+            if level == self._levels[pin]:
+                return  # 抖动或重复的边沿
+            self._levels[pin] = level
+        self.events.put(InputEvent(self._pin_names[pin], level == 0, timestamp))
+    
+    def get_event(self, timeout: Optional[float] = None) -> Optional[InputEvent]:
+        """从事件队列取出下一个输入事件
+        Args:
+            timeout: 最长等待时间（秒），None表示一直等待，0表示不等待
+        Returns:
+            InputEvent，超时返回None
+        """
+        try:
+            if timeout == 0:
+                return self.events.get_nowait()
+            return self.events.get(timeout=timeout)
+        except queue.Empty:
+            return None
+    
+    def clear_events(self):
+        """丢弃队列中尚未处理的事件（例如进入新界面之前的按键）"""
+        while self.get_event(0) is not None:
+            pass
     
     def register_joystick_callback(self, direction: str, callback: Callable):
         """注册摇杆回调函数
@@ -62,39 +151,38 @@ class InputController:
         if button in self.BUTTON_PINS and event_type in self.button_callbacks:
             self.button_callbacks[event_type][button] = callback
     
-    def check_inputs(self) -> Dict[str, bool]:
-        """检查所有输入状态
+    def check_inputs(self, timeout: float = 0) -> Dict[str, bool]:
+        """处理事件队列中的输入事件并调用对应的回调
+        Args:
+            timeout: 队列为空时最多等待第一个事件的时间（秒），默认不等待
         Returns:
             包含所有输入当前状态的字典
         """
-        input_states = {}
-        
-        # 检查摇杆
-        for name, pin in self.JOYSTICK_PINS.items():
-            current_state = GPIO.input(pin)
-            if current_state == 0 and self.joystick_states[pin] == 1:
-                if name in self.joystick_callbacks:
-                    self.joystick_callbacks[name]()
-            input_states[f"JOY_{name}"] = current_state == 0
-            self.joystick_states[pin] = current_state
-        
-        # 检查按钮
-        for name, pin in self.BUTTON_PINS.items():
-            current_state = GPIO.input(pin)
-            # 按下事件
-            if current_state == 0 and self.button_states[pin] == 1:
-                self.last_button = name  # 记录按下的按钮
-                if name in self.button_callbacks['press']:
-                    self.button_callbacks['press'][name]()
-            # 释放事件
-            elif current_state == 1 and self.button_states[pin] == 0:
-                if name in self.button_callbacks['release']:
-                    self.button_callbacks['release'][name]()
-            input_states[name] = current_state == 0
-            self.button_states[pin] = current_state
-            
+        event = self.get_event(timeout)
+        while event is not None:
+            self._dispatch(event)
+            event = self.get_event(0)
+        
+        input_states = {f"JOY_{name}": self.joystick_states[pin] == 0 for name, pin in self.JOYSTICK_PINS.items()}
+        input_states.update({name: self.button_states[pin] == 0 for name, pin in self.BUTTON_PINS.items()})
         return input_states
     
+    def _dispatch(self, event: InputEvent):
+        level = 0 if event.pressed else 1
+        if event.name in self.JOYSTICK_PINS:
+            self.joystick_states[self.JOYSTICK_PINS[event.name]] = level
+            if event.pressed and event.name in self.joystick_callbacks:
+                self.joystick_callbacks[event.name]()
+            return
+        
+        self.button_states[self.BUTTON_PINS[event.name]] = level
+        if event.pressed:
+            self.last_button = event.name  # 记录按下的按钮
+            if event.name in self.button_callbacks['press']:
+                self.button_callbacks['press'][event.name]()
+        elif event.name in self.button_callbacks['release']:
+            self.button_callbacks['release'][event.name]()
+    
     def wait_for_button(self, button_name: str, timeout: float = None) -> bool:
         """等待指定按钮被按下
         
@@ -108,14 +196,8 @@ class InputController:
         if button_name not in self.BUTTON_PINS:
             raise ValueError(f"未知的按钮名称: {button_name}")
         
-        pin = self.BUTTON_PINS[button_name]
-        start_time = time.time()
-        
         print(f"⏳ 等待按钮 {button_name} 被按下...")
         
-        # 获取初始状态
-        last_state = GPIO.input(pin)
-        
         # 添加中断检查标志
         interrupted = False
         
@@ -129,24 +211,21 @@ class InputController:
         original_sigterm = signal.signal(signal.SIGTERM, signal_handler)
         
         try:
+            self.clear_events()
+            deadline = None if timeout is None else time.time() + timeout
             while not interrupted:
-                current_state = GPIO.input(pin)
+                wait_time = SIGNAL_CHECK_SECONDS
+                if deadline is not None:
+                    wait_time = min(wait_time, deadline - time.time())
+                    if wait_time <= 0:
+                        print(f"⏰ 等待按钮 {button_name} 超时")
+                        return False
                 
-                # 检测按钮按下事件（从高电平到低电平）
-                if current_state == 0 and last_state == 1:
+                event = self.get_event(wait_time)
+                if event is not None and event.name == button_name and event.pressed:
                     print(f"✅ 按钮 {button_name} 被按下")
-                    time.sleep(0.1)  # 防抖
                     return True
                 
-                last_state = current_state
-                
-                # 检查超时
-                if timeout is not None and (time.time() - start_time) > timeout:
-                    print(f"⏰ 等待按钮 {button_name} 超时")
-                    return False
-                
-                time.sleep(0.05)  # 减少CPU使用率
-                
         finally:
             # 恢复原来的信号处理器
             signal.signal(signal.SIGINT, original_sigint)
@@ -165,31 +244,22 @@ class InputController:
         Returns:
             str: 被按下的按钮名称，或None（超时）
         """
-        start_time = time.time()
-        
         print("⏳ 等待任意按钮被按下...")
         
-        # 获取所有按钮的初始状态
-        last_states = {name: GPIO.input(pin) for name, pin in self.BUTTON_PINS.items()}
-        
+        self.clear_events()
+        deadline = None if timeout is None else time.time() + timeout
         while True:
-            for button_name, pin in self.BUTTON_PINS.items():
-                current_state = GPIO.input(pin)
-                
-                # 检测按钮按下事件（从高电平到低电平）
-                if current_state == 0 and last_states[button_name] == 1:
-                    print(f"✅ 按钮 {button_name} 被按下")
-                    time.sleep(0.1)  # 防抖
-                    return button_name
-                
-                last_states[button_name] = current_state
-            
-            # 检查超时
-            if timeout is not None and (time.time() - start_time) > timeout:
-                print("⏰ 等待按钮超时")
-                return None
+            wait_time = None
+            if deadline is not None:
+                wait_time = deadline - time.time()
+                if wait_time <= 0:
+                    print("⏰ 等待按钮超时")
+                    return None
             
-            time.sleep(0.05)  # 减少CPU使用率
+            event = self.get_event(wait_time)
+            if event is not None and event.name in self.BUTTON_PINS and event.pressed:
+                print(f"✅ 按钮 {event.name} 被按下")
+                return event.name
     
     def get_button_state(self, button_name: str) -> bool:
         """获取按钮当前状态
@@ -208,6 +278,12 @@ class InputController:
     
     def cleanup(self):
         """清理GPIO资源"""
+        self._stop_polling.set()
+        for pin in self._pin_names:
+            try:
+                GPIO.remove_event_detect(pin)
+            except Exception:
+                pass
         GPIO.cleanup()
 
 # 使用示例
@@ -236,8 +312,7 @@ if __name__ == "__main__":
         print("按 Ctrl+C 退出")
         
         while True:
-            controller.check_inputs()
-            time.sleep(0.1)
+            controller.check_inputs(timeout=None)
             
     except KeyboardInterrupt:
         print("\n程序被用户中断")
@@ -0,0 +1,155 @@
+"""
+按键手势识别
+
+在 InputController 的事件队列之上，按时间戳识别按键手势：
+- press / release：按下和释放
+- short_press：未达到长按阈值就释放（在释放时发出）
+- long_press：按住达到阈值的那一刻立即发出，不必等释放
+- repeat：摇杆按住不放时按固定间隔重复发出
+所有判断都基于事件时间戳和队列等待超时，不使用阻塞的去抖 sleep。
+"""
+
+import time
+from collections import deque
+from typing import NamedTuple, Optional
+
+LONG_PRESS_SECONDS = 2.0       # 普通界面的长按阈值（返回菜单）
+EMERGENCY_HOLD_SECONDS = 3.0   # 子进程运行时紧急退出的长按阈值
+REPEAT_DELAY_SECONDS = 0.5     # 按住后开始自动重复前的等待
+REPEAT_INTERVAL_SECONDS = 0.15  # 自动重复的间隔
+
+BUTTON_NAMES = ('BTN1', 'BTN2')
+JOYSTICK_NAMES = ('UP', 'DOWN', 'LEFT', 'RIGHT')
+
+
+class Gesture(NamedTuple):
+    """一次识别出的手势"""
+    kind: str         # 'press', 'release', 'short_press', 'long_press', 'repeat'
+    name: str         # 按键名称
+    timestamp: float  # 手势发生的时间（time.time()）
+    duration: float   # 距离按下的时间（秒），press 为 0
+
+
+class GestureRecognizer:
+    """把输入事件转换为手势
+
+    按钮识别短按/长按，摇杆识别自动重复。识别器需要由调用者不断调用
+    get_gesture() 驱动；长按和重复在等待队列超时的时刻发出。
+    """
+
+    def __init__(self, controller, long_press_seconds=LONG_PRESS_SECONDS,
+                 repeat_delay=REPEAT_DELAY_SECONDS, repeat_interval=REPEAT_INTERVAL_SECONDS,
+                 long_press_names=BUTTON_NAMES, repeat_names=JOYSTICK_NAMES):
+        """
+        Args:
+            controller: 提供 get_event(timeout) 的 InputController
+            long_press_seconds: 长按阈值（秒）
+            repeat_delay: 按住后开始自动重复前的等待（秒）
+            repeat_interval: 自动重复的间隔（秒）
+            long_press_names: 识别短按/长按的按键
+            repeat_names: 按住时自动重复的按键
+        """
+        self.controller = controller
+        self.long_press_seconds = long_press_seconds
+        self.repeat_delay = repeat_delay
+        self.repeat_interval = repeat_interval
+        self.long_press_names = set(long_press_names)
+        self.repeat_names = set(repeat_names)
+
+        self._pending = deque()
+        self._held = {}  # 按键名称 -> [按下时间, 下一次定时手势的时间]
+
+    def reset(self, clear_events=True):
+        """忘记当前按住的按键（进入新界面时调用）
+
+        Args:
+            clear_events: 同时丢弃控制器队列中尚未处理的事件
+        """
+        self._pending.clear()
+        self._held.clear()
+        if clear_events:
+            self.controller.clear_events()
+
+    def is_held(self, name):
+        """按键当前是否处于按住状态"""
+        return name in self._held
+
+    def get_gesture(self, timeout: Optional[float] = None) -> Optional[Gesture]:
+        """等待下一个手势
+
+        Args:
+            timeout: 最长等待时间（秒），None表示一直等待，0表示不等待
+
+        Returns:
+            Gesture，超时返回None
+        """
+        deadline = None if timeout is None else time.time() + timeout
+        while not self._pending:
+            now = time.time()
+            if self._emit_due(now):
+                break
+
+            if deadline is not None and now >= deadline:
+                # 已超时：只取走已经到达的事件，不再等待
+                event = self.controller.get_event(timeout=0)
+                if event is None:
+                    return None
+                self._handle_event(event)
+                continue
+
+            # 等到下一个事件、下一个长按/重复时刻或超时，取最早者
+            wait_time = None if deadline is None else deadline - now
+            next_due = self._next_due()
+            if next_due is not None:
+                wait_time = next_due - now if wait_time is None else min(wait_time, next_due - now)
+            event = self.controller.get_event(timeout=wait_time)
+            if event is not None:
+                self._handle_event(event)
+        return self._pending.popleft()
+
+    def _next_due(self):
+        due = [state[1] for state in self._held.values() if state[1] is not None]
+        return min(due) if due else None
+
+    def _emit_due(self, now):
+        """发出到期的长按和重复手势，返回是否发出了手势"""
+        emitted = False
+        for name, state in self._held.items():
+            pressed_at, due = state
+            if due is None or due > now:
+                continue
+            if name in self.long_press_names:
+                self._pending.append(Gesture('long_press', name, due, due - pressed_at))
+                state[1] = None  # 长按只发出一次
+            else:
+                self._pending.append(Gesture('repeat', name, due, due - pressed_at))
+                state[1] = due + self.repeat_interval
+            emitted = True
+        return emitted
+
+    def _handle_event(self, event):
+        name = event.name
+        if event.pressed:
+            if name in self._held:
+                return  # 重复的按下事件
+            due = None
+            if name in self.long_press_names:
+                due = event.timestamp + self.long_press_seconds
+            elif name in self.repeat_names:
+                due = event.timestamp + self.repeat_delay
+            self._held[name] = [event.timestamp, due]
+            self._pending.append(Gesture('press', name, event.timestamp, 0.0))
+            return
+
+        state = self._held.pop(name, None)
+        if state is None:
+            return  # 进入界面前就按下的按键
+        pressed_at, due = state
+        duration = event.timestamp - pressed_at
+        if name in self.long_press_names and due is not None and duration >= self.long_press_seconds:
+            # 释放事件先于长按定时到达（调用者没有及时取手势），仍然算长按
+            self._pending.append(Gesture('long_press', name, due, self.long_press_seconds))
+            due = None
+        self._pending.append(Gesture('release', name, event.timestamp, duration))
+        if name in self.long_press_names and due is not None:
+            self._pending.append(Gesture('short_press', name, event.timestamp, duration))
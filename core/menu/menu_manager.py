@@ -1,4 +1,5 @@
 from core.input.button_utils import InputController
+from core.input.gestures import GestureRecognizer, EMERGENCY_HOLD_SECONDS
 from core.display.display_utils import DisplayManager
 from adafruit_ssd1306 import SSD1306_I2C
 import time
@@ -49,8 +50,9 @@ class MenuSystem:
         self.oled = DisplayManager("OLED")
         self.lcd = DisplayManager("LCD")  # 添加LCD显示管理器
         
-        # 初始化输入控制器
+        # 初始化输入控制器（摇杆按住不放时由手势识别器按重复间隔连续移动）
         self.controller = InputController()
+        self.gestures = None
         
         # 菜单选项
         self.menu_items = [
@@ -190,7 +192,6 @@ class MenuSystem:
             return
         if self.oled.menu_up():
             self.display_menu()
-            time.sleep(0.2)
     
     def on_down(self):
         """向下选择"""
@@ -198,7 +199,6 @@ class MenuSystem:
             return
         if self.oled.menu_down(len(self.menu_items)):
             self.display_menu()
-            time.sleep(0.2)
     
     def run_derive_test(self):
         """运行漂流程序 - 使用新架构 + 紧急返回监听"""
@@ -244,6 +244,9 @@ class MenuSystem:
                         self.returncode = returncode
                 result = MockResult(result_code)
             
+            # 子进程在同一块OLED上绘制过，之后的提示整屏刷新
+            self.oled.invalidate()
+            
             # 检查退出码
             if result.returncode == 42:
                 print("检测到长按返回菜单")
@@ -279,12 +282,12 @@ class MenuSystem:
             GPIO.setwarnings(False)
             emergency_controller = InputController()
             
-            # 监听状态
-            btn2_press_start = None
-            btn2_hold_threshold = 3.0  # 长按3秒触发紧急退出
-            check_interval = 0.1  # 每100ms检查一次
+            # 长按达到阈值的那一刻立即触发，不必等待释放
+            gestures = GestureRecognizer(emergency_controller, long_press_seconds=EMERGENCY_HOLD_SECONDS)
+            check_interval = 0.5  # 没有按键时检查子进程的间隔
             
             print("🚨 开始监听紧急退出（长按BTN2 3秒）...")
+            self.oled.invalidate()  # 子进程可能已经开始绘制
             self.oled.show_text_oled("漂流程序运行中\n\n长按BTN2三秒\n可紧急返回菜单")
             
             while True:
@@ -296,48 +299,35 @@ class MenuSystem:
                     emergency_controller.cleanup()
                     return poll_result
                 
-                # 检查按钮状态
-                emergency_controller.check_inputs()
-                
-                # 检查BTN2是否被按下
-                btn2_state = emergency_controller.get_button_state('BTN2')
-                current_time = time.time()
-                
-                if btn2_state:  # BTN2被按下
-                    if btn2_press_start is None:
-                        btn2_press_start = current_time
-                        print("🔘 检测到BTN2按下，开始计时...")
-                    else:
-                        hold_duration = current_time - btn2_press_start
-                        if hold_duration >= btn2_hold_threshold:
-                            # 长按时间足够，触发紧急退出
-                            print(f"🚨 BTN2长按{hold_duration:.1f}秒，触发紧急退出！")
-                            
-                            # 显示终止提示
-                            self.oled.show_text_oled("紧急退出中...\n\n正在终止程序\n请稍候...")
-                            
-                            # 终止子进程
-                            try:
-                                proc.terminate()
-                                time.sleep(1)
-                                if proc.poll() is None:
-                                    print("⚠️ 温和终止失败，强制杀死进程...")
-                                    proc.kill()
-                                    time.sleep(0.5)
-                            except Exception as kill_error:
-                                print(f"终止进程时出错: {kill_error}")
-                            
-                            emergency_controller.cleanup()
-                            return 99  # 紧急退出码
-                else:  # BTN2未被按下
-                    if btn2_press_start is not None:
-                        # 按钮释放了
-                        hold_duration = current_time - btn2_press_start
-                        print(f"🔘 BTN2释放，持续时间: {hold_duration:.1f}秒")
-                        btn2_press_start = None
+                gesture = gestures.get_gesture(timeout=check_interval)
+                if gesture is None or gesture.name != 'BTN2':
+                    continue
                 
-                # 短暂休眠避免CPU占用过高
-                time.sleep(check_interval)
+                if gesture.kind == 'press':
+                    print("🔘 检测到BTN2按下，开始计时...")
+                elif gesture.kind == 'release':
+                    print(f"🔘 BTN2释放，持续时间: {gesture.duration:.1f}秒")
+                elif gesture.kind == 'long_press':
+                    # 长按时间足够，触发紧急退出
+                    print(f"🚨 BTN2长按{gesture.duration:.1f}秒，触发紧急退出！")
+                    
+                    # 显示终止提示（子进程绘制过屏幕，整屏刷新）
+                    self.oled.invalidate()
+                    self.oled.show_text_oled("紧急退出中...\n\n正在终止程序\n请稍候...")
+                    
+                    # 终止子进程
+                    try:
+                        proc.terminate()
+                        time.sleep(1)
+                        if proc.poll() is None:
+                            print("⚠️ 温和终止失败，强制杀死进程...")
+                            proc.kill()
+                            time.sleep(0.5)
+                    except Exception as kill_error:
+                        print(f"终止进程时出错: {kill_error}")
+                    
+                    emergency_controller.cleanup()
+                    return 99  # 紧急退出码
                 
         except Exception as monitor_error:
             print(f"❌ 监听过程出错: {monitor_error}")
@@ -1154,13 +1144,41 @@ class MenuSystem:
         """显示菜单"""
         self.oled.show_menu(self.menu_items)
     
+    def check_inputs(self, timeout=0):
+        """处理输入手势并调用控制器中注册的回调
+
+        摇杆的按下和按住后的自动重复都触发移动，移动节奏由手势识别器的
+        重复延迟/间隔控制，回调中不需要去抖等待。
+        """
+        if self.gestures is None or self.gestures.controller is not self.controller:
+            self.gestures = GestureRecognizer(self.controller)
+        gestures = self.gestures
+        gesture = gestures.get_gesture(timeout=timeout)
+        # 回调可能重新创建了控制器（如运行子程序后），此时停止处理旧控制器的事件
+        while gesture is not None and gestures.controller is self.controller:
+            self._dispatch_gesture(gesture)
+            gesture = gestures.get_gesture(timeout=0)
+
+    def _dispatch_gesture(self, gesture):
+        callbacks = self.controller.joystick_callbacks
+        if gesture.name in callbacks:
+            if gesture.kind in ('press', 'repeat'):
+                callbacks[gesture.name]()
+            return
+        if gesture.kind in ('press', 'release'):
+            if gesture.kind == 'press':
+                self.controller.last_button = gesture.name
+            callback = self.controller.button_callbacks[gesture.kind].get(gesture.name)
+            if callback is not None:
+                callback()
+
     def run_step(self):
         """执行一次主循环"""
         if self.should_exit:
             return False
-        self.controller.check_inputs()
+        # 阻塞等待输入事件，超时后刷新一次显示（更新状态指示器）
+        self.check_inputs(timeout=self.oled.indicator_interval)
         self.display_menu()  # 刷新显示
-        time.sleep(0.1)  # 避免CPU占用过高
         return True
     
     def cleanup(self):
@@ -1186,10 +1204,18 @@ class MenuSystem:
             if hasattr(self, 'oled'):
                 try:
                     self.oled.clear()
+                    self.oled.wait_for_flush(timeout=1.0)
                     print("✅ OLED已清理")
                 except Exception as oled_error:
                     print(f"⚠️ OLED清理失败: {oled_error}")
             
+            # 等待LCD合成线程送完剩余帧（LCD的DC/RST引脚依赖GPIO）
+            if hasattr(self, 'lcd'):
+                try:
+                    self.lcd.wait_for_flush(timeout=1.0)
+                except Exception as lcd_error:
+                    print(f"⚠️ LCD刷新等待失败: {lcd_error}")
+            
             # 4. 清理GPIO（最终步骤）
             try:
                 GPIO.cleanup()
@@ -1217,20 +1243,17 @@ class MenuSystem:
         def on_up():
             if text_controller['up']():
                 text_controller['draw']()
-                time.sleep(0.2)
         
         def on_down():
             if text_controller['down']():
                 text_controller['draw']()
-                time.sleep(0.2)
         
         self.controller.register_joystick_callback('UP', on_up)
         self.controller.register_joystick_callback('DOWN', on_down)
         
         # 等待按钮1被按下
         while not self.should_exit:
-            self.controller.check_inputs()
-            time.sleep(0.1)
+            self.check_inputs(timeout=0.5)
         
         # 恢复原来的回调
         self.controller.register_joystick_callback('UP', original_up)
@@ -1249,7 +1272,9 @@ class MenuSystem:
             except Exception as gpio_error:
                 print(f"⚠️ GPIO重新设置警告: {gpio_error}")
             
-            # 重新初始化其他组件
+            # 重新初始化其他组件（先释放旧显示管理器占用的SPI/I2C设备）
+            for display in (self.oled, self.lcd):
+                display.close()
             self.oled = DisplayManager("OLED")
             self.lcd = DisplayManager("LCD")
             self.controller = InputController()
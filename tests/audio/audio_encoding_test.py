@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+测试上传前的音频编码（PyAV不可用时退回LINEAR16）
+"""
+
+import os
+import sys
+import tempfile
+import wave
+
+import numpy as np
+
+# 添加项目根目录到Python路径
+project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, project_root)
+
+from core.audio import audio_encoding
+from core.audio.audio_encoding import encode_audio, submit, write_wav
+
+SAMPLERATE = 16000
+
+
+def tone(seconds=1.0, channels=1):
+    t = np.arange(int(SAMPLERATE * seconds)) / SAMPLERATE
+    mono = (np.sin(2 * np.pi * 440 * t) * 3000).astype(np.int16)
+    return np.repeat(mono[:, None], channels, axis=1)
+
+
+def test_linear16_is_raw_pcm():
+    samples = tone()
+    data, encoding = encode_audio(samples, SAMPLERATE, codec="linear16")
+    assert encoding == "LINEAR16"
+    assert data == samples.tobytes()
+
+
+def test_compressed_upload_is_smaller():
+    samples = tone(2.0)
+    data, encoding = submit(encode_audio, samples, SAMPLERATE, 1, "flac").result()
+    if audio_encoding.av is None:
+        assert encoding == "LINEAR16"
+        return
+    assert encoding == "FLAC"
+    assert data[:4] == b"fLaC"
+    assert len(data) < samples.nbytes / 2
+
+
+def test_write_wav_roundtrip():
+    samples = tone(0.5, channels=2)
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "dump.wav")
+        write_wav(path, samples, SAMPLERATE, channels=2)
+        with wave.open(path, "rb") as wf:
+            assert wf.getnchannels() == 2
+            assert wf.getframerate() == SAMPLERATE
+            assert wf.readframes(wf.getnframes()) == samples.tobytes()
+
+
+def test_debug_dump_disabled_by_default():
+    if audio_encoding.DEBUG_WAV_DIR:
+        return
+    assert audio_encoding.dump_debug_wav(tone(), SAMPLERATE) is None
+
+
+if __name__ == "__main__":
+    test_linear16_is_raw_pcm()
+    test_compressed_upload_is_smaller()
+    test_write_wav_roundtrip()
+    test_debug_dump_disabled_by_default()
+    print("✅ 音频编码测试通过")
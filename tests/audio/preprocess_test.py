@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+测试识别前的音频预处理（用合成的低电平语音和静音）
+"""
+
+import os
+import sys
+
+import numpy as np
+
+# 添加项目根目录到Python路径
+project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, project_root)
+
+from core.audio.preprocess import (MAX_GAIN, TARGET_PEAK, TRIM_PAD_SECONDS,
+                                   StreamPreprocessor, preprocess, resample)
+
+SAMPLERATE = 16000
+
+
+def noise(seconds, level=20, seed=0, rate=SAMPLERATE):
+    rng = np.random.default_rng(seed)
+    return rng.standard_normal(int(rate * seconds)) * level
+
+
+def voice(seconds, level=3000, rate=SAMPLERATE):
+    t = np.arange(int(rate * seconds)) / rate
+    return sum(np.sin(2 * np.pi * 200 * k * t) / k for k in range(1, 4)) / 2 * level
+
+
+def quiet_utterance(rate=SAMPLERATE, dc=0):
+    audio = np.concatenate((noise(2.0, rate=rate), voice(1.0, rate=rate) + noise(1.0, seed=1, rate=rate),
+                            noise(2.0, seed=2, rate=rate)))
+    return (audio + dc).astype(np.int16)
+
+
+def test_trims_leading_and_trailing_silence():
+    result = preprocess(quiet_utterance(), SAMPLERATE)
+    assert abs(result.original_seconds - 5.0) < 1e-6
+    # 只保留1秒语音和两端的留白
+    assert abs(result.seconds - (1.0 + 2 * TRIM_PAD_SECONDS)) < 0.1
+    assert abs(result.trimmed_seconds - (5.0 - result.seconds)) < 1e-6
+
+
+def test_gain_normalizes_quiet_speech():
+    result = preprocess(quiet_utterance(), SAMPLERATE)
+    assert 1.0 < result.gain <= MAX_GAIN
+    peak = np.abs(result.samples.astype(np.int32)).max()
+    assert 0.7 * TARGET_PEAK < peak <= 32767
+
+
+def test_removes_dc_offset():
+    result = preprocess(quiet_utterance(dc=800), SAMPLERATE, trim=False)
+    assert abs(float(result.samples.mean())) < 50
+
+
+def test_downmix_and_resample():
+    mono = quiet_utterance(rate=48000)
+    stereo = np.repeat(mono[:, None], 2, axis=1)
+    result = preprocess(stereo, 48000, channels=2, trim=False)
+    assert result.samplerate == SAMPLERATE
+    assert result.samples.ndim == 1
+    assert abs(result.samples.size - mono.size // 3) <= 1
+    assert resample(np.ones(441, dtype=np.float32), 44100).size == 160
+
+
+def test_silence_only_is_kept():
+    result = preprocess(noise(1.0).astype(np.int16), SAMPLERATE)
+    assert abs(result.seconds - 1.0) < 1e-6
+
+
+def test_stream_holds_audio_until_speech():
+    pre = StreamPreprocessor(SAMPLERATE)
+    audio = quiet_utterance()
+    block = SAMPLERATE // 10
+    sent = []
+    for i in range(0, audio.size, block):
+        processed = pre.process(audio[i:i + block].tobytes())
+        sent += pre.gate(processed, speech_started=i >= 2 * SAMPLERATE)
+    sent += pre.flush()
+
+    # 说话前只保留约pad秒
+    assert abs(pre.trimmed_seconds - (2.0 - TRIM_PAD_SECONDS)) < 0.15
+    assert abs(sum(len(b) for b in sent) / 2 / SAMPLERATE - pre.sent_seconds) < 1e-6
+    assert pre.gain > 1.0
+    assert "裁掉静音" in pre.describe()
+
+
+def test_stream_resamples_and_downmixes():
+    pre = StreamPreprocessor(48000, channels=2)
+    chunk = np.repeat(voice(0.1, rate=48000).astype(np.int16)[:, None], 2, axis=1)
+    processed = pre.process(chunk.tobytes())
+    assert processed.dtype == np.int16
+    assert processed.size == 1600
+
+
+if __name__ == "__main__":
+    test_trims_leading_and_trailing_silence()
+    test_gain_normalizes_quiet_speech()
+    test_removes_dc_offset()
+    test_downmix_and_resample()
+    test_silence_only_is_kept()
+    test_stream_holds_audio_until_speech()
+    test_stream_resamples_and_downmixes()
+    print("✅ 音频预处理测试通过")
@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+"""
+测试语音识别引擎的选择逻辑（用假引擎模拟在线、离线和延迟）
+"""
+
+import os
+import sys
+import time
+
+# 添加项目根目录到Python路径
+project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, project_root)
+
+from core.audio import stt_engines
+from core.audio.stt_engines import EngineSelector, GoogleEngine, GOOGLE_MAX_LATENCY_SECONDS
+
+
+class FakeEngine:
+    def __init__(self, name, available=True, online=True):
+        self.name = name
+        self._available = available
+        self.online = online
+        self.marked_offline = False
+
+    def available(self):
+        return self._available
+
+    def is_online(self):
+        return self.online
+
+    def mark_offline(self):
+        self.marked_offline = True
+
+
+def names(engines):
+    return [engine.name for engine in engines]
+
+
+def test_prefers_google_when_online():
+    selector = EngineSelector([FakeEngine("google"), FakeEngine("vosk")], preference="auto")
+    assert names(selector.select()) == ["google", "vosk"]
+
+
+def test_offline_uses_vosk_first():
+    selector = EngineSelector([FakeEngine("google", online=False), FakeEngine("vosk")], preference="auto")
+    assert names(selector.select()) == ["vosk", "google"]
+
+
+def test_unavailable_engine_skipped():
+    selector = EngineSelector([FakeEngine("google", available=False), FakeEngine("vosk")], preference="auto")
+    assert names(selector.select()) == ["vosk"]
+
+
+def test_high_latency_switches_to_vosk():
+    selector = EngineSelector([FakeEngine("google"), FakeEngine("vosk")], preference="auto")
+    selector.record_latency("google", GOOGLE_MAX_LATENCY_SECONDS + 1.0)
+    assert names(selector.select()) == ["vosk", "google"]
+
+    # 一段时间后重新尝试Google
+    selector.measured_at["google"] = time.time() - stt_engines.FAILURE_BACKOFF_SECONDS - 1
+    assert names(selector.select()) == ["google", "vosk"]
+
+
+def test_latency_is_smoothed():
+    selector = EngineSelector([FakeEngine("google")], preference="auto")
+    selector.record_latency("google", 1.0)
+    selector.record_latency("google", 2.0)
+    expected = 1.0 + stt_engines.LATENCY_SMOOTHING * 1.0
+    assert abs(selector.latency["google"] - expected) < 1e-9
+
+
+def test_failure_backs_off_and_recovers():
+    google = FakeEngine("google")
+    selector = EngineSelector([google, FakeEngine("vosk")], preference="auto")
+    selector.record_failure("google")
+    assert google.marked_offline
+    assert names(selector.select()) == ["vosk", "google"]
+
+    # 成功测得延迟后清除失败记录
+    selector.record_latency("google", 0.5)
+    assert names(selector.select()) == ["google", "vosk"]
+
+
+def test_explicit_preference():
+    selector = EngineSelector([FakeEngine("google"), FakeEngine("vosk")], preference="vosk")
+    assert names(selector.select()) == ["vosk", "google"]
+
+
+class FakeTransport:
+    def __init__(self):
+        self.closed = False
+
+    def close(self):
+        self.closed = True
+
+
+class FakeClient:
+    def __init__(self):
+        self.transport = FakeTransport()
+
+
+def test_failure_drops_google_channel():
+    google = GoogleEngine()
+    client = FakeClient()
+    google._client = client
+    selector = EngineSelector([google], preference="auto")
+    assert selector.get("google") is google
+    assert selector.get("vosk") is None
+
+    selector.record_failure("google")
+    assert client.transport.closed
+    assert google._client is None
+
+
+def test_unhealthy_google_refuses_to_start():
+    google = GoogleEngine()
+    google.check_health = lambda: False
+    try:
+        google.start(16000, 1, "zh-CN")
+    except ConnectionError:
+        pass
+    else:
+        assert False, "通道不可用时应在开始录音前报错"
+
+
+if __name__ == "__main__":
+    test_prefers_google_when_online()
+    test_offline_uses_vosk_first()
+    test_unavailable_engine_skipped()
+    test_high_latency_switches_to_vosk()
+    test_latency_is_smoothed()
+    test_failure_backs_off_and_recovers()
+    test_explicit_preference()
+    test_failure_drops_google_channel()
+    test_unhealthy_google_refuses_to_start()
+    print("✅ 语音识别引擎选择测试通过")
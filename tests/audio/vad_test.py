@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+测试语音活动检测（用合成音频模拟说话和静音）
+"""
+
+import os
+import sys
+
+import numpy as np
+
+# 添加项目根目录到Python路径
+project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, project_root)
+
+from core.audio.vad import VoiceActivityDetector
+
+SAMPLERATE = 16000
+
+
+def noise(seconds, level=50, seed=0):
+    rng = np.random.default_rng(seed)
+    return (rng.standard_normal(int(SAMPLERATE * seconds)) * level).astype(np.int16)
+
+
+def voice(seconds, level=4000):
+    t = np.arange(int(SAMPLERATE * seconds)) / SAMPLERATE
+    # 基频200Hz加几个谐波，模拟浊音
+    wave = sum(np.sin(2 * np.pi * 200 * k * t) / k for k in range(1, 4))
+    return (wave / 2 * level).astype(np.int16) + noise(seconds, seed=1)
+
+
+def feed(vad, audio, chunk_seconds=0.1):
+    """按录音回调的块大小送入，返回结束时已分析的时长"""
+    chunk = int(SAMPLERATE * chunk_seconds)
+    for start in range(0, audio.size, chunk):
+        vad.process(audio[start:start + chunk].tobytes())
+        if vad.ended:
+            break
+    return vad.elapsed
+
+
+def test_ends_after_trailing_silence():
+    vad = VoiceActivityDetector(SAMPLERATE, trailing_silence=1.0)
+    audio = np.concatenate((noise(1.0), voice(2.0), noise(5.0)))
+    elapsed = feed(vad, audio)
+
+    assert vad.ended
+    assert vad.speech_started
+    assert 1.8 <= vad.speech_seconds <= 2.2
+    # 1秒噪声 + 2秒说话 + 1秒静音后结束，不会录满8秒
+    assert 3.8 <= elapsed <= 4.3
+
+
+def test_short_pause_does_not_end():
+    vad = VoiceActivityDetector(SAMPLERATE, trailing_silence=1.0)
+    audio = np.concatenate((noise(0.5), voice(1.0), noise(0.5), voice(1.0)))
+    feed(vad, audio)
+    assert vad.state == VoiceActivityDetector.SPEECH
+
+
+def test_no_speech_timeout():
+    vad = VoiceActivityDetector(SAMPLERATE, no_speech_timeout=2.0)
+    elapsed = feed(vad, noise(5.0))
+    assert vad.ended and not vad.speech_started
+    assert 1.9 <= elapsed <= 2.2
+
+
+def test_noise_floor_adapts_to_loud_background():
+    # 较大的持续背景噪声不应被当成说话
+    vad = VoiceActivityDetector(SAMPLERATE, no_speech_timeout=None)
+    feed(vad, noise(3.0, level=600))
+    assert vad.state == VoiceActivityDetector.WAITING
+
+
+def test_stereo_input():
+    vad = VoiceActivityDetector(SAMPLERATE, trailing_silence=0.5)
+    mono = np.concatenate((noise(0.5), voice(1.0), noise(1.0)))
+    stereo = np.repeat(mono, 2)
+    vad.process(stereo.tobytes(), channels=2)
+    assert vad.ended and vad.speech_started
+
+
+if __name__ == "__main__":
+    test_ends_after_trailing_silence()
+    test_short_pause_does_not_end()
+    test_no_speech_timeout()
+    test_noise_floor_adapts_to_loud_background()
+    test_stereo_input()
+    print("✅ 语音活动检测测试通过")
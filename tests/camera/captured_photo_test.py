@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""
+测试内存中的照片（预览、base64编码、后台存档）
+"""
+
+import base64
+import os
+import sys
+import tempfile
+from io import BytesIO
+
+# 添加项目根目录到Python路径
+project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, project_root)
+
+from PIL import Image
+
+from core.camera import captured_photo
+from core.camera.captured_photo import CapturedPhoto, get_captured_photo, wait_pending_saves
+
+
+def make_jpeg(size=(1280, 960)):
+    buffer = BytesIO()
+    Image.new("RGB", size, (200, 120, 40)).save(buffer, format="JPEG")
+    return buffer.getvalue()
+
+
+def test_base64_and_size():
+    jpeg = make_jpeg()
+    photo = CapturedPhoto(jpeg)
+    assert photo.size == (1280, 960)
+    assert base64.b64decode(photo.to_base64()) == jpeg
+    assert photo.data_url().startswith("data:image/jpeg;base64,")
+
+
+def test_preview_from_memory():
+    photo = CapturedPhoto(make_jpeg())
+    preview = photo.preview((320, 240))
+    assert preview.size == (320, 240)
+    assert preview.mode == "RGB"
+
+
+def test_save_async_registers_path():
+    jpeg = make_jpeg((64, 48))
+    photo = CapturedPhoto(jpeg)
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "photo.jpg")
+        photo.save_async(path)
+        # 写盘完成之前就可以按路径取得内存中的照片
+        assert get_captured_photo(path) is photo
+        photo.wait_saved()
+        with open(path, "rb") as f:
+            assert f.read() == jpeg
+    assert get_captured_photo(os.path.join(tmp, "other.jpg")) is None
+
+
+def test_wait_pending_saves_joins_all_writers():
+    jpeg = make_jpeg((64, 48))
+    with tempfile.TemporaryDirectory() as tmp:
+        paths = [os.path.join(tmp, f"photo{i}.jpg") for i in range(3)]
+        for path in paths:
+            CapturedPhoto(jpeg).save_async(path)
+        assert wait_pending_saves(timeout=5.0)
+        assert not captured_photo._pending_writers
+        for path in paths:
+            with open(path, "rb") as f:
+                assert f.read() == jpeg
+
+
+if __name__ == "__main__":
+    test_base64_and_size()
+    test_preview_from_memory()
+    test_save_async_registers_path()
+    test_wait_pending_saves_joins_all_writers()
+    print("✅ 内存照片测试通过")
@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+测试照片质量评分和连拍选优
+"""
+
+import os
+import sys
+from io import BytesIO
+
+import numpy as np
+from PIL import Image, ImageFilter
+
+# 添加项目根目录到Python路径
+project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, project_root)
+
+from core.camera import photo_quality
+from core.camera.photo_quality import capture_best, laplacian_variance, score_gray, score_jpeg
+
+
+def checkerboard(size=(640, 480), cell=8, low=60, high=190):
+    ys, xs = np.indices((size[1], size[0]))
+    return np.where(((xs // cell) + (ys // cell)) % 2, high, low).astype(np.uint8)
+
+
+def to_jpeg(gray):
+    buffer = BytesIO()
+    Image.fromarray(gray, 'L').convert('RGB').save(buffer, format='JPEG', quality=90)
+    return buffer.getvalue()
+
+
+def test_numpy_laplacian_matches_definition():
+    gray = np.zeros((5, 5), dtype=np.uint8)
+    gray[2, 2] = 10
+    saved, photo_quality.cv2 = photo_quality.cv2, None
+    try:
+        # 中心 -40，四邻域各 +10，其余为 0
+        expected = np.var([-40, 10, 10, 10, 10, 0, 0, 0, 0])
+        assert abs(laplacian_variance(gray) - expected) < 1e-3
+    finally:
+        photo_quality.cv2 = saved
+
+
+def test_sharp_image_has_no_problem():
+    score = score_gray(checkerboard())
+    assert score.problem is None
+    assert score.sharpness > photo_quality.MIN_SHARPNESS
+
+
+def test_blurry_and_dark_images_flagged():
+    blurred = Image.fromarray(checkerboard()).filter(ImageFilter.GaussianBlur(8))
+    assert score_gray(np.asarray(blurred)).problem == "照片模糊"
+
+    dark = np.full((480, 640), 8, dtype=np.uint8)
+    assert score_gray(dark).problem == "照片太暗"
+
+    bright = np.full((480, 640), 250, dtype=np.uint8)
+    assert score_gray(bright).problem == "照片过曝"
+
+
+def test_burst_keeps_sharpest():
+    sharp = to_jpeg(checkerboard())
+    blurry = to_jpeg(np.asarray(Image.fromarray(checkerboard()).filter(ImageFilter.GaussianBlur(4))))
+    shots = iter([blurry, sharp, blurry])
+
+    jpeg, score = capture_best(lambda: next(shots), count=3, interval=0)
+    assert jpeg == sharp
+    assert score == score_jpeg(sharp)
+
+
+def test_burst_stops_at_first_good_shot():
+    sharp = to_jpeg(checkerboard())
+    taken = []
+
+    def capture():
+        taken.append(sharp)
+        return sharp
+
+    jpeg, score = capture_best(capture, count=3, interval=0)
+    assert jpeg == sharp
+    assert score.problem is None
+    assert len(taken) == 1
+
+
+if __name__ == "__main__":
+    test_numpy_laplacian_matches_definition()
+    test_sharp_image_has_no_problem()
+    test_blurry_and_dark_images_flagged()
+    test_burst_keeps_sharpest()
+    test_burst_stops_at_first_good_shot()
+    print("✅ 照片质量评分测试通过")
@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+测试LCD取景器（YUV420转换和帧节拍）
+"""
+
+import os
+import sys
+import time
+from concurrent.futures import Future
+
+import numpy as np
+
+# 添加项目根目录到Python路径
+project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, project_root)
+
+from core.camera.viewfinder import Viewfinder, yuv420_to_rgb
+
+
+def make_yuv(width, height, y, u, v):
+    yuv = np.empty((height * 3 // 2, width), dtype=np.uint8)
+    yuv[:height] = y
+    chroma = yuv[height:].reshape(-1)
+    quarter = (width // 2) * (height // 2)
+    chroma[:quarter] = u
+    chroma[quarter:] = v
+    return yuv
+
+
+def test_gray_stays_gray():
+    rgb = yuv420_to_rgb(make_yuv(32, 24, 100, 128, 128), 32, 24)
+    assert rgb.shape == (24, 32, 3)
+    assert np.all(rgb == 100)
+
+
+def test_primary_colors():
+    # 全范围BT.601下纯红约为 Y=76, U=85, V=255
+    red = yuv420_to_rgb(make_yuv(8, 8, 76, 85, 255), 8, 8)[0, 0]
+    assert red[0] > 240 and red[1] < 10 and red[2] < 10
+
+    blue = yuv420_to_rgb(make_yuv(8, 8, 29, 255, 107), 8, 8)[0, 0]
+    assert blue[2] > 240 and blue[0] < 10 and blue[1] < 10
+
+
+class FakeCamera:
+    def __init__(self, delay=0.0):
+        self.delay = delay
+        self.frames = 0
+
+    def capture_lores(self):
+        time.sleep(self.delay)
+        self.frames += 1
+        return make_yuv(320, 240, 128, 128, 128)
+
+
+class FakeLCD:
+    width = 320
+    height = 240
+
+    def __init__(self):
+        self.frames = []
+
+    def show_frame(self, frame):
+        self.frames.append(frame)
+        future = Future()
+        future.set_result(True)
+        return future
+
+
+def test_viewfinder_paces_frames():
+    camera = FakeCamera()
+    lcd = FakeLCD()
+    viewfinder = Viewfinder(camera, lcd, fps=20)
+    viewfinder.start()
+    time.sleep(0.5)
+    viewfinder.stop()
+
+    shown, dropped = viewfinder.stats()
+    # 0.5秒、20fps 约10帧，不会跑满CPU连续送帧
+    assert 5 <= shown <= 12
+    assert dropped == 0
+    assert lcd.frames[0].dtype == np.dtype('>u2') and lcd.frames[0].shape == (240, 320)
+
+
+def test_slow_camera_counts_dropped_frames():
+    camera = FakeCamera(delay=0.12)
+    viewfinder = Viewfinder(camera, FakeLCD(), fps=20)
+    viewfinder.start()
+    time.sleep(0.5)
+    viewfinder.stop()
+
+    shown, dropped = viewfinder.stats()
+    assert shown >= 2
+    assert dropped >= shown  # 每帧耗时超过两个节拍
+
+
+if __name__ == "__main__":
+    test_gray_stays_gray()
+    test_primary_colors()
+    test_viewfinder_paces_frames()
+    test_slow_camera_counts_dropped_frames()
+    print("✅ 取景器测试通过")
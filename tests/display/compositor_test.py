@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""
+测试显示合成线程
+"""
+
+import os
+import sys
+import threading
+
+# 添加项目根目录到Python路径
+project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, project_root)
+
+from core.display.compositor import DisplayCompositor, get_compositor
+
+
+def test_superseded_frames_are_dropped():
+    compositor = DisplayCompositor("TEST")
+    release = threading.Event()
+    started = threading.Event()
+    flushed = []
+
+    def slow_job():
+        started.set()
+        release.wait(2)
+        flushed.append("slow")
+
+    first = compositor.submit(slow_job)
+    started.wait(2)
+    # 第一帧正在刷新时连续提交三帧，只有最后一帧会被刷新
+    frames = [compositor.submit(lambda i=i: flushed.append(i)) for i in range(3)]
+    release.set()
+
+    assert frames[-1].result(2) is True
+    assert first.result(2) is True
+    assert [f.result(2) for f in frames[:-1]] == [False, False]
+    assert flushed == ["slow", 2]
+    assert compositor.dropped == 2
+    compositor.close(2)
+
+
+def test_job_error_sets_exception():
+    compositor = DisplayCompositor("TEST")
+
+    def broken():
+        raise OSError("I2C error")
+
+    future = compositor.submit(broken)
+    assert isinstance(future.exception(2), OSError)
+    # 出错后线程继续工作
+    assert compositor.submit(lambda: None).result(2) is True
+    compositor.close(2)
+
+
+def test_wait_idle_and_shared_registry():
+    compositor = get_compositor("TEST-SHARED")
+    assert get_compositor("TEST-SHARED") is compositor
+    done = []
+    compositor.submit(lambda: done.append(1))
+    assert compositor.wait_idle(2)
+    assert done == [1]
+    compositor.close(2)
+    assert get_compositor("TEST-SHARED") is not compositor
+
+
+if __name__ == "__main__":
+    test_superseded_frames_are_dropped()
+    test_job_error_sets_exception()
+    test_wait_idle_and_shared_registry()
+    print("✅ 显示合成线程测试通过")
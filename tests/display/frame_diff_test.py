@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""
+测试LCD局部刷新的帧差分
+"""
+
+import os
+import sys
+
+import numpy as np
+
+# 添加项目根目录到Python路径
+project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, project_root)
+
+from core.display.frame_diff import find_dirty_rects, rect_area
+from core.display.lcd_transport import LoopbackTransport
+from core.display.st7789 import ST7789
+
+
+def test_no_change():
+    frame = np.zeros((240, 320), dtype='>u2')
+    assert find_dirty_rects(frame, frame.copy()) == []
+
+
+def test_single_region():
+    previous = np.zeros((240, 320), dtype='>u2')
+    current = previous.copy()
+    current[100:110, 20:60] = 0xFFFF
+    assert find_dirty_rects(previous, current) == [(20, 100, 59, 109)]
+
+
+def test_rects_merged_to_limit():
+    """分散的变化区域被合并到不超过 max_rects 个"""
+    previous = np.zeros((240, 320), dtype='>u2')
+    current = previous.copy()
+    for y in range(0, 240, 40):
+        current[y:y + 2, 10:20] = 1
+    rects = find_dirty_rects(previous, current, max_rects=3)
+    assert len(rects) == 3
+    covered = np.zeros_like(current, dtype=bool)
+    for x0, y0, x1, y1 in rects:
+        covered[y0:y1 + 1, x0:x1 + 1] = True
+    assert covered[current != previous].all()
+    assert sum(rect_area(r) for r in rects) < 320 * 240
+
+
+def test_write_region_bytes():
+    """局部写入只发送窗口内的像素"""
+    transport = LoopbackTransport()
+    lcd = ST7789(transport)
+    transport.clear()
+
+    frame = np.zeros((240, 320), dtype='>u2')
+    frame[5:7, 10:13] = 0x1234
+    lcd.write_region(frame, (10, 5, 12, 6))
+
+    commands = transport.commands()
+    assert commands[0] == (0x2A, bytes((0, 10, 0, 12)))
+    assert commands[1] == (0x2B, bytes((0, 5, 0, 6)))
+    assert commands[2] == (0x2C, b'\x12\x34' * 6)
+
+
+if __name__ == "__main__":
+    test_no_change()
+    test_single_region()
+    test_rects_merged_to_limit()
+    test_write_region_bytes()
+    print("✅ 帧差分测试通过")
@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+测试预编译字形图集
+使用系统中可用的TTF字体构建一个ASCII图集，比较与FreeType的绘制结果
+"""
+
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+from PIL import Image, ImageDraw, ImageFont
+
+# 添加项目根目录到Python路径
+project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, project_root)
+
+from core.display.font_cache import DEFAULT_FONT_PATH, get_truetype_font
+from core.display.glyph_atlas import GlyphAtlas, build_atlas
+
+FONT_CANDIDATES = [
+    DEFAULT_FONT_PATH,
+    '/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf',
+]
+FONT_PATH = next((path for path in FONT_CANDIDATES if os.path.exists(path)), None)
+ASCII = ''.join(chr(cp) for cp in range(0x20, 0x7F))
+
+
+def load_test_atlas(directory):
+    path = os.path.join(directory, 'test.atlas')
+    build_atlas(FONT_PATH, path, charset=ASCII)
+    atlas = GlyphAtlas(path)
+    for size, font in atlas.fonts.items():
+        font.fallback = ImageFont.truetype(FONT_PATH, size)
+    return atlas
+
+
+def render(font, text):
+    image = Image.new("1", (128, 64))
+    ImageDraw.Draw(image).text((10, 5), text, font=font, fill=255)
+    return np.asarray(image)
+
+
+def test_atlas_matches_freetype():
+    with tempfile.TemporaryDirectory() as directory:
+        atlas = load_test_atlas(directory)
+        for size in (8, 12):
+            font = atlas.get(size)
+            for text in ("BT1 BT2", "(3/12)"):
+                assert (render(font, text) == render(font.fallback, text)).all()
+                assert font.getlength(text) == font.fallback.getlength(text)
+
+
+def test_missing_glyph_falls_back():
+    with tempfile.TemporaryDirectory() as directory:
+        font = load_test_atlas(directory).get(12)
+        text = "BT1 é"
+        assert not font.has_text(text)
+        assert (render(font, text) == render(font.fallback, text)).all()
+
+
+def test_truetype_font_is_cached():
+    assert get_truetype_font(12, FONT_PATH) is get_truetype_font(12, FONT_PATH)
+
+
+if __name__ == "__main__":
+    with tempfile.TemporaryDirectory() as directory:
+        atlas = load_test_atlas(directory)
+        atlas_font = atlas.get(12)
+        lines = ["Slime drift log", "BT1 continue", "BT2 back (1/3)"]
+
+        for name, font in (("FreeType", atlas_font.fallback), ("图集", atlas_font)):
+            image = Image.new("1", (128, 64))
+            draw = ImageDraw.Draw(image)
+            rounds = 200
+            start_time = time.perf_counter()
+            for _ in range(rounds):
+                draw.rectangle((0, 0, 128, 64), fill=0)
+                for i, line in enumerate(lines):
+                    draw.text((10, 10 + i * 20), line, font=font, fill=255)
+            elapsed = (time.perf_counter() - start_time) / rounds
+            print(f"{name}: {elapsed * 1000:.3f}ms/屏")
+
+    test_atlas_matches_freetype()
+    test_missing_glyph_falls_back()
+    test_truetype_font_is_cached()
+    print("✅ 字形图集测试通过")
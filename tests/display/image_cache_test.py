@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+"""
+测试送屏图像旁路缓存
+"""
+
+import os
+import sys
+import tempfile
+
+import numpy as np
+from PIL import Image
+
+# 添加项目根目录到Python路径
+project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, project_root)
+
+from core.display.image_cache import ImageSidecarCache
+from core.display.lcd_encoder import RGB565Encoder
+
+
+def make_image(directory, name="slime.png", color=(255, 0, 0)):
+    path = os.path.join(directory, name)
+    image = Image.new("RGB", (640, 480), color)
+    image.paste((0, 0, 255), (0, 0, 320, 240))
+    image.save(path)
+    return path
+
+
+def test_lcd_frame_matches_encoder():
+    with tempfile.TemporaryDirectory() as directory:
+        path = make_image(directory)
+        cache = ImageSidecarCache(os.path.join(directory, "cache"))
+        frame = cache.lcd_frame(path)
+        resized = Image.open(path).convert("RGB").resize((320, 240), Image.BILINEAR)
+        expected = RGB565Encoder().encode_array(resized, rotate_180=True)
+        assert frame.shape == (240, 320)
+        assert (frame == expected).all()
+
+
+def test_sidecars_keyed_by_content():
+    with tempfile.TemporaryDirectory() as directory:
+        cache = ImageSidecarCache(os.path.join(directory, "cache"))
+        first = make_image(directory, "a.png")
+        copy = make_image(directory, "b.png")
+        assert cache.prepare(first) == cache.prepare(copy)
+        assert len(os.listdir(cache.cache_dir)) == 2
+
+        oled = cache.oled_frame(first)
+        assert oled.shape == (8, 128)
+        assert oled.dtype == np.uint8
+
+
+def test_prune_keeps_recent_entries():
+    with tempfile.TemporaryDirectory() as directory:
+        cache = ImageSidecarCache(os.path.join(directory, "cache"), max_entries=2)
+        for i in range(3):
+            cache.prepare(make_image(directory, f"{i}.png", color=(i, 0, 0)))
+        assert len(os.listdir(cache.cache_dir)) == 4
+
+
+if __name__ == "__main__":
+    test_lcd_frame_matches_encoder()
+    test_sidecars_keyed_by_content()
+    test_prune_keeps_recent_entries()
+    print("✅ 送屏图像缓存测试通过")
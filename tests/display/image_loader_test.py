@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+"""
+测试小屏预览图解码
+"""
+
+import os
+import sys
+import tempfile
+import time
+
+from PIL import Image
+
+# 添加项目根目录到Python路径
+project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, project_root)
+
+from core.display.image_loader import load_preview_image
+
+
+def save_photo(directory, size, fmt="JPEG"):
+    path = os.path.join(directory, "photo.jpg" if fmt == "JPEG" else "photo.png")
+    image = Image.new("RGB", size, (30, 120, 200))
+    image.paste((250, 200, 0), (0, 0, size[0] // 2, size[1] // 2))
+    image.save(path, fmt)
+    return path
+
+
+def test_jpeg_decoded_near_target_size():
+    with tempfile.TemporaryDirectory() as directory:
+        path = save_photo(directory, (2592, 1944))
+        preview = load_preview_image(path, (320, 240))
+        assert preview.mode == "RGB"
+        assert preview.size[0] >= 320 and preview.size[1] >= 240
+        assert preview.size[0] < 640 and preview.size[1] < 480
+        # 左上角仍是黄色区域
+        assert preview.getpixel((10, 10))[0] > 200
+
+
+def test_png_decoded_at_full_size():
+    with tempfile.TemporaryDirectory() as directory:
+        path = save_photo(directory, (640, 480), fmt="PNG")
+        assert load_preview_image(path, (320, 240)).size == (640, 480)
+
+
+if __name__ == "__main__":
+    test_jpeg_decoded_near_target_size()
+    test_png_decoded_at_full_size()
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = save_photo(directory, (3280, 2464))
+        start_time = time.perf_counter()
+        with Image.open(path) as img:
+            img.convert("RGB")
+        full_time = time.perf_counter() - start_time
+        start_time = time.perf_counter()
+        load_preview_image(path, (320, 240))
+        preview_time = time.perf_counter() - start_time
+        print(f"全尺寸解码: {full_time * 1000:.1f}ms, 预览解码: {preview_time * 1000:.1f}ms")
+    print("✅ 预览图解码测试通过")
@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+测试 RGB565Encoder
+验证向量化编码结果与原来的逐像素实现一致，并输出耗时对比
+"""
+
+import os
+import sys
+import time
+
+import numpy as np
+from PIL import Image
+
+# 添加项目根目录到Python路径
+project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, project_root)
+
+from core.display.lcd_encoder import RGB565Encoder
+
+WIDTH, HEIGHT = 320, 240
+
+
+def encode_reference(image):
+    """原 BitBangLCD.display 中的逐像素编码"""
+    image = image.resize((WIDTH, HEIGHT)).convert('RGB')
+    pixelbytes = []
+    for y in range(HEIGHT):
+        for x in range(WIDTH):
+            r, g, b = image.getpixel((x, y))
+            rgb565 = ((r & 0xF8) << 8) | ((g & 0xFC) << 3) | (b >> 3)
+            pixelbytes.append((rgb565 >> 8) & 0xFF)
+            pixelbytes.append(rgb565 & 0xFF)
+    return bytes(pixelbytes)
+
+
+def make_test_image():
+    rng = np.random.default_rng(0)
+    return Image.fromarray(rng.integers(0, 256, (HEIGHT, WIDTH, 3), dtype=np.uint8))
+
+
+def test_encode_matches_reference():
+    """相同尺寸时与原实现逐字节一致"""
+    image = make_test_image()
+    encoder = RGB565Encoder(WIDTH, HEIGHT)
+    assert bytes(encoder.encode(image)) == encode_reference(image)
+
+
+def test_rotation_folded_into_encode():
+    """编码时旋转等价于先 rotate(180) 再编码"""
+    image = make_test_image()
+    encoder = RGB565Encoder(WIDTH, HEIGHT)
+    assert bytes(encoder.encode(image, rotate_180=True)) == encode_reference(image.rotate(180))
+
+
+def test_resize_and_buffer_reuse():
+    """任意尺寸输入都输出整屏字节，且缓冲区在帧之间复用"""
+    encoder = RGB565Encoder(WIDTH, HEIGHT)
+    first = encoder.encode(Image.new('RGB', (1024, 768), 'white'))
+    assert len(first) == WIDTH * HEIGHT * 2
+    assert bytes(first[:2]) == b'\xff\xff'
+
+    second = encoder.encode(Image.new('L', (640, 480), 0), rotate_180=True)
+    assert second.obj is first.obj
+    assert bytes(first[:2]) == b'\x00\x00'
+
+
+if __name__ == "__main__":
+    image = make_test_image()
+    encoder = RGB565Encoder(WIDTH, HEIGHT)
+
+    start_time = time.time()
+    expected = encode_reference(image)
+    reference_time = time.time() - start_time
+
+    start_time = time.time()
+    actual = bytes(encoder.encode(image))
+    encoder_time = time.time() - start_time
+
+    print(f"逐像素编码: {reference_time * 1000:.1f}ms")
+    print(f"向量化编码: {encoder_time * 1000:.1f}ms")
+    print("✅ 结果一致" if actual == expected else "❌ 结果不一致")
@@ -0,0 +1,54 @@
+#!/usr/bin/env python3
+"""
+测试 ST7789 驱动的字节流
+使用 LoopbackTransport，不需要LCD硬件
+"""
+
+import os
+import sys
+
+from PIL import Image
+
+# 添加项目根目录到Python路径
+project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, project_root)
+
+from core.display.lcd_transport import LoopbackTransport, create_lcd_transport
+from core.display.st7789 import ST7789, ST7789_INIT_SEQUENCE
+
+
+def test_init_sequence():
+    """初始化时先复位，再按顺序发送初始化序列"""
+    transport = LoopbackTransport()
+    ST7789(transport)
+
+    assert transport.reset_count == 1
+    expected = [(cmd, bytes(params)) for cmd, params, _ in ST7789_INIT_SEQUENCE]
+    assert transport.commands() == expected
+
+
+def test_full_frame_push():
+    """整屏写入：CASET/RASET覆盖全屏，RAMWR后跟153600字节像素"""
+    transport = LoopbackTransport()
+    lcd = ST7789(transport)
+    transport.clear()
+
+    lcd.display(Image.new('RGB', (320, 240), (255, 0, 0)))
+
+    commands = transport.commands()
+    assert commands[0] == (0x2A, bytes((0, 0, 0x01, 0x3F)))
+    assert commands[1] == (0x2B, bytes((0, 0, 0x00, 0xEF)))
+    assert commands[2][0] == 0x2C
+    assert commands[2][1] == b'\xf8\x00' * (320 * 240)
+
+
+def test_factory_loopback():
+    """工厂函数可以直接创建回环传输"""
+    assert isinstance(create_lcd_transport("loopback"), LoopbackTransport)
+
+
+if __name__ == "__main__":
+    test_init_sequence()
+    test_full_frame_push()
+    test_factory_loopback()
+    print("✅ LCD传输层字节流测试通过")
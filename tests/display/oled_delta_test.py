@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+测试 SSD1306 页级增量刷新
+使用模拟的I2C设备记录传输字节，不需要OLED硬件
+"""
+
+import os
+import sys
+
+# 添加项目根目录到Python路径
+project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, project_root)
+
+from core.display.oled_backend import SSD1306DeltaFlusher
+
+
+class FakeI2CDevice:
+    def __init__(self):
+        self.writes = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        pass
+
+    def write(self, buf):
+        self.writes.append(bytes(buf))
+
+
+class FakeSSD1306:
+    """与 adafruit SSD1306_I2C 相同的缓冲区布局"""
+
+    def __init__(self, width=128, height=64):
+        self.width = width
+        self.height = height
+        self.page_addressing = False
+        self.buffer = bytearray((height // 8) * width + 1)
+        self.buffer[0] = 0x40
+        self.i2c_device = FakeI2CDevice()
+        self.show_count = 0
+
+    def show(self):
+        self.show_count += 1
+        self.i2c_device.write(self.buffer)
+
+
+def test_first_flush_is_full():
+    device = FakeSSD1306()
+    flusher = SSD1306DeltaFlusher(device)
+    assert flusher.flush() == 1024
+    assert device.show_count == 1
+
+
+def test_small_change_sends_segment():
+    device = FakeSSD1306()
+    flusher = SSD1306DeltaFlusher(device)
+    flusher.flush()
+    device.i2c_device.writes.clear()
+
+    # 第2页第10~12列变化
+    for col in (10, 11, 12):
+        device.buffer[1 + 2 * 128 + col] = 0xFF
+
+    assert flusher.flush() == 3
+    assert device.show_count == 1
+    assert device.i2c_device.writes == [
+        bytes((0x00, 0x21, 10, 12, 0x22, 2, 2)),
+        bytes((0x40, 0xFF, 0xFF, 0xFF)),
+    ]
+
+    # 没有变化时不发送任何数据
+    device.i2c_device.writes.clear()
+    assert flusher.flush() == 0
+    assert device.i2c_device.writes == []
+
+
+def test_large_change_falls_back_to_full():
+    device = FakeSSD1306()
+    flusher = SSD1306DeltaFlusher(device)
+    flusher.flush()
+    for i in range(1, len(device.buffer)):
+        device.buffer[i] = 0xAA
+    assert flusher.flush() == 1024
+    assert device.show_count == 2
+
+
+if __name__ == "__main__":
+    test_first_flush_is_full()
+    test_small_change_sends_segment()
+    test_large_change_falls_back_to_full()
+    print("✅ OLED增量刷新测试通过")
@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+测试 SSD1306 页格式打包
+验证 pack_pages 与 SSD1306_I2C.image() 的逐像素打包结果一致，
+直接运行时输出两者的耗时对比
+"""
+
+import os
+import sys
+import time
+
+import numpy as np
+from PIL import Image, ImageDraw
+
+# 添加项目根目录到Python路径
+project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, project_root)
+
+from core.display.oled_backend import SSD1306DeltaFlusher, pack_pages
+from tests.display.oled_delta_test import FakeSSD1306
+
+WIDTH, HEIGHT = 128, 64
+
+
+def pack_reference(image):
+    """与 adafruit SSD1306_I2C.image() 相同的逐像素打包（MVLSB格式）"""
+    buf = bytearray((HEIGHT // 8) * WIDTH)
+    pixels = image.load()
+    for y in range(HEIGHT):
+        for x in range(WIDTH):
+            index = (y >> 3) * WIDTH + x
+            offset = y & 0x07
+            buf[index] = (buf[index] & ~(0x01 << offset)) | ((pixels[(x, y)] != 0) << offset)
+    return bytes(buf)
+
+
+def make_test_image():
+    image = Image.new("1", (WIDTH, HEIGHT))
+    draw = ImageDraw.Draw(image)
+    draw.rectangle((5, 3, 60, 40), outline=255)
+    draw.ellipse((70, 10, 120, 60), fill=255)
+    draw.text((10, 45), "BT1 BT2", fill=255)
+    return image
+
+
+def test_pack_matches_reference():
+    image = make_test_image()
+    assert pack_pages(image).tobytes() == pack_reference(image)
+
+
+def test_pack_bool_array():
+    bits = np.zeros((HEIGHT, WIDTH), dtype=bool)
+    bits[0, 0] = True   # 第0页最上面一行 -> bit0
+    bits[15, 1] = True  # 第1页最下面一行 -> bit7
+    packed = pack_pages(bits)
+    assert packed[0, 0] == 0x01
+    assert packed[1, 1] == 0x80
+
+
+def test_load_image_writes_device_buffer():
+    device = FakeSSD1306()
+    flusher = SSD1306DeltaFlusher(device)
+    image = make_test_image()
+    flusher.load_image(image)
+    assert bytes(device.buffer[1:]) == pack_reference(image)
+    assert device.buffer[0] == 0x40
+
+
+if __name__ == "__main__":
+    image = make_test_image()
+    rounds = 50
+
+    start_time = time.time()
+    for _ in range(rounds):
+        expected = pack_reference(image)
+    reference_time = (time.time() - start_time) / rounds
+
+    start_time = time.time()
+    for _ in range(rounds):
+        actual = pack_pages(image).tobytes()
+    numpy_time = (time.time() - start_time) / rounds
+
+    print(f"逐像素打包(SSD1306_I2C.image): {reference_time * 1000:.2f}ms/帧")
+    print(f"NumPy打包(pack_pages): {numpy_time * 1000:.3f}ms/帧")
+    print(f"加速: {reference_time / numpy_time:.0f}x")
+    print("✅ 结果一致" if actual == expected else "❌ 结果不一致")
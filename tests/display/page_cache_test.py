@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+"""
+测试分页预渲染缓存
+"""
+
+import os
+import sys
+
+# 添加项目根目录到Python路径
+project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, project_root)
+
+from core.display.page_cache import PageCache, RenderedPages, page_starts
+
+
+def test_page_starts():
+    assert page_starts(2, 3) == [0]
+    assert page_starts(7, 3) == [0, 3, 4]
+    assert page_starts(7, 3, clamp_last=False) == [0, 3, 6]
+
+
+def test_pages_rendered_once():
+    rendered = []
+
+    def render(start_line):
+        rendered.append(start_line)
+        return f"frame-{start_line}"
+
+    pages = RenderedPages(render, page_starts(7, 3))
+    assert rendered == [0, 3, 4]
+    assert pages.frame(3) == "frame-3"
+    # 向上翻页可能到达新的起始行，按需渲染一次后缓存
+    assert pages.frame(1) == "frame-1"
+    assert pages.frame(1) == "frame-1"
+    assert rendered == [0, 3, 4, 1]
+
+
+def test_cache_hits_and_eviction():
+    cache = PageCache(max_frames=4)
+    build_count = 0
+
+    def build():
+        nonlocal build_count
+        build_count += 1
+        return RenderedPages(lambda start_line: start_line, [0, 3])
+
+    first = cache.get("a", build)
+    assert cache.get("a", build) is first
+    assert (cache.hits, cache.misses) == (1, 1)
+
+    cache.get("b", build)
+    cache.get("a", build)   # a 变为最近使用
+    cache.get("c", build)   # 超过4帧，淘汰最久未用的 b
+    assert build_count == 3
+    assert cache.get("a", build) is first
+    cache.get("b", build)
+    assert build_count == 4
+
+
+if __name__ == "__main__":
+    test_page_starts()
+    test_pages_rendered_once()
+    test_cache_hits_and_eviction()
+    print("✅ 分页缓存测试通过")
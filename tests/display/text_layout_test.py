@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+测试文本排版引擎
+使用固定字宽的模拟字体：中文12像素，ASCII 6像素
+"""
+
+import os
+import sys
+import time
+
+# 添加项目根目录到Python路径
+project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, project_root)
+
+from core.display import text_layout
+from core.display.text_layout import NO_LINE_START, layout_lines
+
+
+class FixedFont:
+    def __init__(self):
+        self.calls = 0
+
+    def getlength(self, text):
+        self.calls += 1
+        return sum(12 if ord(ch) > 127 else 6 for ch in text)
+
+
+def test_cjk_fills_line_width():
+    font = FixedFont()
+    lines = layout_lines("这是一段很长的文本需要自动换行显示在OLED上", font, 108)
+    assert lines[0] == "这是一段很长的文本"
+    assert all(font.getlength(line) <= 108 for line in lines)
+    assert ''.join(lines) == "这是一段很长的文本需要自动换行显示在OLED上"
+
+
+def test_punctuation_not_at_line_start():
+    font = FixedFont()
+    # 一行放满9个字后遇到句号，句号和前一个字一起换到下一行
+    lines = layout_lines("一二三四五六七八九。十", font, 108)
+    assert lines == ("一二三四五六七八", "九。十")
+    for text in ("你好，世界。今天天气很好！我们出去走走吧？", "（测试）「引号」"):
+        for line in layout_lines(text, font, 48)[1:]:
+            assert line[0] not in NO_LINE_START
+
+
+def test_latin_breaks_at_spaces():
+    font = FixedFont()
+    lines = layout_lines("hello slime world", font, 60)
+    assert lines == ("hello", "slime", "world")
+    # 超长单词强制截断
+    assert layout_lines("abcdefghijkl", font, 36) == ("abcdef", "ghijkl")
+
+
+def test_manual_newlines_and_empty_lines():
+    font = FixedFont()
+    assert layout_lines("第一行\n\n第三行", font, 108) == ("第一行", "", "第三行")
+
+
+def test_layout_is_cached():
+    font = FixedFont()
+    text = "缓存测试" * 20
+    first = layout_lines(text, font, 108)
+    calls = font.calls
+    assert layout_lines(text, font, 108) is first
+    assert font.calls == calls
+
+
+def test_uncached_layout_leaves_cache_alone():
+    font = FixedFont()
+    text = "逐步生成的文字" * 5
+    lines = layout_lines(text, font, 108, cache=False)
+    assert (text, font, 108) not in text_layout._layout_cache
+    assert lines == layout_lines(text, font, 108)
+    assert (text, font, 108) in text_layout._layout_cache
+
+if __name__ == "__main__":
+    test_cjk_fills_line_width()
+    test_punctuation_not_at_line_start()
+    test_latin_breaks_at_spaces()
+    test_manual_newlines_and_empty_lines()
+    test_layout_is_cached()
+    test_uncached_layout_leaves_cache_alone()
+
+    font = FixedFont()
+    text = "史莱姆在城市里漂流，看到了一只猫。" * 30
+    start_time = time.perf_counter()
+    layout_lines(text, font, 108)
+    print(f"首次排版 {len(text)} 字: {(time.perf_counter() - start_time) * 1000:.3f}ms")
+    start_time = time.perf_counter()
+    layout_lines(text, font, 108)
+    print(f"缓存命中: {(time.perf_counter() - start_time) * 1000:.3f}ms")
+    print("✅ 文本排版测试通过")
@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+测试按键手势识别（不需要GPIO，用事件队列模拟输入）
+"""
+
+import os
+import queue
+import sys
+import time
+from collections import namedtuple
+
+# 添加项目根目录到Python路径
+project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, project_root)
+
+from core.input.gestures import GestureRecognizer
+
+# 与 InputController 产生的 InputEvent 字段相同
+InputEvent = namedtuple('InputEvent', 'name pressed timestamp')
+
+
+class QueueController:
+    """只提供事件队列的输入控制器"""
+
+    def __init__(self):
+        self.events = queue.Queue()
+
+    def push(self, name, pressed, timestamp=None):
+        self.events.put(InputEvent(name, pressed, time.time() if timestamp is None else timestamp))
+
+    def get_event(self, timeout=None):
+        try:
+            if timeout == 0:
+                return self.events.get_nowait()
+            return self.events.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+    def clear_events(self):
+        while self.get_event(0) is not None:
+            pass
+
+
+def kinds(recognizer, count, timeout=1.0):
+    return [(g.kind, g.name) for g in (recognizer.get_gesture(timeout) for _ in range(count))]
+
+
+def test_short_press():
+    controller = QueueController()
+    gestures = GestureRecognizer(controller, long_press_seconds=1.0)
+    now = time.time()
+    controller.push('BTN1', True, now)
+    controller.push('BTN1', False, now + 0.2)
+
+    assert kinds(gestures, 3) == [('press', 'BTN1'), ('release', 'BTN1'), ('short_press', 'BTN1')]
+    assert gestures.get_gesture(timeout=0) is None
+
+
+def test_long_press_fires_before_release():
+    controller = QueueController()
+    gestures = GestureRecognizer(controller, long_press_seconds=0.05)
+    controller.push('BTN2', True)
+
+    assert gestures.get_gesture(timeout=1.0).kind == 'press'
+    start = time.time()
+    gesture = gestures.get_gesture(timeout=1.0)
+    assert gesture.kind == 'long_press' and gesture.name == 'BTN2'
+    assert time.time() - start < 0.5
+    assert gestures.is_held('BTN2')
+
+    # 长按后释放不再产生短按
+    controller.push('BTN2', False)
+    assert kinds(gestures, 1) == [('release', 'BTN2')]
+    assert gestures.get_gesture(timeout=0.1) is None
+
+
+def test_late_release_still_long_press():
+    controller = QueueController()
+    gestures = GestureRecognizer(controller, long_press_seconds=2.0)
+    now = time.time() - 5
+    controller.push('BTN2', True, now)
+    controller.push('BTN2', False, now + 3)
+
+    assert kinds(gestures, 3) == [('press', 'BTN2'), ('long_press', 'BTN2'), ('release', 'BTN2')]
+
+
+def test_joystick_repeat():
+    controller = QueueController()
+    gestures = GestureRecognizer(controller, repeat_delay=0.05, repeat_interval=0.02)
+    controller.push('DOWN', True)
+
+    assert kinds(gestures, 3) == [('press', 'DOWN'), ('repeat', 'DOWN'), ('repeat', 'DOWN')]
+    controller.push('DOWN', False)
+    assert kinds(gestures, 1) == [('release', 'DOWN')]
+    assert gestures.get_gesture(timeout=0.1) is None
+
+
+def test_reset_ignores_earlier_press():
+    controller = QueueController()
+    gestures = GestureRecognizer(controller)
+    controller.push('BTN1', True)
+    gestures.reset()
+
+    # 进入界面前按下的按键，释放时不产生手势
+    controller.push('BTN1', False)
+    assert gestures.get_gesture(timeout=0.05) is None
+
+
+if __name__ == "__main__":
+    test_short_press()
+    test_long_press_fires_before_release()
+    test_late_release_still_long_press()
+    test_joystick_repeat()
+    test_reset_ignores_earlier_press()
+    print("✅ 手势识别测试通过")